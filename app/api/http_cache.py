@@ -0,0 +1,32 @@
+from datetime import datetime
+from fastapi import Request, Response
+
+# Clients may keep the body but must revalidate it with If-None-Match on every use
+CACHE_CONTROL = "no-cache"
+
+def build_etag(*parts) -> str:
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+def lectures_etag(generation: int) -> str:
+    # The listing only shows lectures from today on, so it also changes at midnight without a sync
+    return build_etag("lectures", generation, datetime.now().strftime('%Y%m%d'))
+
+def jobs_etag(generation: int) -> str:
+    return build_etag("jobs", generation)
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """
+    Weak comparison of the If-None-Match header against the current ETag.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+def set_cache_headers(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
@@ -0,0 +1,40 @@
+import asyncio
+from fastapi import APIRouter, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api import http_cache
+from app.database import SessionLocal, get_async_db
+from app.services.ics_service import ics_service
+
+router = APIRouter()
+
+# Keeps concurrent first requests of one worker from rendering the same feed twice
+_render_lock = asyncio.Lock()
+
+def _get_feed(version: int) -> tuple:
+    db = SessionLocal()
+    try:
+        return ics_service.get_feed(db, version)
+    finally:
+        db.close()
+
+@router.get("/schedule.ics")
+async def get_schedule_feed(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """iCalendar feed of all scheduled lectures, for subscribing from any calendar app."""
+    # Keyed on the lectures alone: job status changes leave the feed, and subscribers' copies, as they are
+    version = await ics_service.feed_version_async(db)
+    etag = http_cache.build_etag("ics", "v", version)
+    if http_cache.is_not_modified(request, etag):
+        return http_cache.not_modified_response(etag)
+
+    async with _render_lock:
+        path, gz_path = await run_in_threadpool(_get_feed, version)
+
+    headers = {"ETag": etag, "Cache-Control": http_cache.CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        path = gz_path
+
+    # FileResponse streams the file in chunks, so large calendars are never held in memory
+    return FileResponse(path, media_type="text/calendar; charset=utf-8", headers=headers)
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api import http_cache
+from app.database import get_async_db
+from app.services.change_service import change_service
+from app.services.generation_service import generation_service
+from app.schemas.changes import LectureChangeListResponse, LectureChangeResponse
+
+router = APIRouter()
+
+@router.get("/", response_model=LectureChangeListResponse)
+async def get_changes(
+    request: Request,
+    response: Response,
+    since: int = Query(0, ge=0, description="Last seq already processed. Use next_since of the previous response."),
+    limit: int = Query(500, ge=1, le=5000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Returns lecture changes recorded after the given sequence number, oldest first."""
+    etag = http_cache.build_etag("changes", await generation_service.get_async(db))
+    if http_cache.is_not_modified(request, etag):
+        return http_cache.not_modified_response(etag)
+    http_cache.set_cache_headers(response, etag)
+
+    items, next_since, has_more = await change_service.get_changes_since_async(db, since=since, limit=limit)
+    return LectureChangeListResponse(
+        items=[LectureChangeResponse(**item) for item in items],
+        next_since=next_since,
+        has_more=has_more
+    )
@@ -1,20 +1,35 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+import json
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, Header
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.api import http_cache
 from app.services.job_service import job_service
+from app.services.generation_service import generation_service
+from app.services.event_service import event_service
+from app.services.profiling_service import profiling_service
 from app.schemas.jobs import JobStatusResponse, JobListResponse
-from app.database import get_db
+from app.database import get_db, get_async_db
 
 router = APIRouter()
 
 @router.get("/", response_model=JobListResponse)
 async def list_jobs(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Retrieves a paged list of jobs ordered by completion date."""
+    etag = http_cache.jobs_etag(await generation_service.get_async(db))
+    if http_cache.is_not_modified(request, etag):
+        return http_cache.not_modified_response(etag)
+    http_cache.set_cache_headers(response, etag)
+
     skip = (page - 1) * size
-    items, total = job_service.get_jobs(db, skip=skip, limit=size)
+    items, total = await job_service.get_jobs_async(db, skip=skip, limit=size)
     
     return JobListResponse(
         items=[
@@ -35,21 +50,67 @@ async def list_jobs(
 
 @router.post("/", response_model=JobStatusResponse)
 
-async def trigger_sync(db: Session = Depends(get_db)):
+async def trigger_sync(
+    profile: bool = Query(False, description="Capture a cProfile and tracemalloc profile of the run, downloadable from /jobs/{job_id}/profile."),
+    db: Session = Depends(get_db)
+):
     """Triggers the PK schedule synchronization job."""
-    job = await job_service.execute_sync(db, triggered_by="user")
+    job = await job_service.execute_sync(db, triggered_by="user", profile=profile)
+    return JobStatusResponse(
+        job_id=job.id,
+        status=job.status,
+        started_at=job.started_at,
+        message=job.message,
+        triggered_by=job.triggered_by,
+        profile_requested=bool(job.profile_requested)
+    )
+
+@router.delete("/{job_id}", response_model=JobStatusResponse, status_code=202)
+async def cancel_job(job_id: str, db: Session = Depends(get_db)):
+    """Requests cancellation of a running synchronization job."""
+    try:
+        job = await job_service.cancel_job(db, job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
     return JobStatusResponse(
         job_id=job.id,
         status=job.status,
         started_at=job.started_at,
+        completed_at=job.completed_at,
         message=job.message,
         triggered_by=job.triggered_by
     )
 
+@router.post("/{job_id}/resume", response_model=JobStatusResponse, status_code=202)
+async def resume_job(job_id: str, db: Session = Depends(get_db)):
+    """Resumes a failed or cancelled synchronization job from its last completed stage."""
+    try:
+        job = await job_service.resume_job(db, job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobStatusResponse(
+        job_id=job.id,
+        status=job.status,
+        started_at=job.started_at,
+        message=job.message,
+        triggered_by=job.triggered_by,
+        profile_requested=bool(job.profile_requested),
+        attempts=job.attempts
+    )
+
 @router.get("/status/{job_id}", response_model=JobStatusResponse)
-async def get_status(job_id: str, db: Session = Depends(get_db)):
+async def get_status(job_id: str, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Retrieves the status of a specific synchronization job."""
-    job = job_service.get_job_status(db, job_id)
+    etag = http_cache.jobs_etag(await generation_service.get_async(db))
+    if http_cache.is_not_modified(request, etag):
+        return http_cache.not_modified_response(etag)
+    http_cache.set_cache_headers(response, etag)
+
+    job = await job_service.get_job_status_async(db, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     return JobStatusResponse(
@@ -58,5 +119,43 @@ async def get_status(job_id: str, db: Session = Depends(get_db)):
         started_at=job.started_at,
         completed_at=job.completed_at,
         message=job.message,
-        triggered_by=job.triggered_by
+        triggered_by=job.triggered_by,
+        timings=json.loads(job.timings) if job.timings else None,
+        profile_requested=bool(job.profile_requested),
+        attempts=job.attempts
+    )
+
+@router.get("/{job_id}/profile")
+async def download_profile(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Downloads the profile captured for a job started with profile=true, once the job has finished."""
+    profile = await profiling_service.get_async(db, job_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="No profile captured for this job")
+    return Response(
+        content=profile.content,
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="job-{job_id}-profile.zip"'}
+    )
+
+
+@router.get("/events")
+async def stream_events(
+    request: Request,
+    job_id: Optional[str] = Query(None, description="Only stream events of this job."),
+    last_event_id: Optional[int] = Header(None, description="Sent by EventSource on reconnect to resume the stream.")
+):
+    """Streams job status transitions and per-stage progress as server-sent events."""
+    async def event_stream():
+        async for event in event_service.subscribe(job_id=job_id, last_event_id=last_event_id):
+            if await request.is_disconnected():
+                break
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
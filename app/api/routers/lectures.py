@@ -1,50 +1,125 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from app.database import SessionLocal
+from datetime import date
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.api import http_cache
+from app.services.export_service import EXPORT_COLUMNS, export_service
+from app.services.generation_service import generation_service
+from app.services.job_service import job_service
 from app.services.lecture_service import lecture_service
-from app.schemas.lectures import LectureListResponse, LectureResponse, LectureSyncInfo
+from app.services.response_cache import lectures_cache
+from app.schemas.lectures import LectureFilter, LectureListResponse, LectureResponse, LectureSyncInfo
 
 router = APIRouter()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+def _to_response(item) -> LectureResponse:
+    """
+    Maps a row of the listing projection onto the response model.
+    """
+    return LectureResponse(
+        id=item.id,
+        source=item.source,
+        date=item.date,
+        start_time=item.start_time,
+        end_time=item.end_time,
+        summary=item.summary,
+        subject=item.subject,
+        type=item.type,
+        teacher=item.teacher,
+        room=item.room,
+        last_sync=LectureSyncInfo(
+            job_id=item.last_sync_job_id,
+            status=item.last_sync_status,
+            date=item.last_sync_completed_at
+        ) if item.last_sync_job_id else None
+    )
+
+async def _render_listing(db: AsyncSession, filters: LectureFilter, page: int, size: int, cursor: Optional[str], with_total: bool) -> LectureListResponse:
+    if cursor is not None:
+        try:
+            items, next_cursor, total = await lecture_service.get_lectures_after_async(
+                db, cursor=cursor, limit=size, with_total=with_total, filters=filters
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        return LectureListResponse(
+            items=[_to_response(item) for item in items],
+            total=total,
+            size=size,
+            next_cursor=next_cursor
+        )
 
-@router.get("/", response_model=LectureListResponse)
-def get_lectures(
-    page: int = Query(1, ge=1),
-    size: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
-):
     skip = (page - 1) * size
-    items, total = lecture_service.get_lectures(db, skip=skip, limit=size)
-    
+    items, total = await lecture_service.get_lectures_async(db, skip=skip, limit=size, filters=filters)
+    has_next = bool(items) and skip + len(items) < total
+
     return LectureListResponse(
-        items=[
-            LectureResponse(
-                id=item.id,
-                date=item.date,
-                start_time=item.start_time,
-                end_time=item.end_time,
-                summary=item.summary,
-                subject=item.subject,
-                type=item.type,
-                teacher=item.teacher,
-                room=item.room,
-                last_sync=LectureSyncInfo(
-                    job_id=item.last_sync.id,
-                    status=item.last_sync.status,
-                    date=item.last_sync.completed_at
-                ) if item.last_sync else None
-
-
-            ) for item in items
-        ],
+        items=[_to_response(item) for item in items],
         total=total,
         page=page,
-        size=size
+        size=size,
+        next_cursor=lecture_service.encode_cursor(items[-1]) if has_next else None
     )
+
+@router.get("/", response_model=LectureListResponse)
+async def get_lectures(
+    request: Request,
+    filters: LectureFilter = Depends(),
+    page: int = Query(1, ge=1),
+    size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque `next_cursor` of a previous page. Switches to keyset pagination."),
+    with_total: bool = Query(False, description="Count all matching lectures in keyset mode."),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # The generation is read before the page, so a cached page is never older than its generation
+    generation = await generation_service.get_async(db)
+    etag = http_cache.lectures_etag(generation)
+    if http_cache.is_not_modified(request, etag):
+        return http_cache.not_modified_response(etag)
+
+    cache_key = (etag, tuple(sorted(request.query_params.multi_items())))
+    body = lectures_cache.get(generation, cache_key)
+    if body is None:
+        listing = await _render_listing(db, filters, page, size, cursor, with_total)
+        body = listing.model_dump_json().encode()
+        lectures_cache.put(generation, cache_key, body)
+
+    response = Response(content=body, media_type="application/json")
+    http_cache.set_cache_headers(response, etag)
+    return response
+
+
+@router.get("/export")
+async def export_lectures(
+    request: Request,
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    changed_since_job: Optional[str] = Query(None, description="Only lectures changed after the changes of this job."),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Streams every matching lecture, including past and cancelled ones, as NDJSON or CSV."""
+    changed_after_seq = None
+    if changed_since_job:
+        job = await job_service.get_job_status_async(db, changed_since_job)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        changed_after_seq = await export_service.last_seq_of_job_async(db, job)
+
+    rows = export_service.iter_lectures(date_from=date_from, date_to=date_to, changed_after_seq=changed_after_seq)
+    if format == "csv":
+        chunks, media_type = export_service.to_csv(rows, EXPORT_COLUMNS), "text/csv; charset=utf-8"
+    else:
+        chunks, media_type = export_service.to_ndjson(rows), "application/x-ndjson"
+
+    headers = {"Content-Disposition": f'attachment; filename="lectures.{format}"', "Vary": "Accept-Encoding"}
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        chunks = export_service.gzip(chunks)
+        headers["Content-Encoding"] = "gzip"
+
+    # A sync iterator is consumed in the threadpool, so the blocking cursor never stalls the event loop
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
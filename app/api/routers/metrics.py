@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.services.metrics_service import metrics_service
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics(db: Session = Depends(get_db)):
+    """Sync job metrics in the Prometheus text format."""
+    return PlainTextResponse(metrics_service.render(db), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, HTTPException
+from app.config import config
+from app.services.replay_service import replay_service
+from app.schemas.replay import ReplayRequest, ReplayResponse
+
+router = APIRouter()
+
+@router.post("/", response_model=ReplayResponse)
+async def replay_snapshots(request: ReplayRequest):
+    """Replays workbook snapshots from REPLAY_SNAPSHOT_DIR through parse, diff and enrichment against a scratch database, and reports the would-be changes."""
+    if not config.REPLAY_SNAPSHOT_DIR:
+        raise HTTPException(status_code=404, detail="Replay is disabled, set REPLAY_SNAPSHOT_DIR to enable it")
+    try:
+        paths = replay_service.resolve(request.paths)
+        report = await replay_service.run(paths, source=request.source, as_of=request.as_of, enrich=request.enrich)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return ReplayResponse(**report)
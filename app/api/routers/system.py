@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.config import config
+from app.database import get_db
+from app.models.probe_state import ProbeState
+from app.models.source_state import SourceState
+from app.services.response_cache import lectures_cache
+from app.services.source_registry import source_registry
+from app.schemas.system import CacheStatsResponse, ProbeStateResponse
+from app.schemas.sources import SourceStateResponse
+
+router = APIRouter()
+
+@router.get("/cache", response_model=CacheStatsResponse)
+async def get_cache_stats():
+    """Returns the lectures response cache statistics of the worker that serves the request."""
+    return CacheStatsResponse(**lectures_cache.stats())
+
+@router.get("/probe", response_model=list[ProbeStateResponse])
+def get_probe_state(db: Session = Depends(get_db)):
+    """Returns the state of the adaptive change probe of each source."""
+    items = []
+    for source in source_registry.all():
+        state = db.get(ProbeState, source.name)
+        items.append(ProbeStateResponse(
+            source=source.name,
+            mode=config.SYNC_SCHEDULE_MODE,
+            interval_seconds=state.interval_seconds if state else None,
+            next_probe_at=state.next_probe_at if state else None,
+            last_probe_at=state.last_probe_at if state else None,
+            last_change_at=state.last_change_at if state else None,
+            last_result=state.last_result if state else None,
+            sheet_url=state.sheet_url if state else None
+        ))
+    return items
+
+@router.get("/sources", response_model=list[SourceStateResponse])
+def get_sources(db: Session = Depends(get_db)):
+    """Lists the schedule sources with the outcome of their last sync."""
+    items = []
+    for source in source_registry.all():
+        state = db.get(SourceState, source.name)
+        items.append(SourceStateResponse(
+            name=source.name,
+            url=source.url,
+            sheet_url=state.sheet_url if state else None,
+            last_job_id=state.last_job_id if state else None,
+            last_synced_at=state.last_synced_at if state else None,
+            last_status=state.last_status if state else None,
+            last_message=state.last_message if state else None
+        ))
+    return items
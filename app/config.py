@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,7 +11,15 @@ class Config:
     PK_SHEET_REGEX = os.getenv("PK_SHEET_REGEX")
     PK_SCHEDULE_URL = os.getenv("PK_SCHEDULE_URL")
 
+    SCHEDULE_SOURCES_FILE = os.getenv("SCHEDULE_SOURCES_FILE") # JSON list of sources, see docs/API.md
+    SYNC_SOURCE_CONCURRENCY = int(os.getenv("SYNC_SOURCE_CONCURRENCY", 4))
+
     SYNC_SCHEDULE = os.getenv("SYNC_SCHEDULE")
+    SYNC_SCHEDULE_MODE = os.getenv("SYNC_SCHEDULE_MODE", "cron") # cron | adaptive
+    PROBE_MIN_INTERVAL_SECONDS = int(os.getenv("PROBE_MIN_INTERVAL_SECONDS", 60))
+    PROBE_MAX_INTERVAL_SECONDS = int(os.getenv("PROBE_MAX_INTERVAL_SECONDS", 6 * 3600))
+    PROBE_CHANGE_WINDOW_HOURS = os.getenv("PROBE_CHANGE_WINDOW_HOURS", "7-18") # local hours, e.g. "7-18" or "7-10,14-18"
+    PROBE_WINDOW_MAX_INTERVAL_SECONDS = int(os.getenv("PROBE_WINDOW_MAX_INTERVAL_SECONDS", 900))
     SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
     SLACK_CHANNEL = os.getenv("SLACK_CHANNEL")
     SLACK_CHANNEL_JOB_STATUS = os.getenv("SLACK_CHANNEL_JOB_STATUS")
@@ -18,6 +27,32 @@ class Config:
     GOOGLE_CALENDAR_ID = os.getenv("GOOGLE_CALENDAR_ID")
     GOOGLE_SERVICE_ACCOUNT_FILE = os.getenv("GOOGLE_SERVICE_ACCOUNT_FILE")
 
+    SYNC_LEASE_TTL_SECONDS = int(os.getenv("SYNC_LEASE_TTL_SECONDS", 60))
+    SCHEDULER_LEASE_TTL_SECONDS = int(os.getenv("SCHEDULER_LEASE_TTL_SECONDS", 30))
+    SYNC_LEASE_WAIT_INTERVAL = float(os.getenv("SYNC_LEASE_WAIT_INTERVAL", 0.5)) # recheck of a lease held by a finished job
+
+    SYNC_EXECUTION_MODE = os.getenv("SYNC_EXECUTION_MODE", "inline") # inline | worker
+    WORKER_POLL_INTERVAL = float(os.getenv("WORKER_POLL_INTERVAL", 2))
+
+    JOB_MAX_CONCURRENCY = int(os.getenv("JOB_MAX_CONCURRENCY", 1))
+    JOB_CANCEL_POLL_INTERVAL = float(os.getenv("JOB_CANCEL_POLL_INTERVAL", 2))
+    JOB_DRAIN_TIMEOUT_SECONDS = float(os.getenv("JOB_DRAIN_TIMEOUT_SECONDS", 20))
+    JOB_RECOVERY_MODE = os.getenv("JOB_RECOVERY_MODE", "fail") # fail | requeue
+    JOB_RETRY_ATTEMPTS = int(os.getenv("JOB_RETRY_ATTEMPTS", 2)) # automatic retries of a failed job, 0 disables them
+    JOB_RETRY_DELAY_SECONDS = float(os.getenv("JOB_RETRY_DELAY_SECONDS", 30)) # doubles with every retry
+    JOB_CHECKPOINT_RETENTION_HOURS = int(os.getenv("JOB_CHECKPOINT_RETENTION_HOURS", 72))
+    REPLAY_SNAPSHOT_DIR = os.getenv("REPLAY_SNAPSHOT_DIR") # workbooks POST /replay may read, unset disables it
+    REPLAY_TIMEOUT_SECONDS = float(os.getenv("REPLAY_TIMEOUT_SECONDS", 600))
+    SHEET_PARSE_TIMEOUT_SECONDS = float(os.getenv("SHEET_PARSE_TIMEOUT_SECONDS", 120))
+
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 8 * 1024 * 1024))
+    JOB_EVENTS_POLL_INTERVAL = float(os.getenv("JOB_EVENTS_POLL_INTERVAL", 0.5))
+    JOB_EVENTS_RETENTION_HOURS = int(os.getenv("JOB_EVENTS_RETENTION_HOURS", 24))
+    SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", 15))
+
+    ICS_CACHE_DIR = os.getenv("ICS_CACHE_DIR", os.path.join(tempfile.gettempdir(), "pk-schedule-sync", "ics"))
+    ICS_STALE_GRACE_SECONDS = int(os.getenv("ICS_STALE_GRACE_SECONDS", 600)) # superseded feeds may still be streaming
+
     LECTURE_SHORTCUTS = {   
         # lectures
         "ZTBD": "Zaawansowane Technologie Baz Danych",
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+from sqlalchemy import select
+from app.config import config
+from app.database import SessionLocal
+from app.models.jobs import Job
+
+logger = logging.getLogger(__name__)
+
+class JobExecutor:
+    """
+    Runs the background jobs of this process. Keeps a registry of their tasks, caps how many run
+    at once (the rest wait in FIFO order), cancels them on request and drains them on shutdown.
+    Cancellations requested through another worker are picked up from Job.cancel_requested.
+    """
+    def __init__(self, max_concurrency: int, cancel_poll_interval: float):
+        self.max_concurrency = max_concurrency
+        self.cancel_poll_interval = cancel_poll_interval
+        self._tasks: dict = {}
+        self._cancel_reasons: dict = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._watcher: Optional[asyncio.Task] = None
+
+    def submit(self, job_id: str, run: Callable[[], Awaitable], on_cancelled_queued: Optional[Callable[[str], None]] = None) -> asyncio.Task:
+        """
+        Runs run() once a slot is free. on_cancelled_queued(job_id) is called instead if the job is cancelled
+        while it waits for a slot, as run() never gets to record that.
+        """
+        if self._semaphore is None:
+            # Created lazily, so it binds to the event loop of the worker process
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        task = asyncio.create_task(self._run(job_id, run, on_cancelled_queued))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._forget(job_id))
+
+        if self._watcher is None:
+            self._watcher = asyncio.create_task(self._watch_cancellations())
+        return task
+
+    async def _run(self, job_id: str, run: Callable[[], Awaitable], on_cancelled_queued: Optional[Callable[[str], None]]):
+        try:
+            if self._semaphore.locked():
+                logger.info(f"Job {job_id} queued, {self.max_concurrency} job(s) already running.")
+            await self._semaphore.acquire()
+        except asyncio.CancelledError:
+            logger.info(f"Job {job_id} cancelled before it started.")
+            if on_cancelled_queued:
+                on_cancelled_queued(job_id)
+            raise
+        try:
+            await run()
+        finally:
+            self._semaphore.release()
+
+    def _forget(self, job_id: str):
+        self._tasks.pop(job_id, None)
+        self._cancel_reasons.pop(job_id, None)
+
+    def has_capacity(self) -> bool:
+        return len(self._tasks) < self.max_concurrency
+
+    def is_running(self, job_id: str) -> bool:
+        return job_id in self._tasks
+
+    def cancel(self, job_id: str, reason: str = "Cancelled by user.") -> bool:
+        task = self._tasks.get(job_id)
+        if not task or task.done():
+            return False
+        self._cancel_reasons[job_id] = reason
+        task.cancel()
+        return True
+
+    def cancel_reason(self, job_id: str) -> Optional[str]:
+        return self._cancel_reasons.get(job_id)
+
+    async def _watch_cancellations(self):
+        while self._tasks:
+            await asyncio.sleep(self.cancel_poll_interval)
+            job_ids = list(self._tasks)
+            if not job_ids:
+                continue
+            db = SessionLocal()
+            try:
+                requested = db.execute(
+                    select(Job.id).where(Job.id.in_(job_ids), Job.cancel_requested == 1)
+                ).scalars().all()
+            except Exception as e:
+                logger.warning(f"Failed to check for job cancellations: {e}")
+                requested = []
+            finally:
+                db.close()
+            for job_id in requested:
+                if self.cancel(job_id):
+                    logger.info(f"Job {job_id} cancelled on request.")
+        self._watcher = None
+
+    async def drain(self, timeout: float) -> list:
+        """
+        Lets running jobs finish for up to `timeout` seconds, then cancels the rest.
+        Returns the ids of the jobs that had to be cancelled.
+        """
+        tasks = list(self._tasks.items())
+        if not tasks:
+            return []
+
+        logger.info(f"Draining {len(tasks)} background job(s), waiting up to {timeout}s...")
+        await asyncio.wait([task for _, task in tasks], timeout=timeout)
+
+        interrupted = [job_id for job_id, task in tasks if self.cancel(job_id, reason="Interrupted by shutdown.")]
+        if interrupted:
+            # Give the cancelled jobs a moment to record their final state
+            await asyncio.wait([task for job_id, task in tasks if job_id in interrupted], timeout=5)
+            logger.warning(f"Cancelled {len(interrupted)} job(s) still running at shutdown: {interrupted}")
+        return interrupted
+
+job_executor = JobExecutor(max_concurrency=config.JOB_MAX_CONCURRENCY, cancel_poll_interval=config.JOB_CANCEL_POLL_INTERVAL)
@@ -0,0 +1,229 @@
+import asyncio
+import io
+import logging
+import multiprocessing
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional
+from app.config import config
+from app.services.timing_service import timing_service
+from app.services.profiling_service import profiling_service, profile_call
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Domyślny układ (grupa DS1): Q (16) = Data, R (17) = Start, S (18) = Koniec, T (19) = DS1
+DEFAULT_LAYOUT = {"date": 16, "start": 17, "end": 18, "content": 19, "skip_values": ["nan", "ds1", "przedmiot"]}
+
+def _retrieve_schedule_from_sheet(df: "pd.DataFrame", layout: dict = None, since: datetime = None):
+    """
+    Ekstrahuje plan zajęć jednej grupy według układu kolumn źródła (domyślnie DS1).
+    Pomija zajęcia sprzed since (domyślnie sprzed dzisiaj).
+    """
+    layout = layout or DEFAULT_LAYOUT
+    # Indeksy kolumn (liczone od 0)
+    COL_DATE = layout["date"]
+    COL_START = layout["start"]
+    COL_END = layout["end"]
+    COL_DS1 = layout["content"]
+    skip_values = set(layout["skip_values"])
+
+    # 1. Naprawa scalonych komórek dla Daty i obu kolumn Czasu
+    # Używamy .iloc, aby uniknąć KeyError (odwołujemy się do pozycji)
+    df.iloc[:, COL_DATE] = df.iloc[:, COL_DATE].ffill()
+    df.iloc[:, COL_START] = df.iloc[:, COL_START].ffill()
+    df.iloc[:, COL_END] = df.iloc[:, COL_END].ffill()
+
+    today = since or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    future_events = []
+
+    for i in range(len(df)):
+        # Pobieramy treść zajęć dla DS1
+        cell_content = str(df.iat[i, COL_DS1]).strip()
+
+        # Filtrujemy puste komórki i nagłówki
+        if not cell_content or cell_content.lower() in skip_values:
+            continue
+
+        clean_text = re.sub(r'\s+', ' ', cell_content).strip()
+
+        # Jeśli po wyczyszczeniu komórka jest pusta (były same spacje), pomijamy
+        if not clean_text:
+            continue
+
+        raw_date_val = df.iat[i, COL_DATE]
+
+        time_cell = str(df.iat[i, COL_START]).strip()
+
+        start_t = 'nan'
+        end_t = 'nan'
+
+        if time_cell != 'nan':
+            try:
+                parts = [t.strip() for t in time_cell.split('-')]
+                if len(parts) >= 2:
+                    # Normalize to HH:MM
+                    def normalize_time(t):
+                        t = t.strip()
+                        if ':' in t:
+                            h, m = t.split(':')
+                            return f"{int(h):02d}:{int(m):02d}"
+                        return t
+
+                    start_t = normalize_time(parts[0])
+                    end_t = normalize_time(parts[1])
+            except Exception as te:
+                logger.warning(f"Error parsing time cell '{time_cell}': {str(te)}")
+
+        try:
+            # 2. Parsowanie DATY
+            if isinstance(raw_date_val, str):
+                # Obsługa formatów typu "sobota 10/4/25" -> bierzemy tylko 10/4/25
+                date_part = raw_date_val.split()[-1]
+                event_date = datetime.strptime(date_part, '%d/%m/%y')
+            elif isinstance(raw_date_val, datetime):
+                event_date = raw_date_val
+            else:
+                continue
+
+            # 3. FILTROWANIE: tylko od dzisiaj wzwyż
+            if event_date < today:
+                continue
+
+            event = {
+                "date": event_date.strftime('%Y-%m-%d'),
+                "start_time": start_t,
+                "end_time": end_t,
+                "summary": clean_text
+            }
+
+            future_events.append(event)
+
+        except Exception as e:
+            # Logujemy błąd dla konkretnego wiersza, ale idziemy dalej
+            continue
+
+    return future_events
+
+def parse_sheet(sheet_content: bytes, layout: dict = None, since: datetime = None) -> dict:
+    """
+    Loads the downloaded sheet and extracts the events from since (default today) on, timing both steps.
+    Runs in the parser process: only the compact list of event dicts crosses back, never the DataFrame.
+    """
+    # Imported here, so only the parser process loads pandas, never the web workers
+    import pandas as pd
+
+    started = time.perf_counter()
+    # xlrd for .xls, openpyxl for .xlsx
+    df = pd.read_excel(io.BytesIO(sheet_content), header=None)
+    loaded = time.perf_counter()
+    logger.info(f"Successfully loaded sheet into memory. Shape: {df.shape}")
+    events = _retrieve_schedule_from_sheet(df, layout, since)
+    return {
+        "events": events,
+        "rows": len(df),
+        "read_excel_seconds": loaded - started,
+        "extract_seconds": time.perf_counter() - loaded
+    }
+
+def _profiled_parse_sheet(sheet_content: bytes, layout: dict = None, since: datetime = None) -> dict:
+    """
+    parse_sheet of a profiled job: the profile of the parse travels back with the result.
+    """
+    result, profile = profile_call(parse_sheet, sheet_content, layout, since)
+    result["profile"] = profile
+    return result
+
+def _warm_up():
+    """
+    Pool initializer: pays for the heavy imports once per process, not on every parse.
+    """
+    import openpyxl  # noqa: F401
+    import pandas  # noqa: F401
+    import xlrd  # noqa: F401
+
+def _ping() -> bool:
+    return True
+
+class SheetParserPool:
+    """
+    Runs parse_sheet in dedicated, preloaded processes, so parsing a large sheet never blocks
+    the event loop that also serves HTTP requests. The processes are spawned on the first parse, so only
+    the process that actually runs syncs pays for them, not every web worker.
+    A parse that exceeds its timeout gets the pool killed, parses of other sources caught in it are retried once
+    on a fresh pool.
+    """
+    def __init__(self, max_workers: int = 1):
+        self.max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._warming: list = []
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: never fork a process that holds the event loop, DB connections and client sockets
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_up
+            )
+            # One ping per process spawns them all and runs their imports right away, before any parse is timed
+            self._warming = [self._pool.submit(_ping) for _ in range(self.max_workers)]
+        return self._pool
+
+    async def _wait_warm(self, warm_up: list):
+        # Shielded: a cancelled parse must not cancel the warm-up other parses wait for
+        await asyncio.gather(*(asyncio.shield(asyncio.wrap_future(future)) for future in warm_up))
+
+    async def ready(self):
+        """
+        Waits until the parser processes have started and preloaded their imports.
+        """
+        self._get_pool()
+        await self._wait_warm(self._warming)
+
+    def _discard(self, pool: Optional[ProcessPoolExecutor]):
+        if pool is None:
+            return
+        if self._pool is pool:
+            self._pool = None
+        # ProcessPoolExecutor has no public way to kill a busy worker
+        for process in list((pool._processes or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def parse(self, sheet_content: bytes, timeout: float, layout: dict = None, source: str = None, since: datetime = None) -> list:
+        loop = asyncio.get_running_loop()
+        target = _profiled_parse_sheet if profiling_service.active() else parse_sheet
+        for attempt in (1, 2):
+            pool = self._get_pool()
+            try:
+                # The timeout covers the parse only, not the start-up of a fresh pool
+                await self._wait_warm(self._warming)
+                result = await asyncio.wait_for(
+                    loop.run_in_executor(pool, target, sheet_content, layout, since),
+                    timeout=timeout
+                )
+                if "profile" in result:
+                    profiling_service.add_parser_profile(result.pop("profile"))
+                timing_service.record("read_excel", result["read_excel_seconds"], source=source, bytes=len(sheet_content))
+                timing_service.record("extract", result["extract_seconds"], source=source, rows=result["rows"], events=len(result["events"]))
+                return result["events"]
+            except asyncio.TimeoutError:
+                logger.error(f"Sheet parsing exceeded {timeout}s, killing the parser process.")
+                self._discard(pool)
+                raise TimeoutError(f"Sheet parsing timed out after {timeout}s.")
+            except BrokenProcessPool:
+                self._discard(pool)
+                if attempt == 2:
+                    raise
+                logger.warning("Parser process stopped during the parse, retrying on a fresh one.")
+
+    def shutdown(self):
+        self._discard(self._pool)
+
+sheet_parser_pool = SheetParserPool(max_workers=config.SYNC_SOURCE_CONCURRENCY)
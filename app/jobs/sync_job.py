@@ -1,175 +1,182 @@
 import logging
-import httpx
-import pandas as pd
-import io
-import re
 import asyncio
+import hashlib
+import json
+import time
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from bs4 import BeautifulSoup
 from app.config import config
 from app.models.jobs import Job
 from app.models.lectures import Lecture
+from app.models.lecture_changes import LectureChange
+from app.models.source_state import SourceState
+from app.models.types import normalize_time
+from app.jobs.sheet_parser import sheet_parser_pool
+from app.schemas.sources import ScheduleSource
 from app.services.ai_service import ai_service
+from app.services.checkpoint_service import checkpoint_service, COMMITTED, ENRICHMENT_PREFIX
+from app.services.generation_service import generation_service
+from app.services.event_service import event_service
+from app.services.timing_service import timing_service
+from app.services.source_registry import source_registry, DEFAULT_SOURCE
 from app.database import SessionLocal
 from urllib.parse import urljoin
 from datetime import datetime
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import httpx
 
 
 logger = logging.getLogger(__name__)
 
 
-async def _get_sheet_link(client: httpx.AsyncClient) -> str:
+def find_sheet_link(page_html: str, source: ScheduleSource) -> Optional[str]:
     """
-    Scrapes the PK schedule page to find the link to the sheet.
+    Finds the link to the sheet on the schedule page of a source.
     """
-    logger.info(f"Scraping PK schedule page: {config.PK_SCHEDULE_URL}")
-    response = await client.get(config.PK_SCHEDULE_URL)
-    response.raise_for_status()
-    
-    soup = BeautifulSoup(response.text, 'html.parser')
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(page_html, 'html.parser')
     page_title = soup.title.string if soup.title else "No Title"
     logger.info(f"Successfully scraped page. Title: {page_title}")
 
     sheet_link = None
     for a in soup.find_all('a', href=True):
-        if config.PK_SHEET_REGEX in a['href'].upper():
+        if source.sheet_regex in a['href'].upper():
             sheet_link = a['href']
             break
     
+    if sheet_link and not sheet_link.startswith('http'):
+        sheet_link = urljoin(source.url, sheet_link)
+    return sheet_link
+
+async def _get_sheet_link(client: "httpx.AsyncClient", source: ScheduleSource) -> str:
+    """
+    Scrapes the schedule page of a source to find the link to the sheet.
+    """
+    import httpx
+
+    logger.info(f"Scraping schedule page of {source.name}: {source.url}")
+    try:
+        response = await client.get(source.url)
+        response.raise_for_status()
+    except httpx.HTTPError:
+        timing_service.error("page")
+        raise
+
+    sheet_link = find_sheet_link(response.text, source)
     if sheet_link:
-        if not sheet_link.startswith('http'):
-            sheet_link = urljoin(config.PK_SCHEDULE_URL, sheet_link)
         logger.info(f"Found sheet link: {sheet_link}")
         return sheet_link
     
-    logger.warning(f"Could not find a link containing regex: {config.PK_SHEET_REGEX}")
+    logger.warning(f"Could not find a link containing regex: {source.sheet_regex}")
     raise Exception("Sheet link not found.")
 
-def _is_link_changed(db: Session, job_id: str, sheet_link: str) -> bool:
+def last_synced_sheet_link(db: Session, source: str = DEFAULT_SOURCE, job_id: str = None) -> Optional[str]:
     """
-    Checks if the sheet link has changed since the last successful sync.
+    Sheet link of the last successful sync of a source, other than the given job.
     """
-    last_successful_job = db.query(Job).filter(
-        Job.status == "completed",
-        Job.id != job_id
-    ).order_by(Job.completed_at.desc()).first()
-    
-    if last_successful_job and last_successful_job.sheet_url == sheet_link:
+    state = db.get(SourceState, source)
+    if state:
+        return state.sheet_url
+    if source != DEFAULT_SOURCE:
+        return None
+
+    # Synced before per-source state existed: the last successful job tells
+    query = db.query(Job).filter(Job.status == "completed")
+    if job_id:
+        query = query.filter(Job.id != job_id)
+    last_successful_job = query.order_by(Job.completed_at.desc()).first()
+    return last_successful_job.sheet_url if last_successful_job else None
+
+def _is_link_changed(db: Session, job_id: str, sheet_link: str, source: str = DEFAULT_SOURCE) -> bool:
+    """
+    Checks if the sheet link has changed since the last successful sync of the source.
+    """
+    if last_synced_sheet_link(db, source, job_id) == sheet_link:
         logger.info("Sheet link has not changed since the last successful sync.")
         return False
     
     logger.info("Sheet link has changed or this is the first successful sync.")
     return True
 
-async def _download_sheet(client: httpx.AsyncClient, sheet_url: str) -> bytes:
+async def _download_sheet(client: "httpx.AsyncClient", sheet_url: str) -> bytes:
     """
     Downloads the sheet file content as bytes.
     """
+    import httpx
+
     logger.info(f"Downloading sheet from: {sheet_url}")
-    response = await client.get(sheet_url)
-    response.raise_for_status()
+    try:
+        response = await client.get(sheet_url)
+        response.raise_for_status()
+    except httpx.HTTPError:
+        timing_service.error("sheet")
+        raise
     return response.content
 
-def _retrieve_schedule_from_sheet(df: pd.DataFrame):
+def _lecture_to_dict(l: Lecture) -> dict:
     """
-    Ekstrahuje plan zajęć dla grupy DS1.
-    Układ: Q (16) = Data, R (17) = Start, S (18) = Koniec, T (19) = DS1
+    Plain snapshot of a lecture, used for notifications and the change log (avoids session issues).
     """
-    # Indeksy kolumn (liczone od 0)
-    COL_DATE = 16  # Q
-    COL_START = 17 # R
-    COL_END = 18   # S
-    COL_DS1 = 19   # T
-    
-    # 1. Naprawa scalonych komórek dla Daty i obu kolumn Czasu
-    # Używamy .iloc, aby uniknąć KeyError (odwołujemy się do pozycji)
-    df.iloc[:, COL_DATE] = df.iloc[:, COL_DATE].ffill()
-    df.iloc[:, COL_START] = df.iloc[:, COL_START].ffill()
-    df.iloc[:, COL_END] = df.iloc[:, COL_END].ffill()
-
-    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    future_events = []
-
-    for i in range(len(df)):
-        # Pobieramy treść zajęć dla DS1
-        cell_content = str(df.iat[i, COL_DS1]).strip()
-        
-        # Filtrujemy puste komórki i nagłówki
-        if not cell_content or cell_content.lower() in ["nan", "ds1", "przedmiot"]:
-            continue
-            
-        clean_text = re.sub(r'\s+', ' ', cell_content).strip()
-        
-        # Jeśli po wyczyszczeniu komórka jest pusta (były same spacje), pomijamy
-        if not clean_text:
-            continue
+    return {
+        "source": l.source,
+        "date": l.date,
+        "start_time": l.start_time,
+        "end_time": l.end_time,
+        "subject": l.subject,
+        "summary": l.summary,
+        "room": l.room,
+        "teacher": l.teacher,
+        "type": l.type,
+        "is_cancelled": l.is_cancelled
+    }
 
-        raw_date_val = df.iat[i, COL_DATE]
-        
-        time_cell = str(df.iat[i, COL_START]).strip()
-        
-        start_t = 'nan'
-        end_t = 'nan'
-        
-        if time_cell != 'nan':
-            try:
-                parts = [t.strip() for t in time_cell.split('-')]
-                if len(parts) >= 2:
-                    # Normalize to HH:MM
-                    def normalize_time(t):
-                        t = t.strip()
-                        if ':' in t:
-                            h, m = t.split(':')
-                            return f"{int(h):02d}:{int(m):02d}"
-                        return t
-                    
-                    start_t = normalize_time(parts[0])
-                    end_t = normalize_time(parts[1])
-            except Exception as te:
-                logger.warning(f"Error parsing time cell '{time_cell}': {str(te)}")
-
-        try:
-            # 2. Parsowanie DATY
-            if isinstance(raw_date_val, str):
-                # Obsługa formatów typu "sobota 10/4/25" -> bierzemy tylko 10/4/25
-                date_part = raw_date_val.split()[-1]
-                event_date = datetime.strptime(date_part, '%d/%m/%y')
-            elif isinstance(raw_date_val, datetime):
-                event_date = raw_date_val
-            else:
-                continue
-
-            # 3. FILTROWANIE: tylko od dzisiaj wzwyż
-            if event_date < today:
-                continue
-
-            event = {
-                "date": event_date.strftime('%Y-%m-%d'),
-                "start_time": start_t,
-                "end_time": end_t,
-                "summary": clean_text
-            }
-            
-            future_events.append(event)
-    
-        except Exception as e:
-            # Logujemy błąd dla konkretnego wiersza, ale idziemy dalej
-            continue
+def _record_source_state(db: Session, source: str, job_id: str, status: str, message: str, sheet_url: str = None):
+    """
+    Updates the sync state of a source, in the caller's transaction. The sheet link only moves on success.
+    """
+    state = db.get(SourceState, source)
+    if not state:
+        state = SourceState(name=source)
+        db.add(state)
+    if sheet_url:
+        state.sheet_url = sheet_url
+    state.last_job_id = job_id
+    state.last_synced_at = datetime.utcnow()
+    state.last_status = status
+    state.last_message = message
+
+def _enrichment_fingerprint(to_enrich: list) -> str:
+    """
+    Identifies what the diff sends to enrichment. Enriched batches of an earlier attempt are only reused
+    when it is unchanged, i.e. no other sync has touched these lectures in between.
+    """
+    return hashlib.sha256(json.dumps([item["raw_text"] for item in to_enrich], ensure_ascii=False).encode()).hexdigest()
 
-    return future_events
+def _completed_batches(checkpoints: dict) -> dict:
+    return {
+        int(stage[len(ENRICHMENT_PREFIX):]): items
+        for stage, items in checkpoints.items() if stage.startswith(ENRICHMENT_PREFIX)
+    }
 
-async def _sync_lectures_to_db(db: Session, job_id: str, schedule: list, sheet_url: str = None):
+async def _sync_lectures_to_db(db: Session, job_id: str, schedule: list, sheet_url: str = None, source: str = DEFAULT_SOURCE, progress_prefix: str = "", checkpoints: dict = None, enrich: bool = True):
     """
-    Synchronizes extracted schedule events with the database.
+    Synchronizes extracted schedule events of one source with the database.
     Handles Added, Updated, and Deleted (Cancelled) cases.
+    checkpoints are those of an earlier attempt of the job, see checkpoint_service.
+    enrich=False leaves the AI fields of new and changed lectures empty (used by the offline replay).
     """
     if not schedule:
-        logger.info("Sync completed: No events found in sheet.")
-        return {"message": "No events found.", "added": [], "updated": [], "deleted": [], "sheet_url": sheet_url}
+        logger.info(f"Sync of {source} completed: No events found in sheet.")
+        return {"source": source, "message": "No events found.", "added": [], "updated": [], "deleted": [], "sheet_url": sheet_url}
+
+    diff_started = time.perf_counter()
 
-    # 1. Get existing lectures for the dates in the schedule to compare
+    # 1. Get existing lectures of this source for the dates in the schedule to compare
     schedule_dates = list(set(event['date'] for event in schedule))
-    existing_lectures = db.query(Lecture).filter(Lecture.date.in_(schedule_dates)).all()
+    existing_lectures = db.query(Lecture).filter(Lecture.source == source, Lecture.date.in_(schedule_dates)).all()
     
     # Create a lookup map: (date, start, end) -> Lecture
     lookup = { (l.date, l.start_time, l.end_time): l for l in existing_lectures }
@@ -179,12 +186,15 @@ async def _sync_lectures_to_db(db: Session, job_id: str, schedule: list, sheet_u
     deleted_lectures = []
     
     seen_keys = set()
-    to_enrich = [] # List for AI: {"id": lecture_id, "raw_text": summary}
+    to_enrich = [] # List for AI: {"id": position, "raw_text": summary}; positions are stable across attempts
     sync_id_map = {} # Track items for enrichment enrichment
+    old_values = {} # Snapshots before modification, for the change log
     
     # Second pass: Process events from the sheet
     for event in schedule:
-        key = (event['date'], event['start_time'], event['end_time'])
+        # Stored the way the typed columns read back, so keys of existing and incoming lectures compare equal
+        start_time, end_time = normalize_time(event['start_time']), normalize_time(event['end_time'])
+        key = (event['date'], start_time, end_time)
         seen_keys.add(key)
         existing_lecture = lookup.get(key)
         
@@ -193,6 +203,8 @@ async def _sync_lectures_to_db(db: Session, job_id: str, schedule: list, sheet_u
             was_cancelled = existing_lecture.is_cancelled == 1
             
             if is_changed or was_cancelled:
+                old_values[id(existing_lecture)] = _lecture_to_dict(existing_lecture)
+
                 # Update details
                 existing_lecture.summary = event['summary']
                 existing_lecture.is_cancelled = 0 # Ensure it's active
@@ -205,40 +217,66 @@ async def _sync_lectures_to_db(db: Session, job_id: str, schedule: list, sheet_u
                 existing_lecture.room = None
                 
                 updated_lectures.append(existing_lecture)
-                sync_id_map[id(existing_lecture)] = existing_lecture
-                to_enrich.append({"id": id(existing_lecture), "raw_text": event['summary']})
+                sync_id_map[len(to_enrich)] = existing_lecture
+                to_enrich.append({"id": len(to_enrich), "raw_text": event['summary']})
             else:
                 # No change, just update sync ID
                 existing_lecture.last_sync_id = job_id
         else:
             # New event
             new_lecture = Lecture(
+                source=source,
                 date=event['date'],
-                start_time=event['start_time'],
-                end_time=event['end_time'],
+                start_time=start_time,
+                end_time=end_time,
                 summary=event['summary'],
                 last_sync_id=job_id,
                 is_cancelled=0
             )
             db.add(new_lecture)
             added_lectures.append(new_lecture)
-            sync_id_map[id(new_lecture)] = new_lecture
-            to_enrich.append({"id": id(new_lecture), "raw_text": event['summary']})
+            sync_id_map[len(to_enrich)] = new_lecture
+            to_enrich.append({"id": len(to_enrich), "raw_text": event['summary']})
 
     # Third pass: Handle deletions
     # Any lecture in DB for these dates that wasn't in the sheet should be marked cancelled
     for l in existing_lectures:
         key = (l.date, l.start_time, l.end_time)
         if key not in seen_keys and l.is_cancelled == 0:
+            old_values[id(l)] = _lecture_to_dict(l)
             l.is_cancelled = 1
             l.last_sync_id = job_id
             deleted_lectures.append(l)
 
-    db.flush()
-    
+    timing_service.record("diff", time.perf_counter() - diff_started, source=source, events=len(schedule))
+
+    # Batches enriched by an earlier attempt are reused if the diff is still the same
+    checkpoints = checkpoints or {}
+    fingerprint = _enrichment_fingerprint(to_enrich)
+    completed = {}
+    if checkpoints.get("diff", {}).get("fingerprint") == fingerprint:
+        completed = _completed_batches(checkpoints)
+    else:
+        if "diff" in checkpoints:
+            logger.info(f"{source}: the diff changed since the previous attempt, enriching from scratch.")
+            checkpoint_service.discard(job_id, source, prefix=ENRICHMENT_PREFIX)
+        checkpoint_service.save(job_id, source, "diff", {
+            "fingerprint": fingerprint,
+            "added": len(added_lectures),
+            "updated": len(updated_lectures),
+            "deleted": len(deleted_lectures)
+        })
+
     # 2. AI Enrichment Step
-    if to_enrich:
-        enriched_results = await ai_service.enrich_lectures(to_enrich)
+    # Nothing is flushed yet: the SQLite write lock is only taken after enrichment, so other sources keep writing
+    if to_enrich and enrich:
+        def on_batch(batch_no: int, total_batches: int):
+            event_service.progress(job_id, "enrichment", f"{progress_prefix}Enriching batch {batch_no}/{total_batches}", current=batch_no, total=total_batches)
+
+        def on_result(batch_no: int, items: list):
+            checkpoint_service.save(job_id, source, f"{ENRICHMENT_PREFIX}{batch_no}", items)
+
+        enriched_results = await ai_service.enrich_lectures(to_enrich, on_batch=on_batch, completed=completed, on_result=on_result)
         for res in enriched_results:
             ext_id = res.get("id")
             lecture_obj = sync_id_map.get(ext_id)
@@ -247,73 +285,176 @@ async def _sync_lectures_to_db(db: Session, job_id: str, schedule: list, sheet_u
                 lecture_obj.type = res.get("type")
                 lecture_obj.teacher = res.get("teacher")
                 lecture_obj.room = res.get("room")
-                
-    db.commit()
-    
-    summary_msg = f"Sync processed. Added: {len(added_lectures)}, Updated: {len(updated_lectures)}, Deleted: {len(deleted_lectures)}."
-    logger.info(summary_msg)
-    
-    # Helper to convert models to dicts for notification (avoids session issues)
-    def to_dict(l):
-        return {
-            "date": l.date,
-            "start_time": l.start_time,
-            "end_time": l.end_time,
-            "subject": l.subject,
-            "summary": l.summary,
-            "room": l.room,
-            "teacher": l.teacher,
-            "type": l.type,
-            "is_cancelled": l.is_cancelled
+
+    commit_started = time.perf_counter()
+    db.flush()
+
+    # Snapshot before the commit expires the objects
+    added = [_lecture_to_dict(l) for l in added_lectures]
+    updated = [_lecture_to_dict(l) for l in updated_lectures]
+    deleted = [_lecture_to_dict(l) for l in deleted_lectures]
+
+    # 3. Append the change log in bulk, in the same transaction as the changes themselves
+    changes = [
+        {
+            "lecture_id": l.id,
+            "job_id": job_id,
+            "op": op,
+            "old_values": json.dumps(old_values[id(l)], ensure_ascii=False) if id(l) in old_values else None,
+            "new_values": json.dumps(snapshot, ensure_ascii=False)
         }
+        for op, lectures, snapshots in (
+            ("added", added_lectures, added),
+            ("updated", updated_lectures, updated),
+            ("cancelled", deleted_lectures, deleted)
+        )
+        for l, snapshot in zip(lectures, snapshots)
+    ]
+    if changes:
+        db.execute(insert(LectureChange), changes)
 
-    return {
+    summary_msg = f"Sync processed. Added: {len(added_lectures)}, Updated: {len(updated_lectures)}, Deleted: {len(deleted_lectures)}."
+    result = {
+        "source": source,
         "message": summary_msg,
-        "added": [to_dict(l) for l in added_lectures],
-        "updated": [to_dict(l) for l in updated_lectures],
-        "deleted": [to_dict(l) for l in deleted_lectures],
+        "added": added,
+        "updated": updated,
+        "deleted": deleted,
         "sheet_url": sheet_url
     }
+    _record_source_state(db, source, job_id, "completed", summary_msg, sheet_url=sheet_url)
+    checkpoint_service.mark_committed(db, job_id, source, result)
+    generation_service.bump(db)
+    db.commit()
+    timing_service.record("commit", time.perf_counter() - commit_started, source=source, changes=len(changes))
+    
+    logger.info(f"{source}: {summary_msg}")
 
-async def run_sync_job(job_id: str):
+    return result
+
+async def _sync_source(client: "httpx.AsyncClient", job_id: str, source: ScheduleSource, single: bool) -> dict:
     """
-    PK schedule synchronization job.
+    Syncs one source in its own session: change detection, download, parse, diff and enrichment.
+    Stages checkpointed by an earlier attempt of the job are skipped.
     """
-    logger.info(f"Starting PK Schedule Sync Job for job_id: {job_id}...")
-    
-    async with httpx.AsyncClient(follow_redirects=True) as client:
-        db = SessionLocal()
-        try:
-            # 1. Scrape PK page and retrieve sheet link
-            sheet_link = await _get_sheet_link(client)
-            
+    prefix = "" if single else f"[{source.name}] "
+    checkpoints = checkpoint_service.load(job_id, source.name)
+    if COMMITTED in checkpoints:
+        logger.info(f"{source.name} was already synced by an earlier attempt of job {job_id}.")
+        return checkpoints[COMMITTED]
+
+    db = SessionLocal()
+    try:
+        if "parsed" in checkpoints:
+            parsed = checkpoints["parsed"]
+            logger.info(f"Resuming {source.name} with the {len(parsed['events'])} events parsed by an earlier attempt (sheet {parsed['sha256'][:12]}).")
+            event_service.progress(job_id, "diffing", f"{prefix}Resuming with {len(parsed['events'])} events from the last checkpoint")
+            return await _sync_lectures_to_db(db, job_id, parsed["events"], sheet_url=parsed["sheet_url"], source=source.name, progress_prefix=prefix, checkpoints=checkpoints)
+
+        # 1. Scrape the source page and retrieve sheet link
+        event_service.progress(job_id, "scraping", f"{prefix}Looking for the schedule sheet")
+        with timing_service.stage("scrape", source=source.name):
+            sheet_link = await _get_sheet_link(client, source)
+
+        if single:
             # Update current job with the found link immediately
             current_job = db.query(Job).filter(Job.id == job_id).first()
             if current_job:
                 current_job.sheet_url = sheet_link
+                generation_service.bump(db)
                 db.commit()
 
-            # 2. Validation: check if link has changed
-            if not _is_link_changed(db, job_id, sheet_link):
-                return {"message": "Sync completed: Sheet link has not changed.", "changed_lectures": [], "sheet_url": sheet_link}
+        # 2. Validation: check if link has changed
+        if not _is_link_changed(db, job_id, sheet_link, source.name):
+            return {"source": source.name, "message": "Sheet link has not changed.", "unchanged": True, "added": [], "updated": [], "deleted": [], "sheet_url": sheet_link}
 
-            # 3. Load sheet in memory
+        # 3. Load sheet in memory
+        event_service.progress(job_id, "downloading", f"{prefix}Downloading the schedule sheet")
+        with timing_service.stage("download", source=source.name) as span:
             sheet_content = await _download_sheet(client, sheet_link)
-            
-            # Load into pandas
-            # xlrd for .xls, openpyxl for .xlsx
-            df = pd.read_excel(io.BytesIO(sheet_content), header=None)
-            
-            logger.info(f"Successfully loaded sheet into memory. Shape: {df.shape}")
-            
-            schedule = _retrieve_schedule_from_sheet(df)
-            logger.info(f"Extracted {len(schedule)} future events from sheet.")
+            span["bytes"] = len(sheet_content)
+
+        # Parse in the parser process, the event loop keeps serving requests meanwhile
+        event_service.progress(job_id, "parsing", f"{prefix}Parsing the schedule sheet")
+        schedule = await sheet_parser_pool.parse(sheet_content, timeout=config.SHEET_PARSE_TIMEOUT_SECONDS, layout=source.layout.model_dump(), source=source.name)
+        logger.info(f"Extracted {len(schedule)} future events from sheet of {source.name}.")
+        checkpoint_service.save(job_id, source.name, "parsed", {
+            "sheet_url": sheet_link,
+            "sha256": hashlib.sha256(sheet_content).hexdigest(),
+            "events": schedule
+        })
+
+        event_service.progress(job_id, "diffing", f"{prefix}Comparing {len(schedule)} events with the database")
+
+        return await _sync_lectures_to_db(db, job_id, schedule, sheet_url=sheet_link, source=source.name, progress_prefix=prefix, checkpoints=checkpoints)
+    finally:
+        db.close()
+
+def _record_source_failure(job_id: str, source: str, error: BaseException):
+    db = SessionLocal()
+    try:
+        _record_source_state(db, source, job_id, "failed", f"Error: {error}")
+        db.commit()
+    except Exception as e:
+        logger.error(f"Failed to record the failure of source {source}: {e}")
+    finally:
+        db.close()
+
+def _merge_results(results: list, failures: list) -> dict:
+    added = [l for result in results for l in result["added"]]
+    updated = [l for result in results for l in result["updated"]]
+    deleted = [l for result in results for l in result["deleted"]]
+
+    if len(results) == 1 and not failures:
+        result = results[0]
+        message = "Sync completed: Sheet link has not changed." if result.get("unchanged") else result["message"]
+    else:
+        message = f"Sync processed {len(results)} source(s). Added: {len(added)}, Updated: {len(updated)}, Deleted: {len(deleted)}."
+        unchanged = [result["source"] for result in results if result.get("unchanged")]
+        if unchanged:
+            message += f" Unchanged: {', '.join(unchanged)}."
+        if failures:
+            message += " Failed: " + "; ".join(f"{name} ({error})" for name, error in failures) + "."
+
+    return {
+        "message": message,
+        "added": added,
+        "updated": updated,
+        "deleted": deleted,
+        "sheet_url": results[0]["sheet_url"] if len(results) == 1 else None,
+        "sources": results
+    }
+
+async def run_sync_job(job_id: str):
+    """
+    Schedule synchronization job: syncs every registered source, at most SYNC_SOURCE_CONCURRENCY at once.
+    """
+    # Imported here with the rest of the sync-only libraries, which web workers never load
+    import httpx
+
+    sources = source_registry.all()
+    logger.info(f"Starting PK Schedule Sync Job for job_id: {job_id} ({len(sources)} source(s))...")
+    semaphore = asyncio.Semaphore(config.SYNC_SOURCE_CONCURRENCY)
 
-            return await _sync_lectures_to_db(db, job_id, schedule, sheet_url=sheet_link)
+    async with httpx.AsyncClient(follow_redirects=True) as client:
+        async def sync(source: ScheduleSource):
+            async with semaphore:
+                return await _sync_source(client, job_id, source, single=len(sources) == 1)
 
-        except Exception as e:
-            logger.error(f"Error during sync job: {str(e)}")
-            raise e
-        finally:
-            db.close()
+        # return_exceptions: a failing source neither cancels nor delays the others
+        outcomes = await asyncio.gather(*(sync(source) for source in sources), return_exceptions=True)
+
+    results, failures = [], []
+    for source, outcome in zip(sources, outcomes):
+        if isinstance(outcome, BaseException):
+            logger.error(f"Error during sync of source {source.name}: {str(outcome)}")
+            _record_source_failure(job_id, source.name, outcome)
+            failures.append((source.name, outcome))
+        else:
+            results.append(outcome)
 
+    if not results:
+        if len(failures) == 1:
+            raise failures[0][1]
+        raise Exception("All sources failed: " + "; ".join(f"{name} ({error})" for name, error in failures))
+    return _merge_results(results, failures)
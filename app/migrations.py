@@ -0,0 +1,182 @@
+"""
+Versioned schema migrations of the SQLite database, tracked in PRAGMA user_version.
+
+A new database is created at the latest version straight from the models. An existing one gets the migrations
+after its version, in order, in one transaction that holds the write lock, so workers starting together wait for
+the first one instead of migrating twice. Files from before versioning have version 0.
+
+Adding a migration: change the models, append a function to MIGRATIONS. Version 1 brings pre-versioning files up
+with the additive rules of the old init_db (missing tables, columns and indexes of the current models),
+so later migrations must tolerate finding their change already made.
+
+    python -m app.migrations            # migrate
+    python -m app.migrations --status   # show the version and pending migrations
+"""
+import argparse
+import json
+import logging
+from sqlalchemy import Connection, Integer, MetaData, inspect, text
+from app.database import Base, engine
+from app.models.lectures import Lecture, LECTURES_FTS_DDL
+from app.models.jobs import Job
+from app.models.job_checkpoints import JobCheckpoint
+from app.models.sync_metrics import SyncMetric
+from app.models.types import DateInt, MinuteOfDay
+# Every model must be registered on Base.metadata before the schema is created or compared
+from app.models import app_state, job_events, job_profiles, lecture_changes, leases, probe_state, source_state # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+# Seconds a starting worker waits for another one that is migrating
+LOCK_TIMEOUT_SECONDS = 600
+
+def _table_names(connection: Connection) -> set:
+    return set(inspect(connection).get_table_names())
+
+def _create_indexes(connection: Connection, table):
+    for index in table.indexes:
+        index.create(bind=connection, checkfirst=True)
+
+def _add_missing_columns(connection: Connection, table):
+    """
+    Adds the columns of the model missing from the table; they must be nullable or have a server default.
+    """
+    ddl_compiler = connection.dialect.ddl_compiler(connection.dialect, None)
+    existing = {column["name"] for column in inspect(connection).get_columns(table.name)}
+    for column in table.columns:
+        if column.name in existing:
+            continue
+        ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=connection.dialect)}"
+        if column.server_default is not None:
+            ddl += f" DEFAULT {ddl_compiler.get_column_default_string(column)}"
+        connection.execute(text(ddl))
+
+def _baseline(connection: Connection):
+    """
+    The schema management of the old init_db: create missing tables, add missing columns
+    (all nullable or with a server default), create missing indexes.
+    """
+    Base.metadata.create_all(bind=connection)
+    for table in Base.metadata.sorted_tables:
+        _add_missing_columns(connection, table)
+        _create_indexes(connection, table)
+
+def _typed_lecture_columns(connection: Connection):
+    """
+    lectures.date, start_time and end_time from text to integers (YYYYMMDD, minutes after midnight).
+    SQLite cannot change a column type, so the table is rebuilt; ids are kept, so lecture_changes,
+    the FTS index and Google Calendar ids stay valid.
+    """
+    columns = {column["name"]: column["type"] for column in inspect(connection).get_columns("lectures")}
+    if isinstance(columns["date"], Integer):
+        return
+
+    # The conversion uses the column types themselves, so existing and newly written values match exactly
+    raw = connection.connection.driver_connection
+    raw.create_function("pk_date", 1, DateInt.to_db, deterministic=True)
+    raw.create_function("pk_minutes", 1, MinuteOfDay.to_db, deterministic=True)
+
+    metadata = MetaData()
+    Job.__table__.to_metadata(metadata) # target of the last_sync_id foreign key
+    rebuilt = Lecture.__table__.to_metadata(metadata, name="lectures_rebuilt")
+    # The indexes are created under their own names once the table is renamed
+    rebuilt.indexes.clear()
+    rebuilt.create(bind=connection)
+
+    converters = {"date": "pk_date(date)", "start_time": "pk_minutes(start_time)", "end_time": "pk_minutes(end_time)"}
+    names = [column.name for column in Lecture.__table__.columns]
+    connection.execute(text(
+        f"INSERT INTO lectures_rebuilt ({', '.join(names)}) "
+        f"SELECT {', '.join(converters.get(name, name) for name in names)} FROM lectures"
+    ))
+    # Dropping the table drops its indexes and FTS triggers, both are recreated below
+    connection.execute(text("DROP TABLE lectures"))
+    connection.execute(text("ALTER TABLE lectures_rebuilt RENAME TO lectures"))
+    _create_indexes(connection, Lecture.__table__)
+    for statement in LECTURES_FTS_DDL:
+        connection.execute(text(statement))
+
+def _jobs_status_completed_index(connection: Connection):
+    _create_indexes(connection, Job.__table__)
+
+def _job_checkpoints(connection: Connection):
+    JobCheckpoint.__table__.create(bind=connection, checkfirst=True)
+    _create_indexes(connection, JobCheckpoint.__table__)
+    _add_missing_columns(connection, Job.__table__)
+
+def _sync_metrics(connection: Connection):
+    """
+    Series totals of the sync job metrics, backfilled from the timings already stored on the jobs.
+    """
+    from app.services.metrics_service import add_observations
+
+    if "sync_metrics" in _table_names(connection):
+        return
+    SyncMetric.__table__.create(bind=connection)
+    for (timings,) in connection.execute(text("SELECT timings FROM jobs WHERE timings IS NOT NULL")):
+        add_observations(connection, json.loads(timings))
+
+MIGRATIONS = [
+    _baseline,
+    _typed_lecture_columns,
+    _jobs_status_completed_index,
+    _job_checkpoints,
+    _sync_metrics,
+]
+LATEST_VERSION = len(MIGRATIONS)
+
+def _version(connection: Connection) -> int:
+    return connection.execute(text("PRAGMA user_version")).scalar()
+
+def pending(connection: Connection) -> list:
+    version = _version(connection)
+    return [(i + 1, migration) for i, migration in enumerate(MIGRATIONS[version:], start=version)]
+
+def migrate():
+    """
+    Brings the database to LATEST_VERSION.
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        busy_timeout = connection.execute(text("PRAGMA busy_timeout")).scalar()
+        connection.execute(text(f"PRAGMA busy_timeout = {LOCK_TIMEOUT_SECONDS * 1000}"))
+        # Take the write lock before reading the version, concurrent starters queue up here
+        connection.execute(text("BEGIN IMMEDIATE"))
+        try:
+            version = _version(connection)
+            if version > LATEST_VERSION:
+                raise RuntimeError(f"Database schema version {version} is newer than this code's ({LATEST_VERSION}).")
+
+            if version == 0 and not _table_names(connection):
+                Base.metadata.create_all(bind=connection)
+                logger.info(f"Created the database schema at version {LATEST_VERSION}.")
+            else:
+                for target, migration in pending(connection):
+                    logger.info(f"Migrating the database to version {target}: {migration.__name__.strip('_')}")
+                    migration(connection)
+            # PRAGMA takes no bound parameters
+            connection.execute(text(f"PRAGMA user_version = {LATEST_VERSION}"))
+            connection.execute(text("COMMIT"))
+        except Exception:
+            connection.execute(text("ROLLBACK"))
+            raise
+        finally:
+            connection.execute(text(f"PRAGMA busy_timeout = {busy_timeout}"))
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate the database schema.")
+    parser.add_argument("--status", action="store_true", help="Only show the schema version and pending migrations.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.status:
+        with engine.connect() as connection:
+            version = _version(connection)
+            print(f"Schema version {version}, latest {LATEST_VERSION}.")
+            for target, migration in pending(connection):
+                print(f"  pending {target}: {migration.__name__.strip('_')}")
+        return
+    migrate()
+    print(f"Schema at version {LATEST_VERSION}.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+from sqlalchemy import Column, String, Integer
+from app.database import Base
+
+class AppState(Base):
+    __tablename__ = "app_state"
+
+    key = Column(String, primary_key=True)
+    value = Column(Integer, default=0)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey
+from app.database import Base
+from datetime import datetime
+
+class JobCheckpoint(Base):
+    """
+    Output of a completed stage of one source within a job, so a retry or resume of the job continues after it.
+    """
+    __tablename__ = "job_checkpoints"
+
+    job_id = Column(String, ForeignKey("jobs.id"), primary_key=True)
+    source = Column(String, primary_key=True)
+    stage = Column(String, primary_key=True) # parsed | diff | enrichment:<batch no> | committed
+    payload = Column(Text) # JSON, see checkpoint_service
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, DateTime, Integer, Text, ForeignKey
+from app.database import Base
+from datetime import datetime
+
+class JobEvent(Base):
+    __tablename__ = "job_events"
+    # AUTOINCREMENT guarantees ids are never reused, so they can serve as SSE event ids
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String, ForeignKey("jobs.id"), index=True)
+    type = Column(String) # status | progress
+    payload = Column(Text) # JSON
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, DateTime, Integer, LargeBinary, ForeignKey
+from app.database import Base
+from datetime import datetime
+
+class JobProfile(Base):
+    """
+    Profile captured for a job run on request, kept apart from the jobs table so job listings never load it.
+    """
+    __tablename__ = "job_profiles"
+
+    job_id = Column(String, ForeignKey("jobs.id"), primary_key=True)
+    content = Column(LargeBinary) # zip archive, see profiling_service
+    size = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
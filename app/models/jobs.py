@@ -1,10 +1,14 @@
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, DateTime, Integer, Text, Index
 from app.database import Base
 import uuid
 from datetime import datetime
 
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        # Latest job of a status, e.g. the last completed sync the change detection compares against
+        Index("ix_jobs_status_completed_at", "status", "completed_at"),
+    )
 
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     status = Column(String, index=True)
@@ -13,4 +17,8 @@ class Job(Base):
     message = Column(String, nullable=True)
     sheet_url = Column(String, nullable=True)
     triggered_by = Column(String, default="system")
+    cancel_requested = Column(Integer, default=0, server_default="0") # 0 = false, 1 = true
+    timings = Column(Text, nullable=True) # JSON: per-stage spans and counters of the run, see timing_service
+    profile_requested = Column(Integer, default=0, server_default="0") # 0 = false, 1 = true, see profiling_service
+    attempts = Column(Integer, default=1, server_default="1") # runs of the job, retries and resumes included
 
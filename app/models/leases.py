@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, DateTime
+from app.database import Base
+
+class Lease(Base):
+    """
+    Named, expiring lock shared by all workers through the database.
+    A holder keeps it by renewing it before expires_at; once expired anybody may take it over.
+    """
+    __tablename__ = "leases"
+
+    name = Column(String, primary_key=True)
+    holder = Column(String, nullable=True)
+    job_id = Column(String, nullable=True)
+    expires_at = Column(DateTime)
+    renewed_at = Column(DateTime, nullable=True)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, DateTime, Integer, Text, ForeignKey
+from app.database import Base
+from datetime import datetime
+
+class LectureChange(Base):
+    """
+    Append-only log of lecture changes made by syncs. seq only ever grows, so it doubles as a delta cursor.
+    """
+    __tablename__ = "lecture_changes"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    lecture_id = Column(Integer, ForeignKey("lectures.id"), index=True)
+    job_id = Column(String, ForeignKey("jobs.id"), index=True)
+    op = Column(String) # added | updated | cancelled
+    old_values = Column(Text, nullable=True) # JSON, None for added
+    new_values = Column(Text) # JSON
+    created_at = Column(DateTime, default=datetime.utcnow)
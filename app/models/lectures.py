@@ -1,21 +1,78 @@
-from sqlalchemy import Column, String, DateTime, Integer, ForeignKey
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Index, event, text
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.models.types import DateInt, MinuteOfDay
 from datetime import datetime
 
 class Lecture(Base):
     __tablename__ = "lectures"
+    __table_args__ = (
+        # Serves the upcoming-lectures listing: filter, ordering and keyset seek without a sort;
+        # the displayed columns are then read from the table, one lookup per row of the page
+        Index("ix_lectures_listing", "is_cancelled", "date", "start_time", "id"),
+        # Attribute filters, each followed by the listing order so results need no extra sort
+        Index("ix_lectures_subject_date", "subject", "date", "start_time"),
+        Index("ix_lectures_teacher_date", "teacher", "date", "start_time"),
+        Index("ix_lectures_room_date", "room", "date", "start_time"),
+        Index("ix_lectures_type_date", "type", "date", "start_time"),
+        Index("ix_lectures_source_date", "source", "date", "start_time"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    date = Column(String, index=True) # YYYY-MM-DD
-    start_time = Column(String) # HH:MM
-    end_time = Column(String)   # HH:MM
+    source = Column(String, default="default", server_default="default") # Name of the schedule source, see source_registry
+    date = Column(DateInt, index=True) # YYYY-MM-DD, stored as the integer YYYYMMDD
+    start_time = Column(MinuteOfDay) # HH:MM, stored as minutes after midnight, None if the sheet had no time
+    end_time = Column(MinuteOfDay)   # HH:MM, likewise
     summary = Column(String)
     subject = Column(String, nullable=True)
     type = Column(String, nullable=True)
     teacher = Column(String, nullable=True)
     room = Column(String, nullable=True)
     last_sync_id = Column(String, ForeignKey("jobs.id"), nullable=True) # Link to Job ID
-    last_sync = relationship("Job")
+    last_sync = relationship("Job", lazy="raise_on_sql") # Load explicitly (joinedload or a join) to avoid N+1 queries
     is_cancelled = Column(Integer, default=0) # 0 = false, 1 = true (using Integer for SQLite compatibility/simplicity)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# SQLite FTS5 index over the free-text columns, an external-content table kept in sync by triggers
+LECTURES_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS lectures_fts USING fts5(
+        summary, subject, teacher,
+        content='lectures', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS lectures_fts_ai AFTER INSERT ON lectures BEGIN
+        INSERT INTO lectures_fts(rowid, summary, subject, teacher) VALUES (new.id, new.summary, new.subject, new.teacher);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS lectures_fts_ad AFTER DELETE ON lectures BEGIN
+        INSERT INTO lectures_fts(lectures_fts, rowid, summary, subject, teacher) VALUES ('delete', old.id, old.summary, old.subject, old.teacher);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS lectures_fts_au AFTER UPDATE OF summary, subject, teacher ON lectures BEGIN
+        INSERT INTO lectures_fts(lectures_fts, rowid, summary, subject, teacher) VALUES ('delete', old.id, old.summary, old.subject, old.teacher);
+        INSERT INTO lectures_fts(rowid, summary, subject, teacher) VALUES (new.id, new.summary, new.subject, new.teacher);
+    END
+    """,
+]
+
+@event.listens_for(Base.metadata, "after_create")
+def create_lectures_fts(target, connection, **kw):
+    """
+    Runs on every create_all, so databases created before the index existed get it too.
+    """
+    if connection.dialect.name != "sqlite":
+        return
+
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'lectures_fts'")
+    ).first()
+    for statement in LECTURES_FTS_DDL:
+        connection.execute(text(statement))
+    if not exists:
+        # Index the rows that were there before the triggers
+        connection.execute(text("INSERT INTO lectures_fts(lectures_fts) VALUES ('rebuild')"))
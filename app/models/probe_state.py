@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, Integer, DateTime
+from app.database import Base
+
+class ProbeState(Base):
+    """
+    State of the adaptive change probe of a source: HTTP validators of the last response
+    and the current back-off, kept in the database so they survive restarts and leader changes.
+    """
+    __tablename__ = "probe_state"
+
+    name = Column(String, primary_key=True)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    sheet_url = Column(String, nullable=True) # last link a sync was started for
+    interval_seconds = Column(Integer)
+    next_probe_at = Column(DateTime, nullable=True)
+    last_probe_at = Column(DateTime, nullable=True)
+    last_change_at = Column(DateTime, nullable=True)
+    last_result = Column(String, nullable=True)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, DateTime
+from app.database import Base
+
+class SourceState(Base):
+    """
+    Per-source sync state: the sheet link last synced successfully drives the source's own change detection.
+    """
+    __tablename__ = "source_state"
+
+    name = Column(String, primary_key=True)
+    sheet_url = Column(String, nullable=True)
+    last_job_id = Column(String, nullable=True)
+    last_synced_at = Column(DateTime, nullable=True)
+    last_status = Column(String, nullable=True) # completed | unchanged | failed
+    last_message = Column(String, nullable=True)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, Float
+from app.database import Base
+
+class SyncMetric(Base):
+    """
+    One Prometheus series of the sync job metrics, e.g. a histogram bucket of a stage.
+    Every finished job run adds its observations, so the values are running totals.
+    """
+    __tablename__ = "sync_metrics"
+
+    name = Column(String, primary_key=True) # series name without the pk_sync_ prefix
+    label = Column(String, primary_key=True, default="") # stage or target, "" if the series has none
+    le = Column(String, primary_key=True, default="") # upper bound of a histogram bucket, "" otherwise
+    value = Column(Float, default=0)
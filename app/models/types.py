@@ -0,0 +1,71 @@
+import re
+from datetime import date
+from typing import Optional
+from sqlalchemy import Integer
+from sqlalchemy.types import TypeDecorator
+
+_TIME = re.compile(r"^(\d{1,2})[:.](\d{2})$")
+
+def normalize_time(value) -> Optional[str]:
+    """
+    "H:MM", "HH:MM" or "H.MM" as "HH:MM"; anything else (e.g. the parser's "nan" for a missing time) as None.
+    """
+    match = _TIME.match(str(value).strip()) if value is not None else None
+    if not match or int(match.group(1)) > 23 or int(match.group(2)) > 59:
+        return None
+    return f"{int(match.group(1)):02d}:{match.group(2)}"
+
+class DateInt(TypeDecorator):
+    """
+    A "YYYY-MM-DD" date stored as the integer YYYYMMDD: compact, compared and indexed as a number,
+    while the application keeps working with ISO strings.
+    """
+    impl = Integer
+    cache_ok = True
+
+    @staticmethod
+    def to_db(value) -> Optional[int]:
+        if value is None:
+            return None
+        if isinstance(value, date):
+            value = value.isoformat()
+        return int(value.replace("-", ""))
+
+    @staticmethod
+    def from_db(value) -> Optional[str]:
+        if value is None:
+            return None
+        return f"{value // 10000:04d}-{value // 100 % 100:02d}-{value % 100:02d}"
+
+    def process_bind_param(self, value, dialect):
+        return self.to_db(value)
+
+    def process_result_value(self, value, dialect):
+        return self.from_db(value)
+
+class MinuteOfDay(TypeDecorator):
+    """
+    An "HH:MM" time stored as minutes after midnight. Values that are not a time are stored as NULL.
+    """
+    impl = Integer
+    cache_ok = True
+
+    @staticmethod
+    def to_db(value) -> Optional[int]:
+        normalized = normalize_time(value)
+        if normalized is None:
+            return None
+        hours, minutes = normalized.split(":")
+        return int(hours) * 60 + int(minutes)
+
+    @staticmethod
+    def from_db(value) -> Optional[str]:
+        if value is None:
+            return None
+        return f"{value // 60:02d}:{value % 60:02d}"
+
+    def process_bind_param(self, value, dialect):
+        return self.to_db(value)
+
+    def process_result_value(self, value, dialect):
+        return self.from_db(value)
@@ -0,0 +1,203 @@
+"""
+Offline replay of the sync pipeline over local workbook files. The snapshots go through parse, diff and,
+on request, AI enrichment one after another, as consecutive syncs would, against a scratch database.
+Nothing is scraped or downloaded, nothing reaches Slack, Google Calendar or the live database. The report
+lists the change set each snapshot would have produced and its stage timings.
+
+    python -m app.replay snapshots/                          # every .xls/.xlsx in the directory, by file name
+    python -m app.replay v1.xlsx v2.xlsx --source ds2 --json
+    python -m app.replay snapshots/ --as-of mtime            # events from each file's modification date on
+    python -m app.replay snapshots/ --database history.db    # keep the resulting database, e.g. to backfill
+    python -m app.replay snapshots/ --enrich                 # send new and changed lectures to AI_SERVICE_URL
+
+The app modules read their configuration at import, so they are only imported once main() has pointed it
+at the scratch database.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_SUFFIXES = (".xls", ".xlsx")
+
+def collect_snapshots(paths: list) -> list:
+    """
+    Expands directories into their workbooks, sorted by file name; files are taken in the given order.
+    """
+    snapshots = []
+    for path in paths:
+        if os.path.isdir(path):
+            snapshots += sorted(
+                os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith(SNAPSHOT_SUFFIXES)
+            )
+        elif os.path.isfile(path):
+            snapshots.append(path)
+        else:
+            raise FileNotFoundError(f"No such file or directory: {path}")
+    return snapshots
+
+def _cutoff(as_of: str, path: str) -> datetime:
+    """
+    Events before the returned date are dropped by the parser, as a sync on that day would have done.
+    """
+    if not as_of:
+        return datetime.min
+    if as_of == "mtime":
+        day = datetime.fromtimestamp(os.path.getmtime(path))
+    else:
+        day = datetime.strptime(as_of, "%Y-%m-%d")
+    return day.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _configure(database_path: str, workdir: str, enrich: bool):
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{database_path}",
+        "SYNC_EXECUTION_MODE": "inline",
+        "SYNC_SCHEDULE": "",
+        "SLACK_BOT_TOKEN": "",
+        "GOOGLE_SERVICE_ACCOUNT_FILE": "",
+        "ICS_CACHE_DIR": os.path.join(workdir, "ics"),
+    })
+    if not enrich:
+        os.environ["AI_SERVICE_URL"] = ""
+
+def _stage_totals(timings) -> dict:
+    totals = {}
+    for span in timings.stages:
+        totals[span["stage"]] = round(totals.get(span["stage"], 0) + span["seconds"], 6)
+    return totals
+
+async def replay(snapshots: list, source_name: str = None, as_of: str = None, enrich: bool = False) -> dict:
+    """
+    Replays the snapshots in order against the configured (scratch) database and returns the report.
+    """
+    from app.config import config
+    from app.database import SessionLocal, init_db
+    from app.jobs.sheet_parser import sheet_parser_pool
+    from app.jobs.sync_job import _sync_lectures_to_db
+    from app.models.jobs import Job
+    from app.services.checkpoint_service import checkpoint_service
+    from app.services.source_registry import source_registry, DEFAULT_SOURCE
+    from app.services.timing_service import timing_service
+
+    source = source_registry.get(source_name or DEFAULT_SOURCE)
+    if not source:
+        raise ValueError(f"Unknown source: {source_name}")
+    init_db()
+
+    run_id = uuid.uuid4().hex[:8]
+    results = []
+    try:
+        # Started up front, so the first snapshot's timings do not include the process start
+        await sheet_parser_pool.ready()
+        for i, path in enumerate(snapshots, start=1):
+            timings = timing_service.start()
+            started = time.perf_counter()
+            with open(path, "rb") as f:
+                content = f.read()
+            since = _cutoff(as_of, path)
+            events = await sheet_parser_pool.parse(
+                content, timeout=config.SHEET_PARSE_TIMEOUT_SECONDS, layout=source.layout.model_dump(), source=source.name, since=since
+            )
+
+            # A job per snapshot, so lectures and the change log point at the snapshot that changed them
+            job_id = f"replay-{run_id}-{i:04d}"
+            db = SessionLocal()
+            try:
+                db.merge(Job(id=job_id, status="running", started_at=datetime.utcnow(), triggered_by="replay", sheet_url=os.path.abspath(path)))
+                db.commit()
+                result = await _sync_lectures_to_db(db, job_id, events, sheet_url=os.path.abspath(path), source=source.name, enrich=enrich)
+                job = db.get(Job, job_id)
+                job.status = "completed"
+                job.completed_at = datetime.utcnow()
+                job.message = result["message"]
+                checkpoint_service.clear(db, job_id)
+                db.commit()
+            finally:
+                db.close()
+
+            results.append({
+                "snapshot": path,
+                "sha256": hashlib.sha256(content).hexdigest(),
+                "as_of": since.date().isoformat() if as_of else None,
+                "events": len(events),
+                "message": result["message"],
+                "added": len(result["added"]),
+                "updated": len(result["updated"]),
+                "deleted": len(result["deleted"]),
+                "seconds": round(time.perf_counter() - started, 6),
+                "stages": _stage_totals(timings),
+                "db_queries": timings.counters["db_queries"],
+                "changes": {op: result[op] for op in ("added", "updated", "deleted")},
+            })
+            logger.info(f"Replayed {path}: {result['message']}")
+    finally:
+        sheet_parser_pool.shutdown()
+
+    totals = {"snapshots": len(results), "stages": {}}
+    for key in ("events", "added", "updated", "deleted", "seconds"):
+        totals[key] = round(sum(result[key] for result in results), 6)
+    for result in results:
+        for stage, seconds in result["stages"].items():
+            totals["stages"][stage] = round(totals["stages"].get(stage, 0) + seconds, 6)
+    return {"source": source.name, "enrich": enrich, "snapshots": results, "totals": totals}
+
+def _print_summary(report: dict):
+    stages = list(report["totals"]["stages"])
+    print(f"{'snapshot':40} {'events':>7} {'added':>6} {'upd':>5} {'del':>5} {'total s':>8} " + " ".join(f"{stage:>10}" for stage in stages))
+    for result in report["snapshots"] + [{"snapshot": "TOTAL", **report["totals"]}]:
+        print(
+            f"{os.path.basename(result['snapshot'])[-40:]:40} {result['events']:>7} {result['added']:>6} {result['updated']:>5} "
+            f"{result['deleted']:>5} {result['seconds']:>8.3f} " + " ".join(f"{result['stages'].get(stage, 0):>10.3f}" for stage in stages)
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay local workbook snapshots through parse, diff and enrichment, offline.")
+    parser.add_argument("paths", nargs="+", help="Workbook files or directories of snapshots.")
+    parser.add_argument("--source", help="Source whose column layout applies, see SCHEDULE_SOURCES_FILE. Default: the default source.")
+    parser.add_argument("--as-of", help="Drop events before this date: YYYY-MM-DD, or mtime for each file's modification date. Default: keep all.")
+    parser.add_argument("--enrich", action="store_true", help="Send new and changed lectures to AI_SERVICE_URL. Default: leave their AI fields empty.")
+    parser.add_argument("--database", help="SQLite file to replay into and keep. Default: a scratch database, deleted afterwards.")
+    parser.add_argument("--json", action="store_true", help="Print the full report, change sets included, as JSON.")
+    parser.add_argument("--output", help="Also write the full report as JSON to this file.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format="%(message)s", stream=sys.stderr)
+
+    try:
+        if args.as_of and args.as_of != "mtime":
+            _cutoff(args.as_of, "") # reject a malformed date before any work
+        snapshots = collect_snapshots(args.paths)
+    except (ValueError, FileNotFoundError) as e:
+        parser.error(str(e))
+    if not snapshots:
+        parser.error("No .xls or .xlsx snapshots found.")
+
+    workdir = tempfile.mkdtemp(prefix="pk-replay-")
+    try:
+        _configure(os.path.abspath(args.database) if args.database else os.path.join(workdir, "replay.db"), workdir, args.enrich)
+        report = asyncio.run(replay(snapshots, source_name=args.source, as_of=args.as_of, enrich=args.enrich))
+    except ValueError as e:
+        # Unknown source or a workbook that cannot be read
+        parser.error(str(e))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        _print_summary(report)
+
+if __name__ == "__main__":
+    main()
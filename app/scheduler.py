@@ -1,14 +1,31 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from app.services.job_service import job_service
+from app.services.lease_service import lease_service
+from app.services.probe_service import probe_service
+from app.services.source_registry import source_registry
 from app.database import SessionLocal
 from app.config import config
+from datetime import datetime
 import logging
+import os
+import socket
+import uuid
 
 logger = logging.getLogger(__name__)
+# The leader election runs every few seconds in every worker, keep it out of the logs
+logging.getLogger("apscheduler.executors.default").setLevel(logging.WARNING)
 
 scheduler = AsyncIOScheduler()
 
+SCHEDULER_LEASE = "scheduler"
+SYNC_JOB_ID = "sync_job_scheduled"
+ELECTION_JOB_ID = "scheduler_leader_election"
+
+# Identity of this worker in the scheduler lease, set when the scheduler starts (after gunicorn forks)
+_worker_id = None
+
 async def scheduled_sync_job():
     db = SessionLocal()
     try:
@@ -20,45 +37,117 @@ async def scheduled_sync_job():
     finally:
         db.close()
 
-import os
-import fcntl
+async def probe_for_changes():
+    """
+    Adaptive mode tick: probes each source once its back-off has elapsed and starts a sync only on a change.
+    """
+    db = SessionLocal()
+    try:
+        changed = []
+        for source in source_registry.all():
+            if probe_service.is_due(db, source) and await probe_service.probe(db, source):
+                changed.append(source.name)
+        if changed:
+            # Sources whose link did not change are skipped by the job after one page request
+            logger.info(f"Probe detected a new sheet link of {', '.join(changed)}, starting sync.")
+            await job_service.execute_sync(db, triggered_by="probe")
+    except Exception as e:
+        logger.error(f"Error during schedule probe: {str(e)}")
+    finally:
+        db.close()
+
+def _add_sync_job():
+    if config.SYNC_SCHEDULE_MODE == "adaptive":
+        # The tick is cheap, the probe itself runs on the back-off stored in probe_state
+        scheduler.add_job(
+            probe_for_changes,
+            IntervalTrigger(seconds=min(30, config.PROBE_MIN_INTERVAL_SECONDS)),
+            id=SYNC_JOB_ID,
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1
+        )
+        return
+    scheduler.add_job(
+        scheduled_sync_job, 
+        CronTrigger.from_crontab(config.SYNC_SCHEDULE),
+        id=SYNC_JOB_ID,
+        replace_existing=True,
+        misfire_grace_time=3600,
+        coalesce=True
+    )
+
+def _describe_schedule() -> str:
+    if config.SYNC_SCHEDULE_MODE == "adaptive":
+        return f"adaptive probing every {config.PROBE_MIN_INTERVAL_SECONDS}-{config.PROBE_MAX_INTERVAL_SECONDS}s"
+    return config.SYNC_SCHEDULE
+
+async def elect_leader():
+    """
+    Takes or renews the scheduler lease. Its holder runs the sync schedule; every other worker,
+    in any process or on any host sharing the database, keeps retrying and takes over once it expires.
+    """
+    db = SessionLocal()
+    try:
+        is_leader = lease_service.acquire(db, SCHEDULER_LEASE, holder=_worker_id, ttl=config.SCHEDULER_LEASE_TTL_SECONDS)
+        db.commit()
+    except Exception as e:
+        # Without a renewed lease another worker may take over, so step down rather than risk running twice
+        logger.error(f"Scheduler leader election failed: {e}")
+        is_leader = False
+    finally:
+        db.close()
 
-# Keep handle global so it's not garbage collected (which would release the lock)
-_lock_file_handle = None
+    has_sync_job = scheduler.get_job(SYNC_JOB_ID) is not None
+    if is_leader and not has_sync_job:
+        _add_sync_job()
+        logger.info(f"Worker {_worker_id} is the scheduler leader: Sync job scheduled with: {_describe_schedule()}")
+    elif not is_leader and has_sync_job:
+        scheduler.remove_job(SYNC_JOB_ID)
+        logger.info(f"Worker {_worker_id} lost scheduler leadership.")
 
 def start_scheduler():
     """
-    Initializes and starts the scheduler.
-    Uses a file lock to ensure only one worker starts it in a multi-worker environment.
+    Initializes and starts the scheduler in every worker.
+    Only the holder of the scheduler lease runs the sync schedule, see elect_leader.
     """
-    global _lock_file_handle
-    if not scheduler.running:
-        # Use a file lock to ensure only one process starts the scheduler
-        lock_file = "/tmp/scheduler.lock"
-        try:
-            _lock_file_handle = open(lock_file, "w")
-            fcntl.flock(_lock_file_handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
-            
-            scheduler.add_job(
-                scheduled_sync_job, 
-                CronTrigger.from_crontab(config.SYNC_SCHEDULE),
-                id="sync_job_scheduled",
-                replace_existing=True,
-                misfire_grace_time=3600,
-                coalesce=True
-            )
-            scheduler.start()
-            logger.info(f"APScheduler started: Sync job scheduled with: {config.SYNC_SCHEDULE}")
-        except (IOError, BlockingIOError):
-            # Another worker already has the lock, this is expected
-            _lock_file_handle = None
-        except Exception as e:
-            logger.error(f"Failed to start scheduler: {e}")
+    global _worker_id
+    if scheduler.running:
+        return
+    if not config.SYNC_SCHEDULE and config.SYNC_SCHEDULE_MODE != "adaptive":
+        logger.warning("SYNC_SCHEDULE not set. Scheduled sync disabled.")
+        return
+
+    try:
+        _worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        scheduler.add_job(
+            elect_leader,
+            IntervalTrigger(seconds=config.SCHEDULER_LEASE_TTL_SECONDS / 3),
+            id=ELECTION_JOB_ID,
+            replace_existing=True,
+            next_run_time=datetime.now(),
+            coalesce=True,
+            max_instances=1
+        )
+        scheduler.start()
+        logger.info(f"APScheduler started in worker {_worker_id}.")
+    except Exception as e:
+        logger.error(f"Failed to start scheduler: {e}")
 
 def stop_scheduler():
     """
-    Shuts down the scheduler.
+    Shuts down the scheduler and hands leadership over right away instead of waiting for the lease to expire.
     """
     if scheduler.running:
         scheduler.shutdown()
         logger.info("APScheduler stopped.")
+
+    if _worker_id:
+        db = SessionLocal()
+        try:
+            lease_service.release(db, SCHEDULER_LEASE, holder=_worker_id)
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to release scheduler lease: {e}")
+        finally:
+            db.close()
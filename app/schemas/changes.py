@@ -0,0 +1,17 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import Optional
+
+class LectureChangeResponse(BaseModel):
+    seq: int
+    lecture_id: int
+    job_id: Optional[str] = None
+    op: str
+    old_values: Optional[dict] = None
+    new_values: Optional[dict] = None
+    created_at: Optional[datetime] = None
+
+class LectureChangeListResponse(BaseModel):
+    items: list[LectureChangeResponse]
+    next_since: int
+    has_more: bool
@@ -10,6 +10,9 @@ class JobStatusResponse(BaseModel):
     message: Optional[str] = None
     sheet_url: Optional[str] = None
     triggered_by: Optional[str] = "system"
+    timings: Optional[dict] = None
+    profile_requested: Optional[bool] = None
+    attempts: Optional[int] = None
 
 class JobListResponse(BaseModel):
     items: list[JobStatusResponse]
@@ -1,5 +1,5 @@
-from datetime import datetime
-from pydantic import BaseModel
+from datetime import date as date_type, datetime
+from pydantic import BaseModel, Field
 from typing import Optional
 
 class LectureSyncInfo(BaseModel):
@@ -9,9 +9,10 @@ class LectureSyncInfo(BaseModel):
 
 class LectureResponse(BaseModel):
     id: int
+    source: Optional[str] = None
     date: str
-    start_time: str
-    end_time: str
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
     summary: str
     subject: Optional[str] = None
     type: Optional[str] = None
@@ -23,6 +24,18 @@ class LectureResponse(BaseModel):
 
 class LectureListResponse(BaseModel):
     items: list[LectureResponse]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     size: int
+    next_cursor: Optional[str] = None
+
+
+class LectureFilter(BaseModel):
+    date_from: Optional[date_type] = Field(None, description="First day to include. Defaults to today.")
+    date_to: Optional[date_type] = Field(None, description="Last day to include.")
+    source: Optional[str] = Field(None, description="Name of the schedule source.")
+    subject: Optional[str] = None
+    teacher: Optional[str] = None
+    room: Optional[str] = None
+    type: Optional[str] = None
+    q: Optional[str] = Field(None, description="Full-text search in summary, subject and teacher.")
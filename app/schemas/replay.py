@@ -0,0 +1,37 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class ReplayRequest(BaseModel):
+    paths: list[str] # workbook files or directories, relative to REPLAY_SNAPSHOT_DIR
+    source: Optional[str] = None
+    as_of: Optional[str] = None # YYYY-MM-DD or mtime; unset keeps all events
+    enrich: bool = False
+
+class ReplaySnapshotResponse(BaseModel):
+    snapshot: str
+    sha256: str
+    as_of: Optional[str] = None
+    events: int
+    message: str
+    added: int
+    updated: int
+    deleted: int
+    seconds: float
+    stages: dict[str, float]
+    db_queries: int
+    changes: dict[str, list[dict]]
+
+class ReplayTotalsResponse(BaseModel):
+    snapshots: int
+    events: int
+    added: int
+    updated: int
+    deleted: int
+    seconds: float
+    stages: dict[str, float]
+
+class ReplayResponse(BaseModel):
+    source: str
+    enrich: bool
+    snapshots: list[ReplaySnapshotResponse]
+    totals: ReplayTotalsResponse
@@ -0,0 +1,30 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+class SheetLayout(BaseModel):
+    """
+    0-based column positions in the sheet. The defaults are the DS1 layout: Q = date, R = start, S = end, T = DS1.
+    """
+    date: int = 16
+    start: int = 17
+    end: int = 18
+    content: int = 19
+    skip_values: list[str] = Field(default_factory=lambda: ["nan", "ds1", "przedmiot"], description="Header and filler cell values to ignore (lowercase).")
+
+class ScheduleSource(BaseModel):
+    name: str
+    url: str
+    sheet_regex: str
+    layout: SheetLayout = Field(default_factory=SheetLayout)
+    slack_channel: Optional[str] = None
+    calendar_id: Optional[str] = None
+
+class SourceStateResponse(BaseModel):
+    name: str
+    url: str
+    sheet_url: Optional[str] = None
+    last_job_id: Optional[str] = None
+    last_synced_at: Optional[datetime] = None
+    last_status: Optional[str] = None
+    last_message: Optional[str] = None
@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class CacheStatsResponse(BaseModel):
+    pid: int
+    generation: Optional[int] = None
+    entries: int
+    bytes: int
+    max_bytes: int
+    hits: int
+    misses: int
+    hit_rate: float
+    evictions: int
+    invalidations: int
+
+class ProbeStateResponse(BaseModel):
+    source: str
+    mode: str
+    interval_seconds: Optional[int] = None
+    next_probe_at: Optional[datetime] = None
+    last_probe_at: Optional[datetime] = None
+    last_change_at: Optional[datetime] = None
+    last_result: Optional[str] = None
+    sheet_url: Optional[str] = None
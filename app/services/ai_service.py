@@ -1,7 +1,8 @@
-import httpx
 import json
 import logging
+from typing import Callable, Optional
 from app.config import config
+from app.services.timing_service import timing_service
 
 logger = logging.getLogger(__name__)
 
@@ -24,33 +25,54 @@ class AIService:
                 lecture_data[key] = config.LECTURE_SHORTCUTS[value]
         return lecture_data
 
-    async def enrich_lectures(self, lectures_data: list[dict]) -> list[dict]:
+    async def enrich_lectures(
+        self,
+        lectures_data: list[dict],
+        on_batch: Optional[Callable[[int, int], None]] = None,
+        completed: Optional[dict[int, list]] = None,
+        on_result: Optional[Callable[[int, list], None]] = None
+    ) -> list[dict]:
         """
         Sends raw lecture data to local Ollama instance for structured parsing in batches.
+        on_batch(batch_no, total_batches) is called before each batch is sent.
+        completed maps batch numbers to the results of an earlier run over the same data, those batches are not sent;
+        on_result(batch_no, items) receives the results of every batch that yields them, e.g. to checkpoint them.
         """
         if not lectures_data:
             return []
 
         batch_size = 3
+        total_batches = (len(lectures_data) + batch_size - 1) // batch_size
         all_enriched_data = []
+        completed = completed or {}
+        if completed:
+            logger.info(f"Reusing the results of {len(completed)}/{total_batches} batches from an earlier run.")
+
+        import httpx
 
         async with httpx.AsyncClient(timeout=120.0) as client:
             for i in range(0, len(lectures_data), batch_size):
                 batch = lectures_data[i : i + batch_size]
+                if i//batch_size + 1 in completed:
+                    all_enriched_data.extend(completed[i//batch_size + 1])
+                    continue
                 logger.info(f"Processing batch {i//batch_size + 1}: {len(batch)} lectures...")
+                if on_batch:
+                    on_batch(i//batch_size + 1, total_batches)
                 
                 prompt = json.dumps(batch, ensure_ascii=False)
                 
                 try:
-                    response = await client.post(
-                        self.base_url,
-                        json={
-                            "model": self.model_name,
-                            "prompt": prompt,
-                            "stream": False
-                        }
-                    )
-                    response.raise_for_status()
+                    with timing_service.stage("ai_batch", batch=i//batch_size + 1, size=len(batch)):
+                        response = await client.post(
+                            self.base_url,
+                            json={
+                                "model": self.model_name,
+                                "prompt": prompt,
+                                "stream": False
+                            }
+                        )
+                        response.raise_for_status()
                     
                     result_json = response.json().get('response', '{}')
                 
@@ -76,6 +98,8 @@ class AIService:
                             
                             all_enriched_data.extend(items)
                             logger.info(f"Batch {i//batch_size + 1} processed. Added {len(items)} items.")
+                            if on_result:
+                                on_result(i//batch_size + 1, items)
                         else:
                             logger.error(f"Batch {i//batch_size + 1} failed to yield a valid list of results.")
                             
@@ -84,6 +108,7 @@ class AIService:
 
                 
                 except Exception as e:
+                    timing_service.error("ai")
                     logger.error(f"Failed to enrich batch {i//batch_size + 1}: {str(e)}")
                     # Continue with other batches even if one fails
                     continue
@@ -0,0 +1,34 @@
+import json
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.lecture_changes import LectureChange
+
+class ChangeService:
+    def _since_statement(self, since: int, limit: int):
+        # Fetch one extra row to know whether there is more
+        return select(LectureChange) \
+            .where(LectureChange.seq > since) \
+            .order_by(LectureChange.seq.asc()) \
+            .limit(limit + 1)
+
+    def _to_dict(self, change: LectureChange) -> dict:
+        return {
+            "seq": change.seq,
+            "lecture_id": change.lecture_id,
+            "job_id": change.job_id,
+            "op": change.op,
+            "old_values": json.loads(change.old_values) if change.old_values else None,
+            "new_values": json.loads(change.new_values) if change.new_values else None,
+            "created_at": change.created_at
+        }
+
+    async def get_changes_since_async(self, db: AsyncSession, since: int = 0, limit: int = 500):
+        """
+        Returns up to `limit` changes with seq > since, the seq to ask for next and whether more are waiting.
+        """
+        rows = (await db.execute(self._since_statement(since, limit))).scalars().all()
+        items = [self._to_dict(change) for change in rows[:limit]]
+        next_since = items[-1]["seq"] if items else since
+        return items, next_since, len(rows) > limit
+
+change_service = ChangeService()
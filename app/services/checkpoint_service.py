@@ -0,0 +1,98 @@
+import json
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from app.config import config
+from app.database import SessionLocal
+from app.models.job_checkpoints import JobCheckpoint
+
+logger = logging.getLogger(__name__)
+
+COMMITTED = "committed"
+ENRICHMENT_PREFIX = "enrichment:"
+
+class CheckpointService:
+    """
+    Stage checkpoints of sync jobs, per source:
+    - parsed: the sheet link, the SHA-256 of the downloaded file and the extracted events
+    - diff: fingerprint of the lectures the diff sends to enrichment
+    - enrichment:<n>: the AI results of batch n
+    - committed: the result of the source, written in the transaction that commits its changes
+    A later attempt of the same job loads them and skips every stage that has one.
+    """
+    def __init__(self, retention_hours: int):
+        self.retention = timedelta(hours=retention_hours)
+
+    def load(self, job_id: str, source: str) -> dict:
+        """
+        Checkpoints of a source as {stage: data}.
+        """
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                select(JobCheckpoint.stage, JobCheckpoint.payload)
+                .where(JobCheckpoint.job_id == job_id, JobCheckpoint.source == source)
+            ).all()
+            return {stage: json.loads(payload) for stage, payload in rows}
+        finally:
+            db.close()
+
+    def save(self, job_id: str, source: str, stage: str, data):
+        """
+        Stores a checkpoint in its own short transaction. Failures are logged and swallowed:
+        without the checkpoint a retry only redoes the stage.
+        """
+        db = SessionLocal()
+        try:
+            db.merge(JobCheckpoint(job_id=job_id, source=source, stage=stage, payload=json.dumps(data, ensure_ascii=False)))
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Failed to store the {stage} checkpoint of {source} in job {job_id}: {e}")
+        finally:
+            db.close()
+
+    def discard(self, job_id: str, source: str, prefix: str = ""):
+        """
+        Deletes the checkpoints of a source whose stage starts with prefix.
+        """
+        db = SessionLocal()
+        try:
+            db.execute(
+                delete(JobCheckpoint)
+                .where(JobCheckpoint.job_id == job_id, JobCheckpoint.source == source, JobCheckpoint.stage.startswith(prefix))
+            )
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Failed to discard checkpoints of {source} in job {job_id}: {e}")
+        finally:
+            db.close()
+
+    def mark_committed(self, db: Session, job_id: str, source: str, result: dict):
+        """
+        Replaces the checkpoints of a source with its result, in the caller's transaction:
+        a source is either committed and checkpointed as such, or neither.
+        """
+        db.execute(delete(JobCheckpoint).where(JobCheckpoint.job_id == job_id, JobCheckpoint.source == source))
+        db.add(JobCheckpoint(job_id=job_id, source=source, stage=COMMITTED, payload=json.dumps(result, ensure_ascii=False)))
+
+    def clear(self, db: Session, job_id: str):
+        """
+        Deletes every checkpoint of a job, in the caller's transaction. Called once the job has completed.
+        """
+        db.execute(delete(JobCheckpoint).where(JobCheckpoint.job_id == job_id))
+
+    def prune(self):
+        """
+        Deletes checkpoints older than the retention window: their jobs can no longer be resumed.
+        """
+        db = SessionLocal()
+        try:
+            db.execute(delete(JobCheckpoint).where(JobCheckpoint.created_at < datetime.utcnow() - self.retention))
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Failed to prune job checkpoints: {e}")
+        finally:
+            db.close()
+
+checkpoint_service = CheckpointService(retention_hours=config.JOB_CHECKPOINT_RETENTION_HOURS)
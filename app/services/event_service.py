@@ -0,0 +1,122 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Optional
+from sqlalchemy import delete, func, select
+from app.config import config
+from app.database import SessionLocal, AsyncSessionLocal
+from app.models.job_events import JobEvent
+
+logger = logging.getLogger(__name__)
+
+class EventService:
+    """
+    Job event bus shared by all workers.
+    publish() appends events to the job_events table. Every worker with connected clients runs a
+    single relay task that tails the table and fans new rows out to its subscribers, so a client
+    receives the events of a job no matter which worker executes it.
+    """
+    def __init__(self, poll_interval: float, retention_hours: int):
+        self.poll_interval = poll_interval
+        self.retention = timedelta(hours=retention_hours)
+        self._subscribers: set = set()
+        self._relay_task: Optional[asyncio.Task] = None
+
+    def publish(self, job_id: str, type: str, **data):
+        """
+        Persists an event. Failures are logged and swallowed, progress reporting must never break a job.
+        """
+        db = SessionLocal()
+        try:
+            db.add(JobEvent(job_id=job_id, type=type, payload=json.dumps({"job_id": job_id, **data}, default=str)))
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Failed to publish {type} event for job {job_id}: {e}")
+        finally:
+            db.close()
+
+    def status(self, job_id: str, status: str, message: str = None):
+        self.publish(job_id, "status", status=status, message=message)
+
+    def progress(self, job_id: str, stage: str, message: str = None, current: int = None, total: int = None):
+        self.publish(job_id, "progress", stage=stage, message=message, current=current, total=total)
+
+    def prune(self):
+        """
+        Deletes events older than the retention window.
+        """
+        db = SessionLocal()
+        try:
+            db.execute(delete(JobEvent).where(JobEvent.created_at < datetime.utcnow() - self.retention))
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Failed to prune job events: {e}")
+        finally:
+            db.close()
+
+    def _to_event(self, row: JobEvent) -> dict:
+        return {"id": row.id, "type": row.type, "data": json.loads(row.payload)}
+
+    async def _fetch_after(self, last_id: int, job_id: str = None, limit: int = 500) -> list:
+        statement = select(JobEvent).where(JobEvent.id > last_id).order_by(JobEvent.id.asc()).limit(limit)
+        if job_id:
+            statement = statement.where(JobEvent.job_id == job_id)
+        async with AsyncSessionLocal() as db:
+            return [self._to_event(row) for row in (await db.execute(statement)).scalars()]
+
+    async def _relay(self):
+        async with AsyncSessionLocal() as db:
+            last_id = (await db.execute(select(func.max(JobEvent.id)))).scalar() or 0
+
+        while self._subscribers:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                events = await self._fetch_after(last_id)
+            except Exception as e:
+                logger.warning(f"Job event relay failed to read events: {e}")
+                continue
+
+            for event in events:
+                last_id = event["id"]
+                for queue in list(self._subscribers):
+                    if queue.full():
+                        # Slow client: drop its oldest event rather than stall everybody else
+                        queue.get_nowait()
+                    queue.put_nowait(event)
+
+        self._relay_task = None
+
+    async def subscribe(self, job_id: str = None, last_event_id: int = None) -> AsyncIterator[Optional[dict]]:
+        """
+        Yields events as they are published, optionally for a single job.
+        Events after last_event_id are replayed first, so reconnecting clients miss nothing.
+        Yields None every keep-alive interval without events.
+        """
+        queue = asyncio.Queue(maxsize=1000)
+        self._subscribers.add(queue)
+        if self._relay_task is None:
+            self._relay_task = asyncio.create_task(self._relay())
+
+        delivered = 0
+        try:
+            if last_event_id is not None:
+                for event in await self._fetch_after(last_event_id, job_id=job_id):
+                    delivered = event["id"]
+                    yield event
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=config.SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+
+                if event["id"] <= delivered or (job_id and event["data"].get("job_id") != job_id):
+                    continue
+                delivered = event["id"]
+                yield event
+        finally:
+            self._subscribers.discard(queue)
+
+event_service = EventService(poll_interval=config.JOB_EVENTS_POLL_INTERVAL, retention_hours=config.JOB_EVENTS_RETENTION_HOURS)
@@ -0,0 +1,103 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date
+from typing import Iterable, Iterator, Optional
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import SessionLocal
+from app.models.lectures import Lecture
+from app.models.lecture_changes import LectureChange
+
+EXPORT_COLUMNS = [
+    "id", "source", "date", "start_time", "end_time", "summary", "subject", "type",
+    "teacher", "room", "is_cancelled", "last_sync_id", "updated_at"
+]
+
+class ExportService:
+    """
+    Streams bulk exports with a constant memory footprint: rows are read in fixed-size keyset batches
+    and are encoded and compressed chunk by chunk.
+    """
+    def __init__(self, batch_size: int = 1000):
+        self.batch_size = batch_size
+
+    async def last_seq_of_job_async(self, db: AsyncSession, job) -> int:
+        """
+        Change log position right after a job: its last change, or, if it changed nothing, the last change
+        recorded by the time it completed. Unlike the job's timestamps it is not moved by a resume.
+        """
+        seq = (await db.execute(select(func.max(LectureChange.seq)).where(LectureChange.job_id == job.id))).scalar()
+        if seq is None and job.completed_at:
+            seq = (await db.execute(
+                select(func.max(LectureChange.seq)).where(LectureChange.created_at <= job.completed_at)
+            )).scalar()
+        return seq or 0
+
+    def _lectures_statement(self, date_from: Optional[date], date_to: Optional[date], changed_after_seq: Optional[int]):
+        statement = select(*[getattr(Lecture, column) for column in EXPORT_COLUMNS]).order_by(Lecture.id.asc())
+        if date_from:
+            statement = statement.where(Lecture.date >= date_from.isoformat())
+        if date_to:
+            statement = statement.where(Lecture.date <= date_to.isoformat())
+        if changed_after_seq is not None:
+            changed_ids = select(LectureChange.lecture_id).where(LectureChange.seq > changed_after_seq)
+            statement = statement.where(Lecture.id.in_(changed_ids))
+        return statement
+
+    def iter_lectures(self, date_from: Optional[date] = None, date_to: Optional[date] = None, changed_after_seq: Optional[int] = None) -> Iterator[dict]:
+        """
+        Yields every matching lecture as a dict. Each batch is read in its own short session, seeking past the
+        last id, so a slow client never holds a read transaction that would block writers between batches.
+        Rows changed while the export runs may show either version.
+        """
+        statement = self._lectures_statement(date_from, date_to, changed_after_seq)
+        last_id = 0
+        while True:
+            db = SessionLocal()
+            try:
+                rows = db.execute(statement.where(Lecture.id > last_id).limit(self.batch_size)).all()
+            finally:
+                db.close()
+            for row in rows:
+                yield row._asdict()
+            if len(rows) < self.batch_size:
+                return
+            last_id = rows[-1].id
+
+    def _batched(self, rows: Iterable[dict]) -> Iterator[list]:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def to_ndjson(self, rows: Iterable[dict]) -> Iterator[bytes]:
+        for batch in self._batched(rows):
+            yield "".join(json.dumps(row, ensure_ascii=False, default=str) + "\n" for row in batch).encode("utf-8")
+
+    def to_csv(self, rows: Iterable[dict], columns: list) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns)
+        writer.writeheader()
+        for batch in self._batched(rows):
+            writer.writerows(batch)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    def gzip(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) # 31 = gzip container
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+
+export_service = ExportService()
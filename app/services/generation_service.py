@@ -0,0 +1,32 @@
+from sqlalchemy import select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.app_state import AppState
+
+GENERATION_KEY = "data_generation"
+
+class GenerationService:
+    """
+    Global data generation counter. It is bumped in the same transaction as every write that
+    changes what the API serves, so readers can tell in one primary key lookup whether anything changed.
+    """
+    def _statement(self):
+        return select(AppState.value).where(AppState.key == GENERATION_KEY)
+
+    def bump(self, db: Session):
+        """
+        Increments the generation inside the caller's transaction; it becomes visible with the caller's commit.
+        """
+        db.execute(insert(AppState).values(key=GENERATION_KEY, value=0).on_conflict_do_nothing())
+        db.execute(
+            update(AppState).where(AppState.key == GENERATION_KEY).values(value=AppState.value + 1)
+        )
+
+    def get(self, db: Session) -> int:
+        return db.execute(self._statement()).scalar() or 0
+
+    async def get_async(self, db: AsyncSession) -> int:
+        return (await db.execute(self._statement())).scalar() or 0
+
+generation_service = GenerationService()
@@ -1,9 +1,9 @@
 import os.path
+import hashlib
 import logging
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
 from app.config import config
+from app.services.source_registry import DEFAULT_SOURCE
+from app.services.timing_service import timing_service
 
 logger = logging.getLogger(__name__)
 
@@ -12,33 +12,66 @@ class GoogleCalendarService:
         self.calendar_id = config.GOOGLE_CALENDAR_ID
         self.credentials_file = config.GOOGLE_SERVICE_ACCOUNT_FILE
         self.scopes = ['https://www.googleapis.com/auth/calendar']
-        self.service = None
+        self._service = None
+        self._events_resource = None
         
-        if self.calendar_id and self.credentials_file and os.path.exists(self.credentials_file):
+        # Sources may bring their own calendar, so the client is built even without a default one
+        self._enabled = bool(self.credentials_file and os.path.exists(self.credentials_file))
+        if self._enabled:
+            if not self.calendar_id:
+                logger.warning("GOOGLE_CALENDAR_ID not set. Only sources with their own calendar are synced to Google Calendar.")
+        else:
+            if not self.credentials_file:
+                logger.warning("GOOGLE_SERVICE_ACCOUNT_FILE not set. Google Calendar integration disabled.")
+            elif not os.path.exists(self.credentials_file):
+                logger.warning(f"Google credentials file not found at {self.credentials_file}. Integration disabled.")
+
+    @property
+    def service(self):
+        """
+        The API client, built on first use from the discovery document bundled with google-api-python-client:
+        web workers never import googleapiclient, and no process fetches the document over the network.
+        """
+        if self._service is None and self._enabled:
+            from google.oauth2 import service_account
+            from googleapiclient.discovery import build
             try:
                 creds = service_account.Credentials.from_service_account_file(
                     self.credentials_file, scopes=self.scopes)
-                self.service = build('calendar', 'v3', credentials=creds)
+                self._service = build('calendar', 'v3', credentials=creds, static_discovery=True, cache_discovery=False)
                 logger.info("Google Calendar service initialized successfully.")
             except Exception as e:
                 logger.error(f"Failed to initialize Google Calendar service: {e}")
-        else:
-            if not self.calendar_id:
-                logger.warning("GOOGLE_CALENDAR_ID not set. Google Calendar integration disabled.")
-            if not self.credentials_file:
-                logger.warning("GOOGLE_SERVICE_ACCOUNT_FILE not set. Google Calendar integration disabled.")
-            elif not os.path.exists(self.credentials_file):
-                logger.warning(f"Google credentials file not found at {self.credentials_file}. Integration disabled.")
+                self._enabled = False
+        return self._service
+
+    @service.setter
+    def service(self, service):
+        self._service = service
+        self._events_resource = None
+
+    def _events(self):
+        """
+        The events resource, built once: googleapiclient builds it from the discovery document on every
+        service.events() call, which costs more than preparing the request itself.
+        """
+        if self._events_resource is None:
+            self._events_resource = self.service.events()
+        return self._events_resource
 
     def _generate_event_id(self, lecture_dict: dict):
         """
-        Generates a deterministic Google Calendar event ID based on date and time.
+        Generates a deterministic Google Calendar event ID based on source, date and time.
         Characters allowed: 0-9 and a-v (base32hex).
         """
         date_str = lecture_dict.get('date', '').replace('-', '') # YYYYMMDD
-        time_str = lecture_dict.get('start_time', '').replace(':', '') # HHMM
+        # A lecture without a time keeps the id it had when the sheet's "nan" was stored
+        time_str = (lecture_dict.get('start_time') or 'nan').replace(':', '') # HHMM
+        # Sources other than the default one get a hex tag, so sources sharing a calendar do not collide
+        source = lecture_dict.get('source') or DEFAULT_SOURCE
+        source_tag = "" if source == DEFAULT_SOURCE else hashlib.sha1(source.encode()).hexdigest()[:8]
         # Prefix with 'pk' to make it descriptive and ensure it starts with a letter if needed
-        return f"pk{date_str}{time_str}00"
+        return f"pk{source_tag}{date_str}{time_str}00"
 
     def _prepare_event_body(self, lecture_dict: dict, event_id: str):
         """
@@ -75,12 +108,13 @@ class GoogleCalendarService:
             }
         }
 
-    def batch_sync_lectures(self, added: list, updated: list, deleted: list):
+    def batch_sync_lectures(self, added: list, updated: list, deleted: list, calendar_id: str = None):
         """
-        Synchronizes all changes in batches for better performance.
+        Synchronizes all changes in batches for better performance, to the default calendar unless given one.
         First retrieves existing events to decide whether to insert or update.
         """
-        if not self.service:
+        calendar_id = calendar_id or self.calendar_id
+        if not self.service or not calendar_id:
             return
 
         all_lectures = added + updated + deleted
@@ -108,11 +142,12 @@ class GoogleCalendarService:
                     logger.error(f"Error checking event existence: {exception}")
 
             for eid in chunk_ids:
-                batch.add(self.service.events().get(calendarId=self.calendar_id, eventId=eid), callback=get_callback)
+                batch.add(self._events().get(calendarId=calendar_id, eventId=eid), callback=get_callback)
             
             try:
                 batch.execute()
             except Exception as e:
+                timing_service.error("calendar")
                 logger.error(f"Error executing batch GET: {e}")
 
         logger.info(f"Found {len(existing_event_ids)} existing events in Google Calendar.")
@@ -125,7 +160,7 @@ class GoogleCalendarService:
         for l in deleted:
             event_id = self._generate_event_id(l)
             if event_id in existing_event_ids:
-                final_ops.append(self.service.events().delete(calendarId=self.calendar_id, eventId=event_id))
+                final_ops.append(self._events().delete(calendarId=calendar_id, eventId=event_id))
                 to_delete_count += 1
 
         # Additions and Updates: route to insert or update based on existence
@@ -136,10 +171,10 @@ class GoogleCalendarService:
             body = self._prepare_event_body(l, event_id)
             
             if event_id in existing_event_ids:
-                final_ops.append(self.service.events().update(calendarId=self.calendar_id, eventId=event_id, body=body))
+                final_ops.append(self._events().update(calendarId=calendar_id, eventId=event_id, body=body))
                 to_update_count += 1
             else:
-                final_ops.append(self.service.events().insert(calendarId=self.calendar_id, body=body))
+                final_ops.append(self._events().insert(calendarId=calendar_id, body=body))
                 to_insert_count += 1
 
         if not final_ops:
@@ -166,14 +201,16 @@ class GoogleCalendarService:
                 batch.execute()
                 logger.info(f"Successfully processed batch chunk of {len(chunk)} operations.")
             except Exception as e:
+                timing_service.error("calendar")
                 logger.error(f"Error executing final Google Calendar batch: {e}")
 
     def upsert_event(self, lecture_dict: dict):
         """
         Creates or updates a calendar event for a lecture using a deterministic ID.
         """
-        if not self.service:
+        if not self.service or not self.calendar_id:
             return
+        from googleapiclient.errors import HttpError
 
         pk_event_id = self._generate_event_id(lecture_dict)
         event_body = self._prepare_event_body(lecture_dict, pk_event_id)
@@ -181,9 +218,9 @@ class GoogleCalendarService:
         try:
             # Check if event already exists by ID
             try:
-                self.service.events().get(calendarId=self.calendar_id, eventId=pk_event_id).execute()
+                self._events().get(calendarId=self.calendar_id, eventId=pk_event_id).execute()
                 # If no error, it exists -> Update
-                updated_event = self.service.events().update(
+                updated_event = self._events().update(
                     calendarId=self.calendar_id, 
                     eventId=pk_event_id, 
                     body=event_body
@@ -193,7 +230,7 @@ class GoogleCalendarService:
             except HttpError as e:
                 if e.resp.status == 404:
                     # Not found -> Insert
-                    new_event = self.service.events().insert(
+                    new_event = self._events().insert(
                         calendarId=self.calendar_id, 
                         body=event_body
                     ).execute()
@@ -209,12 +246,13 @@ class GoogleCalendarService:
         """
         Deletes a calendar event using its deterministic ID.
         """
-        if not self.service:
+        if not self.service or not self.calendar_id:
             return
+        from googleapiclient.errors import HttpError
 
         pk_event_id = self._generate_event_id(lecture_dict)
         try:
-            self.service.events().delete(
+            self._events().delete(
                 calendarId=self.calendar_id, 
                 eventId=pk_event_id
             ).execute()
@@ -0,0 +1,183 @@
+import glob
+import gzip
+import logging
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.config import config
+from app.models.lecture_changes import LectureChange
+from app.models.lectures import Lecture
+from app.services.source_registry import DEFAULT_SOURCE
+
+logger = logging.getLogger(__name__)
+
+# Definition of the TZID the events use (RFC 5545 3.6.5): clients without a built-in tz database need it
+# to place the events. Poland follows the EU rules, CEST from the last Sunday of March to the last of October.
+VTIMEZONE = [
+    "BEGIN:VTIMEZONE",
+    "TZID:Europe/Warsaw",
+    "BEGIN:DAYLIGHT",
+    "TZOFFSETFROM:+0100",
+    "TZOFFSETTO:+0200",
+    "TZNAME:CEST",
+    "DTSTART:19700329T020000",
+    "RRULE:FREQ=YEARLY;BYMONTH=3;BYDAY=-1SU",
+    "END:DAYLIGHT",
+    "BEGIN:STANDARD",
+    "TZOFFSETFROM:+0200",
+    "TZOFFSETTO:+0100",
+    "TZNAME:CET",
+    "DTSTART:19701025T030000",
+    "RRULE:FREQ=YEARLY;BYMONTH=10;BYDAY=-1SU",
+    "END:STANDARD",
+    "END:VTIMEZONE",
+]
+
+class ICSService:
+    """
+    Renders the iCalendar subscription feed. The feed is written to disk once per version of the lectures,
+    plain and gzipped, and every worker serves those files until a sync changes a lecture. The version is
+    the last lecture change log seq: every lecture write is logged, while job status changes are not.
+    """
+    def __init__(self, cache_dir: str, stale_grace_seconds: int):
+        self.cache_dir = cache_dir
+        self.stale_grace_seconds = stale_grace_seconds
+
+    async def feed_version_async(self, db: AsyncSession) -> int:
+        return (await db.execute(select(func.max(LectureChange.seq)))).scalar() or 0
+
+    def _escape(self, text: str) -> str:
+        return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+    def _fold(self, line: str) -> str:
+        """
+        Folds a content line to 75 octets as required by RFC 5545.
+        """
+        encoded = line.encode("utf-8")
+        if len(encoded) <= 75:
+            return line + "\r\n"
+
+        parts = []
+        while len(encoded) > 75:
+            cut = 75 if not parts else 74 # continuation lines start with a space
+            # Never split a multi-byte UTF-8 sequence
+            while cut > 0 and (encoded[cut] & 0xC0) == 0x80:
+                cut -= 1
+            parts.append(encoded[:cut].decode("utf-8"))
+            encoded = encoded[cut:]
+        parts.append(encoded.decode("utf-8"))
+        return "\r\n ".join(parts) + "\r\n"
+
+    def _event_uid(self, lecture: Lecture) -> str:
+        # Derived from the same (source, date, start, end) key the sync matches lectures on, so it never changes
+        source = "" if lecture.source in (None, DEFAULT_SOURCE) else f"{lecture.source}-"
+        # A missing time was stored as the sheet's "nan" before the typed columns, UIDs keep using it
+        start_time, end_time = lecture.start_time or "nan", lecture.end_time or "nan"
+        return f"pk-{source}{lecture.date}-{start_time}-{end_time}@pk-schedule-sync".replace(":", "")
+
+    def _event_lines(self, lecture: Lecture) -> list:
+        date = lecture.date.replace("-", "")
+        stamp = (lecture.updated_at or datetime.utcnow()).strftime("%Y%m%dT%H%M%SZ")
+        lines = [
+            "BEGIN:VEVENT",
+            f"UID:{self._event_uid(lecture)}",
+            f"DTSTAMP:{stamp}",
+            f"LAST-MODIFIED:{stamp}",
+        ]
+
+        if lecture.start_time and lecture.end_time:
+            lines.append(f"DTSTART;TZID=Europe/Warsaw:{date}T{lecture.start_time.replace(':', '')}00")
+            lines.append(f"DTEND;TZID=Europe/Warsaw:{date}T{lecture.end_time.replace(':', '')}00")
+        else:
+            # The sheet had no readable time for this lecture, show it as an all-day event
+            next_day = (datetime.strptime(lecture.date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y%m%d")
+            lines.append(f"DTSTART;VALUE=DATE:{date}")
+            lines.append(f"DTEND;VALUE=DATE:{next_day}")
+
+        lines.append(f"SUMMARY:{self._escape(lecture.subject or lecture.summary)}")
+        if lecture.room:
+            lines.append(f"LOCATION:{self._escape(lecture.room)}")
+
+        description = [f"Summary: {lecture.summary}", f"Teacher: {lecture.teacher or 'N/A'}"]
+        if lecture.type:
+            description.append(f"Type: {lecture.type}")
+        lines.append(f"DESCRIPTION:{self._escape(chr(10).join(description))}")
+        lines.append("END:VEVENT")
+        return lines
+
+    def _render(self, db: Session, path: str):
+        header = [
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            "PRODID:-//PK Schedule Sync//EN",
+            "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH",
+            "X-WR-CALNAME:PK Schedule",
+            "X-WR-TIMEZONE:Europe/Warsaw",
+            *VTIMEZONE,
+        ]
+        statement = select(Lecture) \
+            .where(Lecture.is_cancelled == 0) \
+            .order_by(Lecture.date.asc(), Lecture.start_time.asc(), Lecture.id.asc()) \
+            .execution_options(yield_per=500)
+
+        count = 0
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.writelines(self._fold(line) for line in header)
+            for lecture in db.execute(statement).scalars():
+                f.writelines(self._fold(line) for line in self._event_lines(lecture))
+                count += 1
+            f.write(self._fold("END:VCALENDAR"))
+        return count
+
+    def get_feed(self, db: Session, version: int) -> tuple:
+        """
+        Returns the paths of the plain and gzipped feed for the given version, rendering them if needed.
+        Files are written under a temporary name and renamed, so concurrent workers never see partial output.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, f"schedule-v{version}.ics")
+        gz_path = f"{path}.gz"
+        if os.path.exists(path) and os.path.exists(gz_path):
+            return path, gz_path
+
+        tmp_suffix = f".{os.getpid()}.tmp"
+        count = self._render(db, path + tmp_suffix)
+        with open(path + tmp_suffix, "rb") as src, gzip.open(gz_path + tmp_suffix, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(gz_path + tmp_suffix, gz_path)
+        os.replace(path + tmp_suffix, path)
+        logger.info(f"Rendered ICS feed for version {version} with {count} events.")
+
+        self._drop_superseded()
+        return path, gz_path
+
+    def _drop_superseded(self):
+        """
+        Deletes the feeds of previous versions once they have been superseded for the grace period:
+        a response of this or another worker may still be streaming a feed right after a newer one is rendered.
+        """
+        feeds = []
+        for feed in glob.glob(os.path.join(self.cache_dir, "schedule-*.ics")):
+            try:
+                feeds.append((os.path.getmtime(feed), feed))
+            except OSError:
+                pass # deleted by another worker meanwhile
+        feeds.sort()
+
+        cutoff = time.time() - self.stale_grace_seconds
+        # A feed was superseded when the next newer one was rendered
+        for (_, feed), (superseded_at, _) in zip(feeds, feeds[1:]):
+            if superseded_at >= cutoff:
+                break
+            for stale in (feed, f"{feed}.gz"):
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+
+ics_service = ICSService(cache_dir=config.ICS_CACHE_DIR, stale_grace_seconds=config.ICS_STALE_GRACE_SECONDS)
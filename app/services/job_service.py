@@ -1,55 +1,269 @@
 import asyncio
+import logging
+import uuid
 from datetime import datetime
+from typing import Optional
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.config import config
 from app.models.jobs import Job
 from app.database import SessionLocal
 from app.jobs.sync_job import run_sync_job
+from app.jobs.executor import job_executor
 from app.services.slack_service import slack_service
+from app.services.generation_service import generation_service
+from app.services.event_service import event_service
+from app.services.lease_service import lease_service
+from app.services.source_registry import source_registry
+from app.services.timing_service import timing_service
+from app.services.profiling_service import profiling_service
+from app.services.checkpoint_service import checkpoint_service
+from app.services.metrics_service import metrics_service
+
+logger = logging.getLogger(__name__)
+
+# Only one sync may run at a time across all workers
+SYNC_LEASE = "sync"
 
 class JobService:
-    async def execute_sync(self, db: Session, triggered_by: str = "system"):
+    def _fail_abandoned_job(self, db: Session):
+        """
+        Marks the job of an expired sync lease as failed: the worker running it stopped renewing the lease.
+        """
+        lease = lease_service.get(db, SYNC_LEASE)
+        if not lease or not lease.job_id or lease.expires_at >= datetime.utcnow():
+            return
+
+        job = db.get(Job, lease.job_id)
+        if job and job.status == "running":
+            logger.warning(f"Reclaiming sync lease of job {job.id}, its worker stopped renewing it.")
+            job.status = "failed"
+            job.completed_at = datetime.utcnow()
+            job.message = "Error: The worker running this job stopped responding."
+            generation_service.bump(db)
+            db.commit()
+            event_service.status(job.id, job.status, job.message)
+
+    async def execute_sync(self, db: Session, triggered_by: str = "system", profile: bool = False):
+        """
+        Starts a sync job, or returns the running one: duplicate triggers attach to the job holding the sync lease.
+        A job keeps the lease after its final status, through the Slack and Calendar fan-out; a trigger arriving
+        then waits for the release and starts a new job, as the finished one will not see its changes.
+        With SYNC_EXECUTION_MODE=worker the job is only queued, the standalone worker runs it.
+        profile captures a profile of the run, see profiling_service.
+        """
+        if config.SYNC_EXECUTION_MODE == "worker":
+            return self.enqueue_sync(db, triggered_by, profile=profile)
+
+        self._fail_abandoned_job(db)
+
+        job_id = str(uuid.uuid4())
+        while not lease_service.acquire(db, SYNC_LEASE, holder=job_id, ttl=config.SYNC_LEASE_TTL_SECONDS, job_id=job_id):
+            db.commit()
+            lease = lease_service.get(db, SYNC_LEASE)
+            running_job = db.get(Job, lease.job_id) if lease and lease.job_id else None
+            if running_job and running_job.status in ("queued", "running"):
+                logger.info(f"Sync already running as job {running_job.id}, attaching {triggered_by} trigger to it.")
+                return running_job
+            if lease and lease.holder:
+                # Its job has finished and is still publishing its changes: wait for it to release the lease
+                await asyncio.sleep(config.SYNC_LEASE_WAIT_INTERVAL)
+            # Otherwise the running job released the lease in the meantime, try again
+
         new_job = Job(
+            id=job_id,
             status="running",
             started_at=datetime.utcnow(),
             message="Initialising sync job...",
-            triggered_by=triggered_by
+            triggered_by=triggered_by,
+            profile_requested=1 if profile else 0
         )
         db.add(new_job)
+        generation_service.bump(db)
+        # The lease and the job it points to become visible together
         db.commit()
         db.refresh(new_job)
         
         job_id = new_job.id
+        event_service.status(job_id, new_job.status, new_job.message)
         
+        self._start_job(new_job)
+        return new_job
+
+    def _start_job(self, job: Job):
+        job_id = job.id
         # Send Slack notification to Status Channel
+        resumed = (job.attempts or 1) > 1
         slack_service.send_job_status(
-            title="🔄 Sync Job Started",
+            title="🔁 Sync Job Resumed" if resumed else "🔄 Sync Job Started",
             status="Running",
-            message=f"Job ID: {job_id}\nTriggered by: {triggered_by}"
+            message=f"Job ID: {job_id}\nTriggered by: {job.triggered_by}" + (f"\nAttempt: {job.attempts}" if resumed else "")
         )
-        
-        # Simulate long running task in background
-        asyncio.create_task(self._run_job(job_id))
-        
+
+        # Run in background, tracked by the executor
+        profile = bool(job.profile_requested)
+        job_executor.submit(job_id, lambda: self._run_job(job_id, profile=profile), on_cancelled_queued=self._finish_cancelled_queued)
+
+    def enqueue_sync(self, db: Session, triggered_by: str = "system", profile: bool = False) -> Job:
+        """
+        Queues a sync job for the standalone worker, or returns the one already queued or running.
+        A profile request attaching to a queued job still applies to it.
+        """
+        self._fail_abandoned_job(db)
+
+        # Taking the write lock first serialises concurrent triggers from every process
+        generation_service.bump(db)
+        pending = db.execute(
+            select(Job).where(Job.status.in_(("queued", "running"))).order_by(Job.started_at.asc()).limit(1)
+        ).scalars().first()
+        if pending:
+            if profile and pending.status == "queued" and not pending.profile_requested:
+                pending.profile_requested = 1
+                db.commit()
+            else:
+                db.rollback()
+            logger.info(f"Sync already {pending.status} as job {pending.id}, attaching {triggered_by} trigger to it.")
+            return pending
+
+        new_job = Job(
+            id=str(uuid.uuid4()),
+            status="queued",
+            started_at=datetime.utcnow(),
+            message="Waiting for a sync worker...",
+            triggered_by=triggered_by,
+            profile_requested=1 if profile else 0
+        )
+        db.add(new_job)
+        db.commit()
+        db.refresh(new_job)
+        event_service.status(new_job.id, new_job.status, new_job.message)
         return new_job
 
-    async def _run_job(self, job_id: str):
+    def claim_next_job(self, db: Session) -> Optional[str]:
+        """
+        Worker side of the queue: moves the oldest queued job to running under the sync lease and starts it.
+        Returns its id, or None if nothing could be claimed.
+        """
+        self._fail_abandoned_job(db)
+
+        job_id = db.execute(
+            select(Job.id).where(Job.status == "queued").order_by(Job.started_at.asc()).limit(1)
+        ).scalar()
+        if not job_id:
+            return None
+
+        # Conditional update: when several workers race for the same job only one of them flips it
+        claimed = db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "queued")
+            .values(status="running", started_at=datetime.utcnow(), message="Initialising sync job...")
+        ).rowcount
+        if not claimed or not lease_service.acquire(db, SYNC_LEASE, holder=job_id, ttl=config.SYNC_LEASE_TTL_SECONDS, job_id=job_id):
+            db.rollback()
+            return None
+        generation_service.bump(db)
+        db.commit()
+
+        job = db.get(Job, job_id)
+        logger.info(f"Claimed queued job {job_id}.")
+        event_service.status(job_id, job.status, job.message)
+        self._start_job(job)
+        return job_id
+
+    async def resume_job(self, db: Session, job_id: str) -> Optional[Job]:
+        """
+        Runs a failed or cancelled job again under its id. Sources it already committed are not synced again,
+        the others continue after their last checkpoint. With SYNC_EXECUTION_MODE=worker the job is queued.
+        Returns None if the job does not exist. The database work runs in a thread, the job starts on the event loop.
+        """
+        job = await asyncio.to_thread(self._reopen_job, db, job_id)
+        if job and job.status == "running":
+            self._start_job(job)
+        return job
+
+    def _reopen_job(self, db: Session, job_id: str) -> Optional[Job]:
+        self._fail_abandoned_job(db)
+
+        # Taking the write lock first serialises concurrent resumes of the same job
+        generation_service.bump(db)
+        job = db.get(Job, job_id)
+        if not job:
+            db.rollback()
+            return None
+        if job.status not in ("failed", "cancelled"):
+            db.rollback()
+            raise ValueError(f"Job is {job.status}, only failed or cancelled jobs can be resumed.")
+
+        if config.SYNC_EXECUTION_MODE == "worker":
+            job.status = "queued"
+            job.message = "Waiting for a sync worker to resume the job..."
+        else:
+            if not lease_service.acquire(db, SYNC_LEASE, holder=job_id, ttl=config.SYNC_LEASE_TTL_SECONDS, job_id=job_id):
+                db.rollback()
+                raise ValueError("Another sync job is running, resume this one once it has finished.")
+            job.status = "running"
+            job.message = "Resuming from the last checkpoint..."
+        job.started_at = datetime.utcnow()
+        job.completed_at = None
+        job.cancel_requested = 0
+        job.attempts = (job.attempts or 1) + 1
+        db.commit()
+        # Loaded here, so the caller on the event loop reads it without a query
+        db.refresh(job)
+        logger.info(f"Resuming job {job_id}, attempt {job.attempts}.")
+        event_service.status(job_id, job.status, job.message)
+        return job
+
+    def _finish_cancelled_queued(self, job_id: str):
+        """
+        Records a job cancelled while it waited for an executor slot, and frees the sync lease taken for it.
+        """
+        reason = job_executor.cancel_reason(job_id) or "Cancelled."
+        db = SessionLocal()
+        try:
+            job = db.get(Job, job_id)
+            if job and job.status == "running":
+                # Cancelled on request counts as cancelled; killed by a shutdown counts as failed
+                job.status = "cancelled" if job.cancel_requested else "failed"
+                job.completed_at = datetime.utcnow()
+                job.message = reason
+            lease_service.release(db, SYNC_LEASE, holder=job_id)
+            generation_service.bump(db)
+            db.commit()
+            if job:
+                event_service.status(job_id, job.status, job.message)
+        except Exception as e:
+            logger.error(f"Failed to record the cancellation of queued job {job_id}: {e}")
+        finally:
+            db.close()
+
+    async def _run_job(self, job_id: str, profile: bool = False):
+        # Losing the lease means another worker may run a sync meanwhile, so the job stops as failed
+        on_lost = lambda: job_executor.cancel(job_id, reason="Error: Lost the sync lease, another worker may have taken over.")
+        async with lease_service.keep_alive(SYNC_LEASE, holder=job_id, ttl=config.SYNC_LEASE_TTL_SECONDS, on_lost=on_lost):
+            await self._run_sync(job_id, profile=profile)
+
+    async def _run_sync(self, job_id: str, profile: bool = False):
         db = SessionLocal()
+        timings = timing_service.start()
+        capture = profiling_service.start(job_id) if profile else None
         try:
             # Execute the actual sync job logic
-            result_data = await run_sync_job(job_id)
+            result_data = await self._run_attempts(db, job_id)
             
             result_msg = result_data.get("message", "Sync completed.")
-            added = result_data.get("added", [])
-            updated = result_data.get("updated", [])
-            deleted = result_data.get("deleted", [])
-            sheet_url = result_data.get("sheet_url")
+            source_results = result_data.get("sources", [])
     
             job = db.query(Job).filter(Job.id == job_id).first()
             if job:
                 job.status = "completed"
                 job.completed_at = datetime.utcnow()
                 job.message = result_msg
+                checkpoint_service.clear(db, job_id)
+                generation_service.bump(db)
                 db.commit()
+                event_service.status(job_id, job.status, result_msg)
 
                 # Send Slack notification to Status Channel
                 slack_service.send_job_status(
@@ -58,31 +272,39 @@ class JobService:
                     message=f"Job ID: {job_id}\n{result_msg}"
                 )
 
-                # Send detailed notice if anything changed
-                if added or updated or deleted:
-                    slack_service.send_schedule_update(
-                        title="📅 Schedule Changes Detected",
-                        message=f"Sync finished. See what changed below:",
-                        added=added,
-                        updated=updated,
-                        deleted=deleted,
-                        sheet_url=sheet_url
-                    )
-                    
-                    # Sync with Google Calendar (wrapped in try-except to not break the flow)
-                    try:
-                        from app.services.google_calendar_service import google_calendar_service
-                        google_calendar_service.batch_sync_lectures(added, updated, deleted)
-                    except Exception as gcal_err:
-                        import logging
-                        logging.getLogger(__name__).error(f"Google Calendar sync failed: {str(gcal_err)}")
+                # Send detailed notices, to the channel and calendar of each source where anything changed
+                changed = [result for result in source_results if result["added"] or result["updated"] or result["deleted"]]
+                if changed:
+                    event_service.progress(job_id, "fanout", "Publishing changes to Slack and Google Calendar")
+                for result in changed:
+                    self._publish_changes(result, single=len(source_results) == 1)
+        except asyncio.CancelledError:
+            reason = job_executor.cancel_reason(job_id) or "Cancelled."
+            job = db.get(Job, job_id)
+            if job:
+                # Cancelled on request counts as cancelled; killed by a shutdown counts as failed
+                job.status = "cancelled" if job.cancel_requested else "failed"
+                job.completed_at = datetime.utcnow()
+                job.message = reason
+                generation_service.bump(db)
+                db.commit()
+                event_service.status(job_id, job.status, job.message)
+
+                slack_service.send_job_status(
+                    title="⛔ Sync Job Cancelled" if job.status == "cancelled" else "❌ Sync Job Failed",
+                    status=job.status.capitalize(),
+                    message=f"Job ID: {job_id}\n{reason}"
+                )
+            raise
         except Exception as e:
             job = db.query(Job).filter(Job.id == job_id).first()
             if job:
                 job.status = "failed"
                 job.completed_at = datetime.utcnow()
                 job.message = f"Error: {str(e)}"
+                generation_service.bump(db)
                 db.commit()
+                event_service.status(job_id, job.status, job.message)
 
                 # Send Slack notification to Status Channel
                 slack_service.send_job_status(
@@ -91,15 +313,167 @@ class JobService:
                     message=f"Job ID: {job_id}\nError: {str(e)}"
                 )
         finally:
+            if capture:
+                profiling_service.finish(db, capture)
+            self._save_timings(db, job_id, timings)
             db.close()
+            event_service.prune()
+            checkpoint_service.prune()
+
+    async def _run_attempts(self, db: Session, job_id: str) -> dict:
+        """
+        Runs the sync, retrying a failed attempt up to JOB_RETRY_ATTEMPTS times with a doubling delay.
+        Each attempt continues after the stages checkpointed by the previous ones.
+        """
+        for retry in range(config.JOB_RETRY_ATTEMPTS + 1):
+            try:
+                return await run_sync_job(job_id)
+            except Exception as e:
+                if retry == config.JOB_RETRY_ATTEMPTS:
+                    raise
+                delay = config.JOB_RETRY_DELAY_SECONDS * 2 ** retry
+                logger.warning(f"Attempt of job {job_id} failed: {str(e)}. Retrying in {delay:.0f}s.")
+                db.rollback()
+                job = db.get(Job, job_id)
+                if job:
+                    job.attempts = (job.attempts or 1) + 1
+                    job.message = f"Attempt failed: {str(e)}. Retrying from the last checkpoint in {delay:.0f}s..."
+                    generation_service.bump(db)
+                    db.commit()
+                    event_service.status(job_id, job.status, job.message)
+                await asyncio.sleep(delay)
+
+    def _save_timings(self, db: Session, job_id: str, timings):
+        """
+        Stores the stage timings once everything, the fan-out included, has run, and adds them to the metrics.
+        """
+        try:
+            db.rollback()
+            db.execute(update(Job).where(Job.id == job_id).values(timings=timings.to_json()))
+            metrics_service.record(db, timings)
+            generation_service.bump(db)
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to store timings of job {job_id}: {e}")
 
+    def _publish_changes(self, result: dict, single: bool):
+        source = source_registry.get(result["source"])
+        added, updated, deleted = result["added"], result["updated"], result["deleted"]
+
+        slack_service.send_schedule_update(
+            title="📅 Schedule Changes Detected",
+            message="Sync finished. See what changed below:" if single else f"Sync of *{result['source']}* finished. See what changed below:",
+            added=added,
+            updated=updated,
+            deleted=deleted,
+            sheet_url=result.get("sheet_url"),
+            channel=source.slack_channel if source else None
+        )
+        
+        # Sync with Google Calendar (wrapped in try-except to not break the flow)
+        try:
+            from app.services.google_calendar_service import google_calendar_service
+            with timing_service.stage("calendar", source=result["source"], lectures=len(added) + len(updated) + len(deleted)):
+                google_calendar_service.batch_sync_lectures(added, updated, deleted, calendar_id=source.calendar_id if source else None)
+        except Exception as gcal_err:
+            timing_service.error("calendar")
+            logger.error(f"Google Calendar sync failed: {str(gcal_err)}")
+
+    async def cancel_job(self, db: Session, job_id: str) -> Optional[Job]:
+        """
+        Cancels a queued job right away, or requests cancellation of a running one. The flag is stored on the job,
+        so the worker running it picks it up even if that is not this one. Returns None if the job does not exist.
+        The database work runs in a thread, a job of this worker is interrupted on the event loop.
+        """
+        job = await asyncio.to_thread(self._request_cancel, db, job_id)
+        if job and job.status == "running":
+            job_executor.cancel(job_id)
+        return job
+
+    def _request_cancel(self, db: Session, job_id: str) -> Optional[Job]:
+        job = db.get(Job, job_id)
+        if not job:
+            return None
+        if job.status == "queued":
+            # Not picked up by a worker yet, nothing to interrupt
+            job.status = "cancelled"
+            job.completed_at = datetime.utcnow()
+            job.message = "Cancelled before it started."
+            generation_service.bump(db)
+            db.commit()
+            db.refresh(job)
+            event_service.status(job_id, job.status, job.message)
+            return job
+        if job.status != "running":
+            raise ValueError(f"Job is {job.status}, only queued or running jobs can be cancelled.")
+
+        job.cancel_requested = 1
+        job.message = "Cancellation requested..."
+        generation_service.bump(db)
+        db.commit()
+        db.refresh(job)
+        event_service.status(job_id, job.status, job.message)
+        return job
+
+    def recover_orphaned_jobs(self, db: Session):
+        """
+        Runs at startup. A running job not backed by the live sync lease has lost its worker:
+        depending on JOB_RECOVERY_MODE it is marked as failed or the most recent one is run again.
+        """
+        # Taking the write lock first: workers booting together run the recovery one after another,
+        # each seeing the lease and jobs as the previous one left them
+        generation_service.bump(db)
+        lease = lease_service.get(db, SYNC_LEASE)
+        live_job_id = lease.job_id if lease and lease.expires_at >= datetime.utcnow() else None
+        statement = select(Job).where(Job.status == "running").order_by(Job.started_at.desc())
+        if live_job_id:
+            statement = statement.where(Job.id != live_job_id)
+        orphaned = db.execute(statement).scalars().all()
+
+        requeue = None
+        if orphaned and config.JOB_RECOVERY_MODE == "requeue" and not live_job_id:
+            candidate = orphaned[0]
+            # Not reentrant: workers booting together all see the same orphan, only the first may take it
+            if lease_service.acquire(db, SYNC_LEASE, holder=candidate.id, ttl=config.SYNC_LEASE_TTL_SECONDS, job_id=candidate.id, reentrant=False):
+                requeue = candidate
+                orphaned = orphaned[1:]
+
+        for job in orphaned:
+            job.status = "failed"
+            job.completed_at = datetime.utcnow()
+            job.message = "Error: Interrupted, the worker running this job stopped. It can be resumed."
+        if requeue:
+            requeue.attempts = (requeue.attempts or 1) + 1
+        if not orphaned and not requeue:
+            db.rollback()
+            return
+        db.commit()
+
+        for job in orphaned:
+            logger.warning(f"Marked orphaned job {job.id} as failed.")
+            event_service.status(job.id, job.status, job.message)
+        if requeue:
+            logger.info(f"Requeued orphaned job {requeue.id}.")
+            event_service.status(requeue.id, requeue.status, "Requeued after restart.")
+            job_executor.submit(requeue.id, lambda: self._run_job(requeue.id, profile=bool(requeue.profile_requested)), on_cancelled_queued=self._finish_cancelled_queued)
+
+    def _jobs_statement(self, skip: int, limit: int):
+        return select(Job).order_by(Job.completed_at.desc().nullslast()).offset(skip).limit(limit)
 
     def get_job_status(self, db: Session, job_id: str):
-        return db.query(Job).filter(Job.id == job_id).first()
+        return db.get(Job, job_id)
 
     def get_jobs(self, db: Session, skip: int = 0, limit: int = 100):
-        total = db.query(Job).count()
-        items = db.query(Job).order_by(Job.completed_at.desc().nullslast()).offset(skip).limit(limit).all()
+        total = db.execute(select(func.count(Job.id))).scalar_one()
+        items = db.execute(self._jobs_statement(skip, limit)).scalars().all()
+        return items, total
+
+    async def get_job_status_async(self, db: AsyncSession, job_id: str):
+        return await db.get(Job, job_id)
+
+    async def get_jobs_async(self, db: AsyncSession, skip: int = 0, limit: int = 100):
+        total = (await db.execute(select(func.count(Job.id)))).scalar_one()
+        items = (await db.execute(self._jobs_statement(skip, limit))).scalars().all()
         return items, total
 
 job_service = JobService()
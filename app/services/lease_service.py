@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+from sqlalchemy import or_, select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.models.leases import Lease
+
+logger = logging.getLogger(__name__)
+
+class LeaseService:
+    """
+    DB-backed leases. acquire() and release() run inside the caller's transaction, so taking a lease
+    and writing what it protects commit atomically; SQLite serialises competing writers meanwhile.
+    """
+    def acquire(self, db: Session, name: str, holder: str, ttl: int, job_id: str = None, reentrant: bool = True) -> bool:
+        """
+        Takes the lease if it is free, expired or, unless reentrant is False, already ours. Returns whether we hold it now.
+        Holders that several processes may claim at once (e.g. an orphaned job id) must not be reentrant,
+        or every claimant would succeed.
+        """
+        now = datetime.utcnow()
+        db.execute(insert(Lease).values(name=name, expires_at=datetime.min).on_conflict_do_nothing())
+        claimable = [Lease.holder.is_(None), Lease.expires_at < now]
+        if reentrant:
+            claimable.append(Lease.holder == holder)
+        result = db.execute(
+            update(Lease)
+            .where(Lease.name == name, or_(*claimable))
+            .values(holder=holder, job_id=job_id, expires_at=now + timedelta(seconds=ttl), renewed_at=now)
+        )
+        return result.rowcount == 1
+
+    def renew(self, db: Session, name: str, holder: str, ttl: int) -> bool:
+        now = datetime.utcnow()
+        result = db.execute(
+            update(Lease)
+            .where(Lease.name == name, Lease.holder == holder)
+            .values(expires_at=now + timedelta(seconds=ttl), renewed_at=now)
+        )
+        return result.rowcount == 1
+
+    def release(self, db: Session, name: str, holder: str):
+        db.execute(
+            update(Lease)
+            .where(Lease.name == name, Lease.holder == holder)
+            .values(holder=None, job_id=None, expires_at=datetime.utcnow())
+        )
+
+    def get(self, db: Session, name: str) -> Optional[Lease]:
+        return db.execute(select(Lease).where(Lease.name == name)).scalar()
+
+    @asynccontextmanager
+    async def keep_alive(self, name: str, holder: str, ttl: int, on_lost: Optional[Callable[[], None]] = None):
+        """
+        Renews the lease in the background every third of its TTL while the block runs, then releases it.
+        If the process dies the heartbeat stops and the lease expires on its own. If a renewal finds the lease
+        taken over (e.g. it expired during a stall), the heartbeat stops and calls on_lost, which must make
+        the block stop: whatever the lease protects may already be in other hands.
+        """
+        async def heartbeat():
+            while True:
+                await asyncio.sleep(ttl / 3)
+                db = SessionLocal()
+                try:
+                    renewed = self.renew(db, name, holder, ttl)
+                    db.commit()
+                except Exception as e:
+                    logger.error(f"Failed to renew lease '{name}': {e}")
+                    continue
+                finally:
+                    db.close()
+                if not renewed:
+                    logger.warning(f"Lease '{name}' held by {holder} was lost.")
+                    if on_lost:
+                        on_lost()
+                    return
+
+        task = asyncio.create_task(heartbeat())
+        try:
+            yield
+        finally:
+            task.cancel()
+            # Wait for it to stop, so no renewal runs after the release below
+            await asyncio.wait([task])
+            db = SessionLocal()
+            try:
+                self.release(db, name, holder)
+                db.commit()
+            finally:
+                db.close()
+
+lease_service = LeaseService()
@@ -1,24 +1,155 @@
+import base64
+import json
+from typing import Optional
+from sqlalchemy import and_, func, literal, literal_column, or_, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.lectures import Lecture
 from app.models.jobs import Job
+from app.models.types import normalize_time
+from app.schemas.lectures import LectureFilter
 from datetime import datetime
 
+# Flat projection of a lecture and its last sync job, mapped 1:1 onto LectureResponse
+LISTING_COLUMNS = (
+    Lecture.id,
+    Lecture.source,
+    Lecture.date,
+    Lecture.start_time,
+    Lecture.end_time,
+    Lecture.summary,
+    Lecture.subject,
+    Lecture.type,
+    Lecture.teacher,
+    Lecture.room,
+    Job.id.label("last_sync_job_id"),
+    Job.status.label("last_sync_status"),
+    Job.completed_at.label("last_sync_completed_at"),
+)
+
 class LectureService:
-    def get_lectures(self, db: Session, skip: int = 0, limit: int = 100):
-        today_str = datetime.now().strftime('%Y-%m-%d')
-        
-        query = db.query(Lecture).filter(
-            Lecture.date >= today_str,
+    """
+    Statements are built once and executed either on a sync Session or awaited on an AsyncSession.
+    """
+    def _match_query(self, q: str) -> str:
+        """
+        Turns free text into an FTS5 query: every word must match as a prefix, FTS syntax is neutralised.
+        """
+        terms = [term.replace('"', '""') for term in q.split()]
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def _filter_clauses(self, filters: Optional[LectureFilter]) -> list:
+        filters = filters or LectureFilter()
+        date_from = filters.date_from.isoformat() if filters.date_from else datetime.now().strftime('%Y-%m-%d')
+
+        clauses = [
+            Lecture.date >= date_from,
             Lecture.is_cancelled == 0
-        )
-        
-        total = query.count()
-        
-        items = query.order_by(Lecture.date.asc(), Lecture.start_time.asc()) \
-                     .offset(skip) \
-                     .limit(limit) \
-                     .all()
-        
+        ]
+        if filters.date_to:
+            clauses.append(Lecture.date <= filters.date_to.isoformat())
+        for column in ("source", "subject", "teacher", "room", "type"):
+            value = getattr(filters, column)
+            if value:
+                clauses.append(getattr(Lecture, column) == value)
+        if filters.q and filters.q.strip():
+            matches = select(literal_column("rowid")) \
+                .select_from(text("lectures_fts")) \
+                .where(text("lectures_fts MATCH :fts_query").bindparams(fts_query=self._match_query(filters.q)))
+            clauses.append(Lecture.id.in_(matches))
+        return clauses
+
+    def _listing_statement(self, filters: Optional[LectureFilter]):
+        """
+        Matching lectures with their last sync job joined in, so a page is read in a single query.
+        """
+        return select(*LISTING_COLUMNS) \
+                 .outerjoin(Job, Lecture.last_sync_id == Job.id) \
+                 .where(*self._filter_clauses(filters)) \
+                 .order_by(Lecture.date.asc(), Lecture.start_time.asc(), Lecture.id.asc()) # id keeps the keyset order total
+
+    def _count_statement(self, filters: Optional[LectureFilter]):
+        return select(func.count(Lecture.id)).where(*self._filter_clauses(filters))
+
+    def _page_statement(self, filters: Optional[LectureFilter], skip: int, limit: int):
+        return self._listing_statement(filters).offset(skip).limit(limit)
+
+    def _after_statement(self, filters: Optional[LectureFilter], cursor: Optional[str], limit: int):
+        statement = self._listing_statement(filters)
+        if cursor:
+            statement = statement.where(self._after_clause(*self.decode_cursor(cursor)))
+        # Fetch one extra row to know whether there is a next page
+        return statement.limit(limit + 1)
+
+    def _after_clause(self, date: str, start_time: Optional[str], lecture_id: int):
+        """
+        Rows after the cursor position in the listing order. Values are bound with the column types,
+        which store dates and times as integers. Lectures without a time sort first within their day;
+        a NULL would make the row-value comparison unknown, so that position is spelled out.
+        """
+        date = literal(date, Lecture.date.type)
+        if start_time is None:
+            return or_(
+                Lecture.date > date,
+                and_(Lecture.date == date, or_(Lecture.start_time.is_not(None), Lecture.id > lecture_id))
+            )
+        return tuple_(Lecture.date, Lecture.start_time, Lecture.id) > \
+            tuple_(date, literal(start_time, Lecture.start_time.type), lecture_id)
+
+    def _split_page(self, rows: list, limit: int):
+        next_cursor = self.encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return rows[:limit], next_cursor
+
+    def encode_cursor(self, lecture) -> str:
+        """
+        Builds an opaque cursor pointing right after the given lecture.
+        """
+        raw = json.dumps([lecture.date, lecture.start_time, lecture.id])
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, cursor: str) -> tuple:
+        """
+        Reads a cursor built by encode_cursor. Raises ValueError for anything else: its values are bound
+        through the integer column types, which would fail on them mid-query or compare them as garbage.
+        """
+        try:
+            date, start_time, lecture_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            valid_date = datetime.strptime(date, "%Y-%m-%d").strftime("%Y-%m-%d") == date
+        except Exception:
+            raise ValueError("Invalid cursor.")
+        if not valid_date:
+            raise ValueError("Invalid cursor.")
+        if start_time is not None and (not isinstance(start_time, str) or normalize_time(start_time) != start_time):
+            raise ValueError("Invalid cursor.")
+        if not isinstance(lecture_id, int) or isinstance(lecture_id, bool):
+            raise ValueError("Invalid cursor.")
+        return date, start_time, lecture_id
+
+    def get_lectures(self, db: Session, skip: int = 0, limit: int = 100, filters: Optional[LectureFilter] = None):
+        total = db.execute(self._count_statement(filters)).scalar_one()
+        items = db.execute(self._page_statement(filters, skip, limit)).all()
         return items, total
 
+    def get_lectures_after(self, db: Session, cursor: Optional[str] = None, limit: int = 100, with_total: bool = False, filters: Optional[LectureFilter] = None):
+        """
+        Keyset pagination: seeks right past the cursor position on the listing index
+        instead of scanning and discarding an OFFSET, so every page costs O(page size).
+        Returns the page, the cursor of the next page (None on the last one) and the total, if requested.
+        """
+        statement = self._after_statement(filters, cursor, limit)
+        total = db.execute(self._count_statement(filters)).scalar_one() if with_total else None
+        items, next_cursor = self._split_page(db.execute(statement).all(), limit)
+        return items, next_cursor, total
+
+    async def get_lectures_async(self, db: AsyncSession, skip: int = 0, limit: int = 100, filters: Optional[LectureFilter] = None):
+        total = (await db.execute(self._count_statement(filters))).scalar_one()
+        items = (await db.execute(self._page_statement(filters, skip, limit))).all()
+        return items, total
+
+    async def get_lectures_after_async(self, db: AsyncSession, cursor: Optional[str] = None, limit: int = 100, with_total: bool = False, filters: Optional[LectureFilter] = None):
+        statement = self._after_statement(filters, cursor, limit)
+        total = (await db.execute(self._count_statement(filters))).scalar_one() if with_total else None
+        items, next_cursor = self._split_page((await db.execute(statement)).all(), limit)
+        return items, next_cursor, total
+
 lecture_service = LectureService()
@@ -0,0 +1,133 @@
+import threading
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from app.models.jobs import Job
+from app.models.sync_metrics import SyncMetric
+from app.services.generation_service import generation_service
+
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+def _labels(**labels) -> str:
+    rendered = ",".join(f'{key}="{str(value)}"' for key, value in sorted(labels.items()) if value is not None)
+    return f"{{{rendered}}}" if rendered else ""
+
+def observations(data: dict) -> dict:
+    """
+    What one job run adds to each series, from its timings in the JobTimings.to_json() form.
+    """
+    values = {}
+    def add(name: str, value: float, label: str = "", le: str = ""):
+        values[(name, label, le)] = values.get((name, label, le), 0) + value
+
+    for span in data.get("stages", []):
+        stage, seconds = span["stage"], span["seconds"]
+        for bound in STAGE_BUCKETS:
+            if seconds <= bound:
+                add("stage_duration_seconds_bucket", 1, stage, str(bound))
+        add("stage_duration_seconds_count", 1, stage)
+        add("stage_duration_seconds_sum", seconds, stage)
+        if stage == "download":
+            add("download_bytes_total", span.get("bytes", 0))
+        if stage == "extract":
+            add("extracted_rows_total", span.get("rows", 0))
+    counters = data.get("counters", {})
+    add("db_queries_total", counters.get("db_queries", 0))
+    for target, count in counters.get("upstream_errors", {}).items():
+        add("upstream_errors_total", count, target)
+    return values
+
+def add_observations(connection, data: dict):
+    """
+    Adds the observations of one job run to the stored series, in the caller's transaction.
+    Takes a Session or a Connection, so the schema migration can backfill with it.
+    """
+    values = observations(data)
+    if not values:
+        return
+    statement = insert(SyncMetric)
+    connection.execute(
+        statement.on_conflict_do_update(
+            index_elements=[SyncMetric.name, SyncMetric.label, SyncMetric.le],
+            set_={"value": SyncMetric.value + statement.excluded.value}
+        ),
+        [{"name": name, "label": label, "le": le, "value": value} for (name, label, le), value in values.items()]
+    )
+
+class MetricsService:
+    """
+    Prometheus metrics of the sync jobs. Each job run adds its timings to the sync_metrics series as it
+    finishes, so every web worker and the standalone sync worker report the same numbers, no matter which
+    process ran a job or which one answers the scrape, and a scrape reads a few rows instead of every job.
+    The rendered text is reused until the data generation moves.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation = None
+        self._text = None
+
+    def record(self, db: Session, timings):
+        """
+        Adds a finished job run's timings to the series, in the caller's transaction.
+        """
+        add_observations(db, {"stages": timings.stages, "counters": timings.counters})
+
+    def render(self, db: Session) -> str:
+        generation = generation_service.get(db)
+        with self._lock:
+            if self._generation == generation:
+                return self._text
+
+        text = self._render(db)
+        with self._lock:
+            self._generation, self._text = generation, text
+        return text
+
+    def _render(self, db: Session) -> str:
+        jobs_by_status = dict(db.execute(select(Job.status, func.count()).group_by(Job.status)).all())
+        series = {(name, label, le): value for name, label, le, value in db.execute(
+            select(SyncMetric.name, SyncMetric.label, SyncMetric.le, SyncMetric.value)
+        )}
+        def value(name: str, label: str = "", le: str = ""):
+            number = series.get((name, label, le), 0)
+            return int(number) if float(number).is_integer() else number
+
+        stages = sorted(label for name, label, _ in series if name == "stage_duration_seconds_count")
+        upstream_errors = sorted(label for name, label, _ in series if name == "upstream_errors_total")
+
+        lines = [
+            "# HELP pk_sync_jobs Sync jobs by current status.",
+            "# TYPE pk_sync_jobs gauge",
+        ]
+        lines += [f"pk_sync_jobs{_labels(status=status)} {count}" for status, count in sorted(jobs_by_status.items())]
+
+        lines += [
+            "# HELP pk_sync_stage_duration_seconds Duration of sync job stages (one observation per AI batch).",
+            "# TYPE pk_sync_stage_duration_seconds histogram",
+        ]
+        for stage in stages:
+            for bound in STAGE_BUCKETS:
+                lines.append(f"pk_sync_stage_duration_seconds_bucket{_labels(stage=stage, le=bound)} {value('stage_duration_seconds_bucket', stage, str(bound))}")
+            lines.append(f"pk_sync_stage_duration_seconds_bucket{_labels(stage=stage, le='+Inf')} {value('stage_duration_seconds_count', stage)}")
+            lines.append(f"pk_sync_stage_duration_seconds_sum{_labels(stage=stage)} {series[('stage_duration_seconds_sum', stage, '')]:.6f}")
+            lines.append(f"pk_sync_stage_duration_seconds_count{_labels(stage=stage)} {value('stage_duration_seconds_count', stage)}")
+
+        lines += [
+            "# HELP pk_sync_upstream_errors_total Failed calls to upstream services by target.",
+            "# TYPE pk_sync_upstream_errors_total counter",
+        ]
+        lines += [f"pk_sync_upstream_errors_total{_labels(target=target)} {value('upstream_errors_total', target)}" for target in upstream_errors]
+
+        for name, help_text in (
+            ("download_bytes", "Bytes of schedule sheets downloaded."),
+            ("extracted_rows", "Sheet rows read by the parser."),
+            ("db_queries", "Database queries issued by sync jobs."),
+        ):
+            lines += [
+                f"# HELP pk_sync_{name}_total {help_text}",
+                f"# TYPE pk_sync_{name}_total counter",
+                f"pk_sync_{name}_total {value(f'{name}_total')}",
+            ]
+        return "\n".join(lines) + "\n"
+
+metrics_service = MetricsService()
@@ -0,0 +1,104 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.config import config
+from app.models.probe_state import ProbeState
+from app.jobs.sync_job import find_sheet_link, last_synced_sheet_link
+from app.schemas.sources import ScheduleSource
+
+logger = logging.getLogger(__name__)
+
+class ProbeService:
+    """
+    Adaptive change detection, per schedule source. A conditional GET of the source page (answered with 304
+    while nothing changed) replaces the full sync on every tick; a sync job only starts once the sheet link
+    differs from the last synced one. Quiet probes double the interval up to PROBE_MAX_INTERVAL_SECONDS, inside the
+    change window hours it is capped at PROBE_WINDOW_MAX_INTERVAL_SECONDS, and a detected change resets it.
+    A detected link stays pending until a sync of it succeeds, so a failed sync is retried on the next probe.
+    """
+    def _window_hours(self) -> set:
+        hours = set()
+        for part in (config.PROBE_CHANGE_WINDOW_HOURS or "").split(","):
+            if "-" not in part:
+                continue
+            start, end = (int(value) for value in part.split("-"))
+            hours.update(range(start, end))
+        return hours
+
+    def _next_interval(self, state: ProbeState, reset: bool) -> int:
+        if reset:
+            interval = config.PROBE_MIN_INTERVAL_SECONDS
+        else:
+            interval = min((state.interval_seconds or config.PROBE_MIN_INTERVAL_SECONDS) * 2, config.PROBE_MAX_INTERVAL_SECONDS)
+        if datetime.now().hour in self._window_hours():
+            interval = min(interval, config.PROBE_WINDOW_MAX_INTERVAL_SECONDS)
+        return max(interval, config.PROBE_MIN_INTERVAL_SECONDS)
+
+    def get_state(self, db: Session, source: ScheduleSource) -> ProbeState:
+        state = db.get(ProbeState, source.name)
+        if not state:
+            state = ProbeState(name=source.name, interval_seconds=config.PROBE_MIN_INTERVAL_SECONDS)
+            db.add(state)
+        return state
+
+    def is_due(self, db: Session, source: ScheduleSource) -> bool:
+        state = db.get(ProbeState, source.name)
+        return not state or not state.next_probe_at or state.next_probe_at <= datetime.utcnow()
+
+    async def probe(self, db: Session, source: ScheduleSource) -> Optional[str]:
+        """
+        Probes the schedule page of a source and schedules its next probe. Returns the new sheet link if a sync is needed.
+        """
+        state = self.get_state(db, source)
+        headers = {}
+        if state.etag:
+            headers["If-None-Match"] = state.etag
+        if state.last_modified:
+            headers["If-Modified-Since"] = state.last_modified
+
+        import httpx
+
+        changed_link = None
+        reset = False
+        try:
+            async with httpx.AsyncClient(follow_redirects=True) as client:
+                response = await client.get(source.url, headers=headers)
+
+            if response.status_code == 304:
+                # The validators are saved as soon as the page is read, before its sync runs: a link whose
+                # sync failed is still pending, and is retried even though the page has not changed since
+                if state.sheet_url and state.sheet_url != last_synced_sheet_link(db, source.name):
+                    changed_link = state.sheet_url
+                    state.last_result = "not modified, sync pending"
+                else:
+                    state.last_result = "not modified"
+            else:
+                response.raise_for_status()
+                state.etag = response.headers.get("etag")
+                state.last_modified = response.headers.get("last-modified")
+                sheet_link = find_sheet_link(response.text, source)
+                if not sheet_link:
+                    state.last_result = "sheet link not found"
+                elif sheet_link == last_synced_sheet_link(db, source.name):
+                    state.last_result = "unchanged"
+                else:
+                    changed_link = sheet_link
+                    state.last_result = "changed"
+                    # Only a new link resets the back-off: retries for one that keeps failing still back off
+                    reset = sheet_link != state.sheet_url
+                    state.sheet_url = sheet_link
+                    state.last_change_at = datetime.utcnow()
+        except Exception as e:
+            logger.warning(f"Schedule probe of {source.name} failed: {e}")
+            state.last_result = f"error: {e}"
+
+        state.last_probe_at = datetime.utcnow()
+        state.interval_seconds = self._next_interval(state, reset)
+        state.next_probe_at = state.last_probe_at + timedelta(seconds=state.interval_seconds)
+        db.commit()
+
+        logger.info(f"Schedule probe of {source.name}: {state.last_result}, next probe in {state.interval_seconds}s.")
+        return changed_link
+
+probe_service = ProbeService()
@@ -0,0 +1,156 @@
+import cProfile
+import io
+import logging
+import marshal
+import pstats
+import tracemalloc
+import zipfile
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.job_profiles import JobProfile
+
+logger = logging.getLogger(__name__)
+
+# Lines of the text summaries in the archive
+TOP_FUNCTIONS = 60
+TOP_ALLOCATIONS = 40
+
+class _CollectedStats:
+    """
+    Stats collected in another process, in the shape pstats.Stats.add() accepts.
+    """
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+def _allocation_report(snapshot: tracemalloc.Snapshot, peak: int) -> list:
+    lines = [f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB", ""]
+    lines += [str(statistic) for statistic in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]]
+    return lines
+
+def profile_call(fn, *args) -> tuple:
+    """
+    Runs fn under cProfile and tracemalloc in the current process and returns (result, profile data).
+    Used by the parser process, whose profile the parent merges into the job's.
+    """
+    profiler = cProfile.Profile()
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    profiler.enable()
+    try:
+        result = fn(*args)
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        if not tracing:
+            tracemalloc.stop()
+    profiler.create_stats()
+    return result, {"stats": profiler.stats, "allocations": _allocation_report(snapshot, peak)}
+
+class ProfileCapture:
+    """
+    Profile of one job run: cProfile and tracemalloc in the process running the job, plus the profiles of its
+    sheet parses, sent back by the parser process.
+    """
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.profiler = cProfile.Profile()
+        self.parser_profiles = []
+        self._started_tracemalloc = False
+
+    def start(self) -> bool:
+        try:
+            self.profiler.enable()
+        except ValueError as e:
+            # Another profiler is active in this process
+            logger.warning(f"Could not profile job {self.job_id}: {e}")
+            return False
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        tracemalloc.reset_peak()
+        return True
+
+    def stop(self) -> bytes:
+        """
+        Stops the capture and packs it into a zip archive:
+        profile.prof (pstats dump, e.g. for snakeviz), summary.txt and allocations.txt.
+        """
+        self.profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+        stats = pstats.Stats(self.profiler)
+        for parser_profile in self.parser_profiles:
+            stats.add(_CollectedStats(parser_profile["stats"]))
+
+        summary = io.StringIO()
+        stats.stream = summary
+        summary.write(f"Job {self.job_id}, {len(self.parser_profiles)} sheet parse(s) merged from the parser process.\n\n")
+        stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+        stats.sort_stats("tottime").print_stats(TOP_FUNCTIONS)
+
+        allocations = ["# Job process", *_allocation_report(snapshot, peak)]
+        for i, parser_profile in enumerate(self.parser_profiles, start=1):
+            allocations += ["", f"# Parser process, sheet parse {i}", *parser_profile["allocations"]]
+
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            # Same format as Stats.dump_stats(), which only writes to a file name
+            zf.writestr("profile.prof", marshal.dumps(stats.stats))
+            zf.writestr("summary.txt", summary.getvalue())
+            zf.writestr("allocations.txt", "\n".join(allocations) + "\n")
+        return archive.getvalue()
+
+# Capture of the job running in the current context; per-source tasks of the job inherit it
+_current: ContextVar[Optional[ProfileCapture]] = ContextVar("job_profile", default=None)
+
+class ProfilingService:
+    """
+    Opt-in profiling of single sync jobs (POST /jobs?profile=true). The profiler runs in the event loop thread,
+    so the capture covers the job and its fan-out, and also whatever else the loop ran meanwhile.
+    """
+    def start(self, job_id: str) -> Optional[ProfileCapture]:
+        capture = ProfileCapture(job_id)
+        if not capture.start():
+            return None
+        _current.set(capture)
+        logger.info(f"Profiling job {job_id}.")
+        return capture
+
+    def active(self) -> bool:
+        return _current.get() is not None
+
+    def add_parser_profile(self, profile: dict):
+        capture = _current.get()
+        if capture is not None:
+            capture.parser_profiles.append(profile)
+
+    def finish(self, db: Session, capture: ProfileCapture):
+        """
+        Stops the capture and stores the archive with the job.
+        """
+        _current.set(None)
+        try:
+            content = capture.stop()
+            db.rollback()
+            db.merge(JobProfile(job_id=capture.job_id, content=content, size=len(content)))
+            db.commit()
+            logger.info(f"Stored profile of job {capture.job_id} ({len(content)} bytes).")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to store profile of job {capture.job_id}: {e}")
+
+    async def get_async(self, db: AsyncSession, job_id: str) -> Optional[JobProfile]:
+        return await db.get(JobProfile, job_id)
+
+profiling_service = ProfilingService()
@@ -0,0 +1,74 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+from app.config import config
+
+logger = logging.getLogger(__name__)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class ReplayService:
+    """
+    API side of the offline replay (app/replay.py). Every replay runs the CLI in a child process: the app reads its
+    database and integrations from the environment at import, so only a fresh process can point them at a scratch
+    database and stubs without touching this worker's. One replay runs at a time per worker.
+    """
+    def __init__(self):
+        self._lock = asyncio.Lock()
+
+    def resolve(self, paths: list) -> list:
+        """
+        Maps request paths into REPLAY_SNAPSHOT_DIR. Raises ValueError for paths outside it or missing.
+        """
+        base = os.path.realpath(config.REPLAY_SNAPSHOT_DIR)
+        resolved = []
+        for path in paths:
+            full = os.path.realpath(os.path.join(base, path))
+            if os.path.commonpath([base, full]) != base:
+                raise ValueError(f"Path outside the snapshot directory: {path}")
+            if not os.path.exists(full):
+                raise ValueError(f"No such snapshot: {path}")
+            resolved.append(full)
+        return resolved
+
+    async def run(self, paths: list, source: str = None, as_of: str = None, enrich: bool = False) -> dict:
+        """
+        Replays the snapshots and returns the report. Raises ValueError for invalid arguments, RuntimeError when the
+        replay fails or exceeds REPLAY_TIMEOUT_SECONDS.
+        """
+        with tempfile.TemporaryDirectory(prefix="pk-replay-api-") as workdir:
+            output = os.path.join(workdir, "report.json")
+            command = [sys.executable, "-m", "app.replay", *paths, "--output", output]
+            if source:
+                command += ["--source", source]
+            if as_of:
+                command += ["--as-of", as_of]
+            if enrich:
+                command.append("--enrich")
+
+            async with self._lock:
+                process = await asyncio.create_subprocess_exec(
+                    *command, cwd=ROOT, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+                )
+                try:
+                    _, stderr = await asyncio.wait_for(process.communicate(), timeout=config.REPLAY_TIMEOUT_SECONDS)
+                except asyncio.TimeoutError:
+                    process.kill()
+                    await process.wait()
+                    raise RuntimeError(f"Replay exceeded {config.REPLAY_TIMEOUT_SECONDS:.0f}s.")
+
+            if process.returncode != 0:
+                # Invalid input exits with 2 (argparse errors), anything else with 1
+                lines = stderr.decode(errors="replace").strip().splitlines() or ["Replay failed."]
+                error = lines[-1].split("error: ", 1)[-1]
+                logger.warning(f"Replay of {len(paths)} path(s) failed: {error}")
+                if process.returncode == 2:
+                    raise ValueError(error)
+                raise RuntimeError(error)
+            with open(output, encoding="utf-8") as f:
+                return json.load(f)
+
+replay_service = ReplayService()
@@ -0,0 +1,82 @@
+import os
+from collections import OrderedDict
+from typing import Optional
+from app.config import config
+
+class ResponseCache:
+    """
+    Per-process LRU cache of rendered response bodies, bounded by a byte budget.
+    Every entry belongs to the data generation it was rendered for. Callers pass the generation
+    they just read from the database, and the first request that sees a newer one drops all entries,
+    so no worker can serve a page rendered before a sync committed.
+    """
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()
+        self._generation = None
+        self._size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_generation(self, generation: int) -> bool:
+        """
+        Returns whether entries may be served or stored for the given generation.
+        """
+        if self._generation is None or generation > self._generation:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._size = 0
+            self._generation = generation
+        # A request that read the generation just before a newer one was seen must not touch the cache
+        return generation == self._generation
+
+    def get(self, generation: int, key) -> Optional[bytes]:
+        if not self._check_generation(generation):
+            self.misses += 1
+            return None
+
+        body = self._entries.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, generation: int, key, body: bytes):
+        if not self._check_generation(generation) or len(body) > self.max_bytes:
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous)
+
+        self._entries[key] = body
+        self._size += len(body)
+
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "pid": os.getpid(),
+            "generation": self._generation,
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+lectures_cache = ResponseCache(max_bytes=config.RESPONSE_CACHE_MAX_BYTES)
@@ -1,9 +1,8 @@
 import logging
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from slack_sdk import WebClient
-from slack_sdk.errors import SlackApiError
 from app.config import config
+from app.services.timing_service import timing_service
 
 logger = logging.getLogger(__name__)
 
@@ -12,7 +11,7 @@ class SlackService:
         self.token = config.SLACK_BOT_TOKEN
         self.default_channel = config.SLACK_CHANNEL
         self.status_channel = config.SLACK_CHANNEL_JOB_STATUS
-        self.client = WebClient(token=self.token) if self.token else None
+        self._client = None
         
         # Format mentions: <@U123>, <@U456>
         raw_mentions = config.SLACK_MENTIONS or ""
@@ -21,6 +20,20 @@ class SlackService:
         if not self.token:
             logger.warning("SLACK_BOT_TOKEN not provided. Slack notifications will be disabled.")
 
+    @property
+    def client(self):
+        """
+        The WebClient, built on first use: only processes that actually send notices import slack_sdk.
+        """
+        if self._client is None and self.token:
+            from slack_sdk import WebClient
+            self._client = WebClient(token=self.token)
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+
     def _get_timestamp_block(self):
         warsaw_now = datetime.now(ZoneInfo("Europe/Warsaw")).strftime("%Y-%m-%d %H:%M:%S")
         return {
@@ -67,9 +80,9 @@ class SlackService:
         blocks.append(self._get_timestamp_block())
         return self._send_blocks(self.status_channel, blocks, f"{title}: {status}")
 
-    def send_schedule_update(self, title: str, message: str, added: list = None, updated: list = None, deleted: list = None, sheet_url: str = None):
+    def send_schedule_update(self, title: str, message: str, added: list = None, updated: list = None, deleted: list = None, sheet_url: str = None, channel: str = None):
         """
-        Sends a schedule update notification with categorized lecture details.
+        Sends a schedule update notification with categorized lecture details, to the default channel unless given one.
         """
         blocks = [
             {
@@ -141,7 +154,7 @@ class SlackService:
                 l_summary = get_val(lecture, 'summary')
                 l_room = get_val(lecture, 'room')
 
-                lecture_info = f"• *{l_date}* {l_start} — {l_subject or l_summary}"
+                lecture_info = f"• *{l_date}* {l_start or ''} — {l_subject or l_summary}"
                 if l_room:
                     lecture_info += f" (_Room: {l_room}_)"
                 
@@ -169,21 +182,24 @@ class SlackService:
         add_category_section("Cancelled Lectures", deleted, "🚫")
 
         blocks.append(self._get_timestamp_block())
-        return self._send_blocks(self.default_channel, blocks, title)
+        return self._send_blocks(channel or self.default_channel, blocks, title)
 
     def _send_blocks(self, channel: str, blocks: list, fallback_text: str):
         if not self.client:
             return
+        from slack_sdk.errors import SlackApiError
 
         try:
-            response = self.client.chat_postMessage(
-                channel=channel,
-                blocks=blocks,
-                text=fallback_text
-            )
+            with timing_service.stage("slack", channel=channel):
+                response = self.client.chat_postMessage(
+                    channel=channel,
+                    blocks=blocks,
+                    text=fallback_text
+                )
             logger.info(f"Slack blocks sent successfully to {channel}")
             return response
         except SlackApiError as e:
+            timing_service.error("slack")
             logger.error(f"Error sending Slack blocks to {channel}: {e.response['error']}")
             return None
 
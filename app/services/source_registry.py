@@ -0,0 +1,45 @@
+import json
+import logging
+from app.config import config
+from app.schemas.sources import ScheduleSource
+
+logger = logging.getLogger(__name__)
+
+# Name of the source built from PK_SCHEDULE_URL / PK_SHEET_REGEX, lectures synced before sources existed belong to it
+DEFAULT_SOURCE = "default"
+
+class SourceRegistry:
+    """
+    Schedule sources followed by this deployment. Read from the JSON list in SCHEDULE_SOURCES_FILE;
+    without it, the single source configured by PK_SCHEDULE_URL and PK_SHEET_REGEX.
+    """
+    def __init__(self):
+        self._sources = None
+
+    def _load(self) -> list:
+        if not config.SCHEDULE_SOURCES_FILE:
+            return [ScheduleSource(
+                name=DEFAULT_SOURCE,
+                url=config.PK_SCHEDULE_URL or "",
+                sheet_regex=config.PK_SHEET_REGEX or "",
+                slack_channel=config.SLACK_CHANNEL,
+                calendar_id=config.GOOGLE_CALENDAR_ID
+            )]
+
+        with open(config.SCHEDULE_SOURCES_FILE, encoding="utf-8") as f:
+            sources = [ScheduleSource(**item) for item in json.load(f)]
+        names = [source.name for source in sources]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate source names in {config.SCHEDULE_SOURCES_FILE}.")
+        logger.info(f"Loaded {len(sources)} schedule source(s): {', '.join(names)}")
+        return sources
+
+    def all(self) -> list:
+        if self._sources is None:
+            self._sources = self._load()
+        return self._sources
+
+    def get(self, name: str):
+        return next((source for source in self.all() if source.name == name), None)
+
+source_registry = SourceRegistry()
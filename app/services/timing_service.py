@@ -0,0 +1,79 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+class JobTimings:
+    """
+    Stage timings and counters of one job run. Stages are kept as individual spans
+    (an AI batch is one span per batch), so they can be turned into histograms later.
+    """
+    def __init__(self):
+        self.stages = []
+        self.counters = {"db_queries": 0, "upstream_errors": {}}
+
+    def to_json(self) -> str:
+        return json.dumps({"stages": self.stages, "counters": self.counters}, ensure_ascii=False)
+
+# Timings of the job running in the current context; tasks spawned by the job (e.g. per-source syncs) inherit it
+_current: ContextVar[Optional[JobTimings]] = ContextVar("job_timings", default=None)
+
+class TimingService:
+    """
+    Collects per-stage timings of sync jobs without threading a collector through every call:
+    start() binds one to the job's context and stage(), count() and error() record into it, or do nothing
+    outside a job.
+    """
+    def start(self) -> JobTimings:
+        timings = JobTimings()
+        _current.set(timings)
+        return timings
+
+    @contextmanager
+    def stage(self, name: str, **attributes):
+        """
+        Times the block as a span of the given stage. The yielded dict takes extra attributes, e.g. bytes or rows.
+        """
+        span = {"stage": name, **attributes}
+        started = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span["seconds"] = round(time.perf_counter() - started, 6)
+            timings = _current.get()
+            if timings is not None:
+                timings.stages.append(span)
+
+    def record(self, name: str, seconds: float, **attributes):
+        """
+        Records a span measured elsewhere, e.g. in the parser process.
+        """
+        timings = _current.get()
+        if timings is not None:
+            timings.stages.append({"stage": name, **attributes, "seconds": round(seconds, 6)})
+
+    def count(self, name: str, value: int = 1):
+        timings = _current.get()
+        if timings is not None:
+            timings.counters[name] = timings.counters.get(name, 0) + value
+
+    def error(self, target: str):
+        """
+        Counts a failed call to an upstream service (schedule page, sheet, AI, Slack, Google Calendar).
+        """
+        timings = _current.get()
+        if timings is not None:
+            errors = timings.counters["upstream_errors"]
+            errors[target] = errors.get(target, 0) + 1
+
+timing_service = TimingService()
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    timing_service.count("db_queries")
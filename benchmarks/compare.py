@@ -0,0 +1,49 @@
+"""
+Compares two benchmark result files, metric by metric:
+
+    python -m benchmarks.compare benchmarks/results/<old>.json benchmarks/results/<new>.json
+"""
+import argparse
+import json
+
+def _flatten(value, prefix: str = "") -> dict:
+    if isinstance(value, dict):
+        flat = {}
+        for key, item in value.items():
+            flat.update(_flatten(item, f"{prefix}.{key}" if prefix else key))
+        return flat
+    if isinstance(value, list):
+        flat = {}
+        for i, item in enumerate(value):
+            # Entries of a size sweep are keyed by their size, so reordering the sweep does not break the comparison
+            key = f"rows={item['rows']}" if isinstance(item, dict) and "rows" in item else str(i)
+            flat.update(_flatten(item, f"{prefix}[{key}]"))
+        return flat
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: value}
+    return {}
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.0, help="Only show metrics that moved by more than this many percent.")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)
+
+    before, after = _flatten(baseline["results"]), _flatten(candidate["results"])
+    print(f"{baseline['meta']['commit']} -> {candidate['meta']['commit']}")
+    print(f"{'metric':<70} {'baseline':>14} {'candidate':>14} {'change':>9}")
+    for metric in sorted(before.keys() & after.keys()):
+        old, new = before[metric], after[metric]
+        change = (new - old) / old * 100 if old else 0.0
+        if abs(change) < args.threshold:
+            continue
+        print(f"{metric:<70} {old:>14.6g} {new:>14.6g} {change:>+8.1f}%")
+
+if __name__ == "__main__":
+    main()
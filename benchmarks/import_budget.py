@@ -0,0 +1,87 @@
+"""
+Import-time budget of the web tier: imports main in a fresh interpreter under -X importtime and fails when
+a sync-only library gets imported or the import takes longer than the budget.
+
+    python -m benchmarks.import_budget
+    python -m benchmarks.import_budget --budget-ms 800 --repeat 5
+
+See docs/BENCHMARKS.md.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Needed by the sync path only (parser process, scraping, integrations), never by importing the app
+SYNC_ONLY = ["pandas", "numpy", "openpyxl", "xlrd", "bs4", "slack_sdk", "googleapiclient", "google.oauth2", "httplib2"]
+
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+def measure(module: str, env: dict) -> tuple:
+    """
+    Returns (cumulative microseconds of the module, {imported module: cumulative microseconds} of its direct imports,
+    set of all imported modules).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            entries.append((len(match.group(3)), match.group(4), int(match.group(2))))
+
+    # importtime lists a module after everything it imported, each level indented by two more spaces
+    end = max(i for i, (depth, name, _) in enumerate(entries) if name == module and depth == 1)
+    start = end
+    while start > 0 and entries[start - 1][0] > 1:
+        start -= 1
+    total = entries[end][2]
+    direct = {name: cumulative for depth, name, cumulative in entries[start:end] if depth == 3}
+    imported = {name for _, name, _ in entries[start:end]}
+    return total, direct, imported
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import time and imports of the web tier.")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--budget-ms", type=float, default=1000, help="Maximum median import time.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="pk-import-budget-")
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'import.db')}",
+        "SYNC_EXECUTION_MODE": "worker",
+        "ICS_CACHE_DIR": os.path.join(workdir, "ics"),
+    }
+    runs = [measure(args.module, env) for _ in range(args.repeat)]
+    median_ms = statistics.median(total for total, _, _ in runs) / 1000
+    direct, imported = runs[-1][1], runs[-1][2]
+
+    print(f"import {args.module}: {median_ms:.0f} ms (median of {args.repeat}, budget {args.budget_ms:.0f} ms)")
+    print("Slowest direct imports:")
+    for name, cumulative in sorted(direct.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failures = []
+    leaked = [name for name in SYNC_ONLY if name in imported]
+    if leaked:
+        failures.append(f"sync-only modules imported: {', '.join(leaked)}")
+    if median_ms > args.budget_ms:
+        failures.append(f"import time {median_ms:.0f} ms exceeds the budget of {args.budget_ms:.0f} ms")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
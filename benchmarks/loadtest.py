@@ -0,0 +1,392 @@
+"""
+Load test of the API as deployed: gunicorn with gunicorn_conf.py and UvicornWorkers on one SQLite file.
+Seeds a scratch database, drives a weighted mix of read requests from several client processes,
+optionally while a simulated sync commits writes, and reports RPS and latency percentiles per endpoint.
+
+    python -m benchmarks.loadtest
+    python -m benchmarks.loadtest --workers 2 4 8 --duration 30 --writer
+    python -m benchmarks.loadtest --mix lectures=5 jobs=1 --lectures 50000
+
+See docs/BENCHMARKS.md.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from benchmarks.run import _commit
+from benchmarks.workbook import ROOMS, SLOTS, SUBJECTS, TEACHERS, TYPES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API = "/api/v1"
+
+# Endpoint mix: name -> default weight
+ENDPOINTS = {
+    "lectures": 40,             # first page of upcoming lectures
+    "lectures_conditional": 20, # the same with If-None-Match, as browsers revalidate
+    "lectures_deep": 5,         # offset pages 2-20
+    "lectures_filtered": 10,    # teacher filter
+    "lectures_search": 10,      # full-text prefix search
+    "jobs": 10,                 # job history
+    "job_status": 5,            # single job
+}
+
+def seed(lectures: int, jobs: int, days: int):
+    """
+    Fills the scratch database the way syncs would have: completed jobs and future lectures linked to them.
+    """
+    from sqlalchemy import insert
+    from app.database import SessionLocal, init_db
+    from app.models.jobs import Job
+    from app.models.lectures import Lecture
+    from app.services.generation_service import generation_service
+
+    init_db()
+    rng = random.Random(0)
+    now = datetime.utcnow()
+    job_rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "status": "completed" if i % 10 else "failed",
+            "started_at": now - timedelta(hours=jobs - i, minutes=1),
+            "completed_at": now - timedelta(hours=jobs - i),
+            "message": "Sync processed. Added: 0, Updated: 3, Deleted: 1.",
+            "triggered_by": "system",
+        }
+        for i in range(jobs)
+    ]
+    today = date.today()
+    lecture_rows = []
+    for i in range(lectures):
+        slot = SLOTS[rng.randrange(len(SLOTS))].split(" - ")
+        lecture_rows.append({
+            "source": "default",
+            "date": (today + timedelta(days=rng.randrange(days))).isoformat(),
+            "start_time": f"{int(slot[0].split(':')[0]):02d}:{slot[0].split(':')[1]}",
+            "end_time": f"{int(slot[1].split(':')[0]):02d}:{slot[1].split(':')[1]}",
+            "summary": f"{rng.choice(SUBJECTS)} {rng.choice(TYPES)} {rng.choice(TEACHERS)} {rng.choice(ROOMS)}",
+            "subject": rng.choice(SUBJECTS),
+            "type": rng.choice(TYPES),
+            "teacher": rng.choice(TEACHERS),
+            "room": rng.choice(ROOMS),
+            "last_sync_id": job_rows[i % len(job_rows)]["id"] if job_rows else None,
+            "is_cancelled": 1 if rng.random() < 0.02 else 0,
+            "updated_at": now,
+        })
+
+    db = SessionLocal()
+    try:
+        if job_rows:
+            db.execute(insert(Job), job_rows)
+        for start in range(0, len(lecture_rows), 5000):
+            db.execute(insert(Lecture), lecture_rows[start:start + 5000])
+        generation_service.bump(db)
+        db.commit()
+    finally:
+        db.close()
+    return [row["id"] for row in job_rows]
+
+class SyncWriter(threading.Thread):
+    """
+    Simulated sync: every interval, one transaction creates a job, updates a batch of lectures and bumps
+    the generation, like the commit of a real sync, then marks the job completed in a second one.
+    Commit latency includes waiting for SQLite's write lock.
+    """
+    def __init__(self, interval: float, batch: int):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.batch = batch
+        self.latencies = []
+        self.errors = 0
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def run(self):
+        from sqlalchemy import func, select, update
+        from app.database import SessionLocal
+        from app.models.jobs import Job
+        from app.models.lectures import Lecture
+        from app.services.generation_service import generation_service
+
+        rng = random.Random(1)
+        db = SessionLocal()
+        max_id = db.execute(select(func.max(Lecture.id))).scalar() or 0
+        try:
+            while not self._stop_event.wait(self.interval):
+                started = time.perf_counter()
+                try:
+                    job = Job(id=str(uuid.uuid4()), status="running", started_at=datetime.utcnow(), triggered_by="loadtest")
+                    db.add(job)
+                    ids = [rng.randint(1, max_id) for _ in range(self.batch)] if max_id else []
+                    for lecture_id in ids:
+                        db.execute(
+                            update(Lecture).where(Lecture.id == lecture_id)
+                            .values(room=rng.choice(ROOMS), last_sync_id=job.id, updated_at=datetime.utcnow())
+                        )
+                    generation_service.bump(db)
+                    db.commit()
+                    job.status = "completed"
+                    job.completed_at = datetime.utcnow()
+                    generation_service.bump(db)
+                    db.commit()
+                    self.latencies.append(time.perf_counter() - started)
+                except Exception:
+                    db.rollback()
+                    self.errors += 1
+        finally:
+            db.close()
+
+def _request(name: str, rng: random.Random, job_ids: list) -> tuple:
+    """
+    Returns (path, params) of one request to the given endpoint.
+    """
+    if name in ("lectures", "lectures_conditional"):
+        return f"{API}/lectures/", {"size": 50}
+    if name == "lectures_deep":
+        return f"{API}/lectures/", {"size": 50, "page": rng.randint(2, 20)}
+    if name == "lectures_filtered":
+        return f"{API}/lectures/", {"size": 50, "teacher": rng.choice(TEACHERS)}
+    if name == "lectures_search":
+        return f"{API}/lectures/", {"size": 50, "q": rng.choice(SUBJECTS).split()[0][:4].lower()}
+    if name == "jobs":
+        return f"{API}/jobs/", {"size": 10, "page": rng.randint(1, 3)}
+    return f"{API}/jobs/status/{rng.choice(job_ids)}", {}
+
+def _drive(base_url: str, mix: dict, job_ids: list, concurrency: int, duration: float, warmup: float, seed: int) -> dict:
+    """
+    One client process: closed-loop virtual users, each sending its next request as soon as the last one returned.
+    Returns {endpoint: [(seconds, status), ...]} of the requests that started after the warm-up.
+    """
+    import httpx
+
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    samples = {name: [] for name in names}
+
+    async def user(client, rng, measure_from, deadline):
+        etag = None
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            path, params = _request(name, rng, job_ids)
+            headers = {"If-None-Match": etag} if name == "lectures_conditional" and etag else {}
+            started = time.perf_counter()
+            try:
+                response = await client.get(path, params=params, headers=headers)
+                status = response.status_code
+                if name == "lectures" and status == 200:
+                    etag = response.headers.get("ETag")
+            except httpx.HTTPError:
+                status = 0
+            if started >= measure_from:
+                samples[name].append((time.perf_counter() - started, status))
+
+    async def main():
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            now = time.perf_counter()
+            await asyncio.gather(*(
+                user(client, random.Random(seed * 1000 + i), now + warmup, now + warmup + duration)
+                for i in range(concurrency)
+            ))
+
+    asyncio.run(main())
+    return samples
+
+def _percentile(sorted_values: list, q: float) -> float:
+    # Nearest rank
+    index = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def _summarise(latencies: list, seconds: float, statuses: list = None) -> dict:
+    ordered = sorted(latencies)
+    summary = {"requests": len(ordered), "rps": round(len(ordered) / seconds, 1)}
+    if ordered:
+        summary.update({
+            "p50_ms": round(_percentile(ordered, 50) * 1000, 2),
+            "p95_ms": round(_percentile(ordered, 95) * 1000, 2),
+            "p99_ms": round(_percentile(ordered, 99) * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2),
+        })
+    if statuses is not None:
+        summary["errors"] = sum(1 for status in statuses if status == 0 or status >= 400)
+        summary["not_modified"] = sum(1 for status in statuses if status == 304)
+    return summary
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _start_server(workers: int, env: dict, log_path: str) -> tuple:
+    port = _free_port()
+    log = open(log_path, "ab")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn_conf.py", "main:app",
+         "--bind", f"127.0.0.1:{port}", "--workers", str(workers)],
+        cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    import httpx
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with {server.returncode}, see {log_path}")
+        try:
+            # Every worker imports the app before the port accepts, one answer means the server is up
+            if httpx.get(f"{base_url}{API}/jobs/?size=1", timeout=2).status_code == 200:
+                return server, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"gunicorn did not start within 60s, see {log_path}")
+
+def _stop_server(server: subprocess.Popen):
+    server.terminate()
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+def _run_once(args, workers: int, env: dict, job_ids: list, mix: dict, log_path: str) -> dict:
+    server, base_url = _start_server(workers, env, log_path)
+    writer = None
+    try:
+        if args.writer:
+            writer = SyncWriter(args.write_interval, args.write_batch)
+            writer.start()
+        per_client = max(1, args.concurrency // args.clients)
+        with multiprocessing.get_context("spawn").Pool(args.clients) as pool:
+            results = pool.starmap(_drive, [
+                (base_url, mix, job_ids, per_client, args.duration, args.warmup, seed)
+                for seed in range(args.clients)
+            ])
+    finally:
+        if writer:
+            writer.stop()
+        _stop_server(server)
+
+    endpoints = {}
+    everything = []
+    for name in mix:
+        samples = [sample for result in results for sample in result[name]]
+        everything += samples
+        endpoints[name] = _summarise([s for s, _ in samples], args.duration, [status for _, status in samples])
+    report = {
+        "workers": workers,
+        "concurrency": per_client * args.clients,
+        "total": _summarise([s for s, _ in everything], args.duration, [status for _, status in everything]),
+        "endpoints": endpoints,
+    }
+    if writer:
+        report["writer"] = {**_summarise(writer.latencies, args.duration + args.warmup), "errors": writer.errors}
+    return report
+
+def _parse_mix(values: list) -> dict:
+    if not values:
+        return dict(ENDPOINTS)
+    mix = {}
+    for value in values:
+        name, _, weight = value.partition("=")
+        if name not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint {name!r}, choose from {', '.join(ENDPOINTS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test of the gunicorn deployment against a seeded scratch database.")
+    parser.add_argument("--workers", nargs="+", type=int, default=[4], help="Gunicorn worker counts to test, one run each.")
+    parser.add_argument("--lectures", type=int, default=5000, help="Lectures seeded.")
+    parser.add_argument("--jobs", type=int, default=500, help="Jobs seeded.")
+    parser.add_argument("--days", type=int, default=180, help="Days ahead the seeded lectures spread over.")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent virtual users, over all client processes.")
+    parser.add_argument("--clients", type=int, default=2, help="Client processes generating the load.")
+    parser.add_argument("--duration", type=float, default=20, help="Measured seconds per run.")
+    parser.add_argument("--warmup", type=float, default=3, help="Seconds of load before measuring starts.")
+    parser.add_argument("--mix", nargs="+", metavar="ENDPOINT=WEIGHT", help=f"Request mix, endpoints: {', '.join(ENDPOINTS)}.")
+    parser.add_argument("--writer", action="store_true", help="Run a simulated sync that commits writes during the load.")
+    parser.add_argument("--write-interval", type=float, default=1.0, help="Seconds between simulated sync commits.")
+    parser.add_argument("--write-batch", type=int, default=200, help="Lectures updated per simulated sync commit.")
+    parser.add_argument("--database", help="SQLite file to use instead of a freshly seeded scratch one.")
+    parser.add_argument("--output", help="Results file. Defaults to benchmarks/results/loadtest-<commit>-<timestamp>.json.")
+    args = parser.parse_args()
+    mix = _parse_mix(args.mix)
+
+    workdir = tempfile.mkdtemp(prefix="pk-loadtest-")
+    database = os.path.abspath(args.database) if args.database else os.path.join(workdir, "loadtest.db")
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{database}",
+        # The web tier only: no scheduler or parser process in the workers, writes come from the simulated sync
+        "SYNC_EXECUTION_MODE": "worker",
+        "SLACK_BOT_TOKEN": "",
+        "GOOGLE_SERVICE_ACCOUNT_FILE": "",
+        "ICS_CACHE_DIR": os.path.join(workdir, "ics"),
+    }
+    os.environ.update(env)
+
+    if args.database:
+        from sqlalchemy import select
+        from app.database import SessionLocal
+        from app.models.jobs import Job
+        db = SessionLocal()
+        job_ids = list(db.execute(select(Job.id).limit(1000)).scalars())
+        db.close()
+    else:
+        print(f"Seeding {args.lectures} lectures and {args.jobs} jobs into {database}...", flush=True)
+        job_ids = seed(args.lectures, args.jobs, args.days)
+    if not job_ids and "job_status" in mix:
+        del mix["job_status"]
+
+    runs = []
+    for workers in args.workers:
+        print(f"Running {workers} worker(s), {args.concurrency} users, {args.duration}s...", flush=True)
+        runs.append(_run_once(args, workers, env, job_ids, mix, os.path.join(workdir, "server.log")))
+
+    started = datetime.now(timezone.utc)
+    report = {
+        "meta": {
+            "commit": _commit(),
+            "timestamp": started.isoformat(),
+            "python": sys.version.split()[0],
+            "cpus": os.cpu_count(),
+            "params": {key: value for key, value in vars(args).items() if key != "output"},
+            "mix": mix,
+        },
+        # Keyed by worker count, so benchmarks.compare matches runs of the same configuration
+        "results": {f"workers={run['workers']}": run for run in runs},
+    }
+    output = args.output or os.path.join(
+        os.path.dirname(__file__), "results", f"loadtest-{report['meta']['commit']}-{started.strftime('%Y%m%dT%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for run in runs:
+        print(f"\n{run['workers']} worker(s), {run['concurrency']} users")
+        print(f"{'endpoint':<22} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7} {'304':>7}")
+        for name, summary in [*run["endpoints"].items(), ("total", run["total"])]:
+            print(
+                f"{name:<22} {summary['rps']:>9} {summary.get('p50_ms', '-'):>9} {summary.get('p95_ms', '-'):>9} "
+                f"{summary.get('p99_ms', '-'):>9} {summary['errors']:>7} {summary['not_modified']:>7}"
+            )
+        if "writer" in run:
+            writer = run["writer"]
+            print(f"{'sync writer commits':<22} {writer['rps']:>9} {writer.get('p50_ms', '-'):>9} {writer.get('p95_ms', '-'):>9} {writer.get('p99_ms', '-'):>9} {writer['errors']:>7}")
+    print(f"\nResults written to {output}, server log in {workdir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Runs the benchmark scenarios fully offline against local upstream stubs and writes the results as JSON.
+
+    python -m benchmarks.run                       # all scenarios, default sizes
+    python -m benchmarks.run --scenario parse --rows 500 2000 8000
+    python -m benchmarks.compare old.json new.json
+
+See docs/BENCHMARKS.md.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+SCENARIOS = ["parse", "diff_commit", "enrichment", "job"]
+
+def _commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+def _configure(stub_url: str, workdir: str):
+    """
+    Points the app configuration at the stubs and a scratch database; must run before any app import.
+    """
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'benchmark.db')}",
+        "PK_SCHEDULE_URL": f"{stub_url}/page",
+        "PK_SHEET_REGEX": "NIESTACJONARNE",
+        "AI_SERVICE_URL": stub_url,
+        "SLACK_BOT_TOKEN": "xoxb-benchmark",
+        "SLACK_CHANNEL": "#benchmark",
+        "SLACK_CHANNEL_JOB_STATUS": "#benchmark-status",
+        "GOOGLE_CALENDAR_ID": "benchmark",
+        "SCHEDULE_SOURCES_FILE": "",
+        "SYNC_EXECUTION_MODE": "inline",
+        "SYNC_SCHEDULE": "",
+        "ICS_CACHE_DIR": os.path.join(workdir, "ics"),
+    })
+
+def _wire_integrations(stub_url: str):
+    """
+    The Slack and Google Calendar clients are built lazily, on first use, against the real endpoints.
+    Assigning the client and service properties first installs stub-backed ones, so the real ones are never built.
+    """
+    from googleapiclient.discovery import build_from_document
+    from googleapiclient.discovery_cache import get_static_doc
+    from slack_sdk import WebClient
+    from app.services.google_calendar_service import google_calendar_service
+    from app.services.slack_service import slack_service
+
+    slack_service.client = WebClient(token="xoxb-benchmark", base_url=f"{stub_url}/slack/api/")
+    document = get_static_doc("calendar", "v3").replace("https://www.googleapis.com/", f"{stub_url}/")
+    google_calendar_service.service = build_from_document(document, developerKey="benchmark")
+    google_calendar_service.calendar_id = "benchmark"
+
+async def _run(args, stub) -> dict:
+    from app.database import init_db
+    from app.jobs.sheet_parser import sheet_parser_pool
+    from app.services.job_service import job_service # noqa: F401, registers every model before init_db
+    from benchmarks import scenarios
+
+    init_db()
+    _wire_integrations(stub.url)
+    results = {}
+    try:
+        if "parse" in args.scenario:
+            results["parse"] = {
+                "in_process": scenarios.parse_throughput(args.rows, groups=args.groups, repeat=args.repeat),
+                "parser_process": await scenarios.parse_in_pool(args.rows[-1], repeat=args.repeat),
+            }
+        if "diff_commit" in args.scenario:
+            results["diff_commit"] = [await scenarios.diff_commit(rows, args.change_rate) for rows in args.rows]
+        if "enrichment" in args.scenario:
+            results["enrichment"] = await scenarios.enrichment(stub, args.lectures)
+        if "job" in args.scenario:
+            results["job"] = await scenarios.job_latency(stub, args.job_rows, args.change_rate)
+    finally:
+        sheet_parser_pool.shutdown()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmarks of the sync pipeline, against local stubs.")
+    parser.add_argument("--scenario", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--rows", nargs="+", type=int, default=[300, 1200, 4800], help="Schedule slots per workbook.")
+    parser.add_argument("--job-rows", type=int, default=600, help="Schedule slots of the sheet the job scenario syncs.")
+    parser.add_argument("--groups", type=int, default=1, help="Group columns per workbook (the parser reads the first).")
+    parser.add_argument("--change-rate", type=float, default=0.1, help="Share of slots changed between two sheets.")
+    parser.add_argument("--lectures", type=int, default=60, help="Lectures sent through the enrichment scenario.")
+    parser.add_argument("--ai-latency", type=float, default=0.02, help="Seconds the Ollama stub takes per batch.")
+    parser.add_argument("--ai-misbehave-rate", type=float, default=0.0, help="Share of AI batches answered with errors or malformed output.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Results file. Defaults to benchmarks/results/<commit>-<timestamp>.json.")
+    args = parser.parse_args()
+
+    from benchmarks.stubs import StubUpstream
+
+    stub = StubUpstream(ai_latency=args.ai_latency, ai_misbehave_rate=args.ai_misbehave_rate).start()
+    workdir = tempfile.mkdtemp(prefix="pk-benchmark-")
+    _configure(stub.url, workdir)
+    try:
+        results = asyncio.run(_run(args, stub))
+    finally:
+        stub.stop()
+
+    started = datetime.now(timezone.utc)
+    report = {
+        "meta": {
+            "commit": _commit(),
+            "timestamp": started.isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {key: value for key, value in vars(args).items() if key != "output"},
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join(
+        os.path.dirname(__file__), "results", f"{report['meta']['commit']}-{started.strftime('%Y%m%dT%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    json.dump(results, sys.stdout, indent=2, ensure_ascii=False)
+    print(f"\nResults written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Benchmark scenarios. Each one returns a flat-ish dict of measurements; app modules are imported
+inside the functions, after run.py has pointed the configuration at the stubs.
+"""
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from datetime import datetime
+from benchmarks.stubs import StubUpstream
+from benchmarks.workbook import build_schedule, lecture_count, mutate, to_workbook
+
+def parse_throughput(sizes: list, groups: int, repeat: int) -> list:
+    """
+    parse_sheet in-process: read_excel and extraction time per workbook size.
+    """
+    from app.jobs.sheet_parser import parse_sheet
+
+    results = []
+    for rows in sizes:
+        content = to_workbook(build_schedule(rows, groups=groups))
+        runs = [parse_sheet(content) for _ in range(repeat)]
+        read_excel = statistics.median(run["read_excel_seconds"] for run in runs)
+        extract = statistics.median(run["extract_seconds"] for run in runs)
+        results.append({
+            "rows": rows,
+            "groups": groups,
+            "bytes": len(content),
+            "events": len(runs[0]["events"]),
+            "read_excel_s": round(read_excel, 6),
+            "extract_s": round(extract, 6),
+            "rows_per_s": round(rows / (read_excel + extract), 1),
+        })
+    return results
+
+async def parse_in_pool(rows: int, repeat: int) -> dict:
+    """
+    The same parse through the warm parser process, i.e. what a job pays including the IPC.
+    """
+    from app.config import config
+    from app.jobs.sheet_parser import sheet_parser_pool
+
+    content = to_workbook(build_schedule(rows))
+    await sheet_parser_pool.parse(content, timeout=config.SHEET_PARSE_TIMEOUT_SECONDS) # warm-up
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await sheet_parser_pool.parse(content, timeout=config.SHEET_PARSE_TIMEOUT_SECONDS)
+        durations.append(time.perf_counter() - started)
+    return {"rows": rows, "median_s": round(statistics.median(durations), 6)}
+
+async def diff_commit(rows: int, change_rate: float) -> dict:
+    """
+    _sync_lectures_to_db with enrichment switched off: first import, then a resync of a changed sheet.
+    """
+    from app.database import SessionLocal
+    from app.jobs.sheet_parser import parse_sheet
+    from app.jobs.sync_job import _sync_lectures_to_db
+    from app.models.jobs import Job
+    from app.services.ai_service import ai_service
+    from app.services.timing_service import timing_service
+
+    base = build_schedule(rows)
+    changed = mutate(base, change_rate)
+    base_events = parse_sheet(to_workbook(base))["events"]
+    changed_events = parse_sheet(to_workbook(changed))["events"]
+
+    async def no_enrichment(lectures_data, **kwargs):
+        return []
+
+    source = f"bench-diff-{uuid.uuid4().hex[:6]}"
+    original = ai_service.enrich_lectures
+    ai_service.enrich_lectures = no_enrichment
+    db = SessionLocal()
+    try:
+        results = {}
+        for label, events in (("initial", base_events), ("resync", changed_events)):
+            job = Job(id=str(uuid.uuid4()), status="running", started_at=datetime.utcnow(), triggered_by="benchmark")
+            db.add(job)
+            db.commit()
+            timings = timing_service.start()
+            started = time.perf_counter()
+            outcome = await _sync_lectures_to_db(db, job.id, events, source=source)
+            spans = {span["stage"]: span["seconds"] for span in timings.stages}
+            results[label] = {
+                "events": len(events),
+                "added": len(outcome["added"]),
+                "updated": len(outcome["updated"]),
+                "deleted": len(outcome["deleted"]),
+                "total_s": round(time.perf_counter() - started, 6),
+                "diff_s": spans.get("diff"),
+                "commit_s": spans.get("commit"),
+                "db_queries": timings.counters["db_queries"],
+            }
+        return {"rows": rows, "change_rate": change_rate, **results}
+    finally:
+        ai_service.enrich_lectures = original
+        db.close()
+
+async def enrichment(stub: StubUpstream, lectures: int) -> dict:
+    """
+    AIService.enrich_lectures against the Ollama stub, with its latency and misbehaviour settings.
+    """
+    from app.services.ai_service import ai_service
+
+    items = [{"id": i, "raw_text": f"Wykład {i}"} for i in range(lectures)]
+    calls_before = stub.calls["ai"]
+    started = time.perf_counter()
+    enriched = await ai_service.enrich_lectures(items)
+    wall = time.perf_counter() - started
+    return {
+        "lectures": lectures,
+        "batches": stub.calls["ai"] - calls_before,
+        "enriched": len(enriched),
+        "ai_latency_s": stub.ai_latency,
+        "misbehave_rate": stub.ai_misbehave_rate,
+        "wall_s": round(wall, 6),
+        "lectures_per_s": round(lectures / wall, 1) if wall else None,
+    }
+
+async def _run_job(previous: set, poll_interval: float = 0.05) -> tuple:
+    """
+    Triggers a sync and waits until its job has released the sync lease, so the next trigger starts a job
+    of its own. Fails if the trigger attached to one of the previous jobs instead.
+    """
+    from app.database import SessionLocal
+    from app.models.jobs import Job
+    from app.services.job_service import SYNC_LEASE, job_service
+    from app.services.lease_service import lease_service
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        job = await job_service.execute_sync(db, triggered_by="benchmark")
+        job_id = job.id
+        if job_id in previous:
+            raise RuntimeError(f"The benchmark trigger attached to the earlier job {job_id} instead of starting a new one.")
+        previous.add(job_id)
+        while True:
+            await asyncio.sleep(poll_interval)
+            db.expire_all()
+            job = db.get(Job, job_id)
+            lease = lease_service.get(db, SYNC_LEASE)
+            # The lease is released last, after the fan-out and the timings
+            if job.status not in ("queued", "running") and not (lease and lease.holder == job_id):
+                break
+        return time.perf_counter() - started, job.status, job.message, json.loads(job.timings)
+    finally:
+        db.close()
+
+def _stage_totals(timings: dict) -> dict:
+    totals = {}
+    for span in timings["stages"]:
+        totals[span["stage"]] = round(totals.get(span["stage"], 0) + span["seconds"], 6)
+    return totals
+
+async def job_latency(stub: StubUpstream, rows: int, change_rate: float) -> dict:
+    """
+    Whole jobs through job_service against all stubs: first sync, sync of a changed sheet, and an unchanged run.
+    """
+    base = build_schedule(rows)
+    runs = {}
+    job_ids = set()
+    for label, schedule, sheet in (
+        ("first_sync", base, "niestacjonarne-v1.xlsx"),
+        ("changed_sync", mutate(base, change_rate), "niestacjonarne-v2.xlsx"),
+        ("unchanged", None, None),
+    ):
+        if schedule is not None:
+            stub.publish_sheet(sheet, to_workbook(schedule))
+        calls_before = dict(stub.calls)
+        seconds, status, message, timings = await _run_job(job_ids)
+        runs[label] = {
+            "lectures": lecture_count(schedule) if schedule is not None else None,
+            "status": status,
+            "message": message,
+            "total_s": round(seconds, 6),
+            "stages_s": _stage_totals(timings),
+            "db_queries": timings["counters"]["db_queries"],
+            "upstream_errors": timings["counters"]["upstream_errors"],
+            "upstream_calls": {name: stub.calls[name] - calls_before[name] for name in stub.calls},
+        }
+    return {"rows": rows, "change_rate": change_rate, **runs}
@@ -0,0 +1,136 @@
+"""
+Local stand-ins for every upstream of a sync job, served from one threaded HTTP server:
+
+- GET  /page                      PK schedule page linking to the current sheet
+- GET  /sheets/<name>             the sheet files
+- POST /api/generate              Ollama, with configurable latency and misbehaviour
+- POST /slack/api/<method>        Slack Web API
+- POST /batch/calendar/v3         Google Calendar batch endpoint (multipart/mixed)
+"""
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class StubUpstream:
+    def __init__(self, ai_latency: float = 0.0, ai_misbehave_rate: float = 0.0, seed: int = 0):
+        self.ai_latency = ai_latency
+        # Share of AI batches answered with an error, invalid JSON, a wrapped object or a short list
+        self.ai_misbehave_rate = ai_misbehave_rate
+        self.sheets = {}
+        self.current_sheet = None
+        self.calls = {"page": 0, "sheet": 0, "ai": 0, "slack": 0, "calendar_batch": 0, "calendar_ops": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def publish_sheet(self, name: str, content: bytes):
+        """
+        Serves a new sheet and links it from the page, as PK does when the schedule changes.
+        """
+        self.sheets[name] = content
+        self.current_sheet = name
+
+    def start(self) -> "StubUpstream":
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str = "application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _body(self) -> bytes:
+                return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+            def do_GET(self):
+                if self.path == "/page":
+                    stub._count("page")
+                    link = f'<a href="/sheets/{stub.current_sheet}">Plan NIESTACJONARNE</a>' if stub.current_sheet else ""
+                    return self._send(200, f"<html><head><title>Rozkłady zajęć</title></head><body>{link}</body></html>".encode(), "text/html; charset=utf-8")
+                if self.path.startswith("/sheets/"):
+                    stub._count("sheet")
+                    content = stub.sheets.get(self.path[len("/sheets/"):])
+                    if content is None:
+                        return self._send(404, b"{}")
+                    return self._send(200, content, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+                self._send(404, b"{}")
+
+            def do_POST(self):
+                body = self._body()
+                if self.path == "/api/generate":
+                    stub._count("ai")
+                    return self._send(*stub._ollama(body))
+                if self.path.startswith("/slack/api/"):
+                    stub._count("slack")
+                    return self._send(200, json.dumps({"ok": True, "channel": "C0BENCH", "ts": f"{time.time():.6f}"}).encode())
+                if self.path.startswith("/batch/"):
+                    stub._count("calendar_batch")
+                    return self._send(200, *stub._calendar_batch(body))
+                self._send(404, b"{}")
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def _count(self, name: str, value: int = 1):
+        with self._lock:
+            self.calls[name] += value
+
+    def _ollama(self, body: bytes) -> tuple:
+        if self.ai_latency:
+            time.sleep(self.ai_latency)
+        batch = json.loads(json.loads(body)["prompt"])
+        items = [
+            {"id": item["id"], "subject": "ZTBD", "type": "wykład", "teacher": "dr Kowalski", "room": "s. 101"}
+            for item in batch
+        ]
+        with self._lock:
+            misbehave = self._rng.random() < self.ai_misbehave_rate
+            kind = self._rng.choice(["error", "invalid", "wrapped", "short"])
+        if not misbehave:
+            return 200, json.dumps({"response": json.dumps(items)}).encode()
+        if kind == "error":
+            return 500, b'{"error": "model overloaded"}'
+        if kind == "invalid":
+            return 200, json.dumps({"response": "Sure! Here is the JSON you asked for:"}).encode()
+        if kind == "wrapped":
+            return 200, json.dumps({"response": json.dumps({"data": items})}).encode()
+        return 200, json.dumps({"response": json.dumps(items[:-1])}).encode()
+
+    def _calendar_batch(self, body: bytes) -> tuple:
+        """
+        Answers every part of a batch: GETs with 404 (event unknown), anything else with 200.
+        """
+        text = body.decode("utf-8", errors="replace")
+        boundary = "batch_bench_response"
+        parts = []
+        for content_id, method in re.findall(r"Content-ID: <([^>]+)>.*?\r?\n\r?\n(\w+) ", text, flags=re.S):
+            status = "404 Not Found" if method == "GET" else "200 OK"
+            payload = "{}" if method != "GET" else '{"error": {"code": 404}}'
+            parts.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n\r\n{payload}\r\n"
+            )
+        self._count("calendar_ops", len(parts))
+        return ("".join(parts) + f"--{boundary}--\r\n").encode(), f"multipart/mixed; boundary={boundary}"
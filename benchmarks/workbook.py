@@ -0,0 +1,88 @@
+"""
+Synthetic schedule workbooks in the PK layout read by app.jobs.sheet_parser:
+Q (16) = date (only on the first row of a day, like merged cells), R (17) = "H:MM - H:MM",
+S (18) = end, T (19) = DS1 and one more column per extra group.
+"""
+import io
+import random
+from datetime import date, timedelta
+import pandas as pd
+
+COL_DATE, COL_TIME, COL_END, COL_FIRST_GROUP = 16, 17, 18, 19
+SLOTS = ["8:00 - 9:30", "9:45 - 11:15", "11:30 - 13:00", "13:15 - 14:45", "15:00 - 16:30", "16:45 - 18:15"]
+DAY_NAMES = ["poniedziałek", "wtorek", "środa", "czwartek", "piątek", "sobota", "niedziela"]
+SUBJECTS = ["ZTBD", "OE", "Sieci neuronowe", "Systemy rozproszone", "Analiza danych", "Bezpieczeństwo systemów"]
+TYPES = ["wykład", "ćwiczenia", "laboratorium", "projekt"]
+TEACHERS = ["dr Kowalski", "dr hab. Nowak", "mgr Wiśniewska", "prof. Zieliński", "dr inż. Książek"]
+ROOMS = ["s. 101", "s. 204", "s. 310A", "lab. 7", "aula B"]
+
+def _cell(rng: random.Random) -> str:
+    return f"{rng.choice(SUBJECTS)} {rng.choice(TYPES)} {rng.choice(TEACHERS)} {rng.choice(ROOMS)}"
+
+def build_schedule(rows: int, groups: int = 1, fill: float = 0.8, seed: int = 0, start: date = None) -> list:
+    """
+    A schedule as a list of slots: {"date", "time", "cells": [one per group, None when free]}.
+    Starts tomorrow by default, so every lecture is in the future the parser keeps.
+    """
+    rng = random.Random(seed)
+    start = start or date.today() + timedelta(days=1)
+    schedule = []
+    for i in range(rows):
+        day = start + timedelta(days=i // len(SLOTS))
+        cells = [_cell(rng) if rng.random() < fill else None for _ in range(groups)]
+        schedule.append({"date": day, "time": SLOTS[i % len(SLOTS)], "cells": cells})
+    return schedule
+
+def mutate(schedule: list, change_rate: float, seed: int = 1) -> list:
+    """
+    Copy of the schedule where about change_rate of the slots changed: a lecture is edited (2/3)
+    or removed (1/3), a free slot gets a lecture.
+    """
+    rng = random.Random(seed)
+    changed = []
+    for slot in schedule:
+        cells = list(slot["cells"])
+        for g, cell in enumerate(cells):
+            if rng.random() >= change_rate:
+                continue
+            if cell is None:
+                cells[g] = _cell(rng)
+            elif rng.random() < 2 / 3:
+                cells[g] = f"{cell} (zmiana)"
+            else:
+                cells[g] = None
+        changed.append({**slot, "cells": cells})
+    return changed
+
+def to_workbook(schedule: list) -> bytes:
+    """
+    Renders the schedule as an .xlsx file.
+    """
+    groups = len(schedule[0]["cells"]) if schedule else 1
+    width = COL_FIRST_GROUP + groups
+    header = [None] * width
+    header[COL_DATE], header[COL_TIME] = "Data", "Godziny"
+    for g in range(groups):
+        header[COL_FIRST_GROUP + g] = "DS1" if g == 0 else f"DS{g + 1}"
+
+    table = [header]
+    previous_day = None
+    for slot in schedule:
+        row = [None] * width
+        if slot["date"] != previous_day:
+            row[COL_DATE] = f"{DAY_NAMES[slot['date'].weekday()]} {slot['date'].strftime('%d/%m/%y')}"
+            previous_day = slot["date"]
+        row[COL_TIME] = slot["time"]
+        for g, cell in enumerate(slot["cells"]):
+            row[COL_FIRST_GROUP + g] = cell
+        table.append(row)
+
+    buffer = io.BytesIO()
+    pd.DataFrame(table).to_excel(buffer, header=False, index=False)
+    return buffer.getvalue()
+
+def lecture_count(schedule: list) -> int:
+    """
+    Lectures the parser extracts from the first group (DS1).
+    """
+    return sum(1 for slot in schedule if slot["cells"][0])
@@ -2,8 +2,12 @@ from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 import os
-from app.api.routers import jobs, lectures
-from app.database import engine, Base
+from app.api.routers import calendar, changes, jobs, lectures, metrics, replay, system
+from app.config import config
+from app.database import init_db, async_engine, SessionLocal
+from app.jobs.executor import job_executor
+from app.jobs.sheet_parser import sheet_parser_pool
+from app.services.job_service import job_service
 from app.scheduler import start_scheduler, stop_scheduler
 import logging
 from datetime import datetime
@@ -23,18 +27,29 @@ logging.basicConfig(
 
 api_prefix = '/api/v1'
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create database tables and indexes
+init_db()
 
 app = FastAPI(title="PK Schedule Sync API")
 
 @app.on_event("startup")
 async def startup_event():
+    if config.SYNC_EXECUTION_MODE == "worker":
+        # Jobs and the schedule belong to the standalone worker (worker.py), the web tier only enqueues and reads
+        return
+    db = SessionLocal()
+    try:
+        job_service.recover_orphaned_jobs(db)
+    finally:
+        db.close()
     start_scheduler()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     stop_scheduler()
+    await job_executor.drain(config.JOB_DRAIN_TIMEOUT_SECONDS)
+    sheet_parser_pool.shutdown()
+    await async_engine.dispose()
 
 # Mount the 'ui' directory for static files
 ui_path = os.path.join(os.path.dirname(__file__), "ui")
@@ -55,3 +70,9 @@ async def read_js():
 
 app.include_router(jobs.router, prefix=f'{api_prefix}/jobs', tags=["jobs"])
 app.include_router(lectures.router, prefix=f'{api_prefix}/lectures', tags=["lectures"])
+app.include_router(changes.router, prefix=f'{api_prefix}/changes', tags=["changes"])
+app.include_router(calendar.router, prefix=f'{api_prefix}/calendar', tags=["calendar"])
+app.include_router(system.router, prefix=f'{api_prefix}/system', tags=["system"])
+app.include_router(replay.router, prefix=f'{api_prefix}/replay', tags=["replay"])
+# Unprefixed, where Prometheus looks by default
+app.include_router(metrics.router, tags=["system"])
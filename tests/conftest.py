@@ -0,0 +1,24 @@
+import os
+import tempfile
+
+# The app reads its configuration at import: point it at a scratch database and keep integrations off
+_workdir = tempfile.mkdtemp(prefix="pk-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(_workdir, 'test.db')}",
+    "SYNC_EXECUTION_MODE": "inline",
+    "SYNC_SCHEDULE": "",
+    "SLACK_BOT_TOKEN": "",
+    "GOOGLE_SERVICE_ACCOUNT_FILE": "",
+    "AI_SERVICE_URL": "",
+    "ICS_CACHE_DIR": os.path.join(_workdir, "ics"),
+})
+
+import pytest
+from fastapi.testclient import TestClient
+
+@pytest.fixture(scope="session")
+def client():
+    from main import app
+
+    with TestClient(app) as client:
+        yield client
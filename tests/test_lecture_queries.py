@@ -0,0 +1,107 @@
+"""
+The lectures listing must cost the same number of statements whatever the number of lectures and the page
+size: one page is read with a join of the last sync job, never with a query per row.
+"""
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+import pytest
+from sqlalchemy import delete, event
+from app.database import SessionLocal, async_engine, engine
+from app.models.jobs import Job
+from app.models.lectures import Lecture
+from app.schemas.lectures import LectureFilter
+from app.services.generation_service import generation_service
+from app.services.lecture_service import lecture_service
+
+@contextmanager
+def count_statements():
+    statements = []
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+def seed(count: int):
+    """
+    Replaces the lectures with `count` future ones, each synced by a job of its own, as a sync commit would.
+    """
+    db = SessionLocal()
+    try:
+        db.execute(delete(Lecture))
+        db.execute(delete(Job))
+        first_day = date.today() + timedelta(days=1)
+        for i in range(count):
+            job_id = f"job-{i}"
+            db.add(Job(id=job_id, status="completed", started_at=datetime.utcnow(), completed_at=datetime.utcnow()))
+            db.add(Lecture(
+                source="default",
+                date=(first_day + timedelta(days=i // 5)).isoformat(),
+                start_time=f"{8 + i % 5 * 2:02d}:00",
+                end_time=f"{9 + i % 5 * 2:02d}:30",
+                summary=f"Lecture {i}",
+                subject=f"Subject {i % 7}",
+                teacher=f"Teacher {i % 3}",
+                room=f"Room {i % 4}",
+                last_sync_id=job_id,
+                is_cancelled=0
+            ))
+        # A new generation, so no cached page of the previous data is served
+        generation_service.bump(db)
+        db.commit()
+    finally:
+        db.close()
+
+def listing_statements(client, size: int = 10, **params) -> int:
+    with count_statements() as statements:
+        response = client.get("/api/v1/lectures/", params={"size": size, **params})
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == size
+    return len(statements)
+
+@pytest.mark.parametrize("params", [{}, {"page": 3}], ids=["first page", "offset page"])
+def test_listing_statements_do_not_grow_with_rows(client, params):
+    counts = []
+    for rows in (30, 300):
+        seed(rows)
+        counts.append(listing_statements(client, **params))
+    assert counts[0] > 0
+    assert counts[0] == counts[1]
+
+@pytest.mark.parametrize("with_total", [False, True])
+def test_keyset_page_statements_do_not_grow_with_rows(client, with_total):
+    counts = []
+    for rows in (30, 300):
+        seed(rows)
+        cursor = client.get("/api/v1/lectures/", params={"size": 10}).json()["next_cursor"]
+        counts.append(listing_statements(client, cursor=cursor, with_total=with_total))
+    assert counts[0] > 0
+    assert counts[0] == counts[1]
+
+def test_listing_statements_do_not_grow_with_page_size(client):
+    seed(300)
+    assert listing_statements(client, size=5) == listing_statements(client, size=50)
+
+def query_plan(statement) -> str:
+    """
+    SQLite's EXPLAIN QUERY PLAN of a statement, with its parameters bound by the column types as usual.
+    """
+    with engine.connect() as connection:
+        def explain(conn, cursor, sql, parameters, context, executemany):
+            return "EXPLAIN QUERY PLAN " + sql, parameters
+
+        event.listen(connection, "before_cursor_execute", explain, retval=True)
+        return "\n".join(row[-1] for row in connection.execute(statement))
+
+@pytest.mark.parametrize("cursor", [False, True], ids=["first page", "keyset page"])
+def test_listing_seeks_and_orders_on_the_listing_index(client, cursor):
+    seed(30)
+    after = None
+    if cursor:
+        after = client.get("/api/v1/lectures/", params={"size": 10}).json()["next_cursor"]
+    plan = query_plan(lecture_service._after_statement(LectureFilter(date_from=date.today()), after, 10))
+    assert "USING INDEX ix_lectures_listing" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,80 @@
+"""
+A sync trigger attaches to the job holding the sync lease only while that job is still running. A job keeps the
+lease through its fan-out after its final status: a trigger arriving then must start a new job once it is released.
+"""
+import asyncio
+import uuid
+from datetime import datetime
+import pytest
+from app.database import SessionLocal, init_db
+from app.models.jobs import Job
+from app.services.job_service import SYNC_LEASE, job_service
+from app.services.lease_service import lease_service
+
+@pytest.fixture
+def started(monkeypatch):
+    """
+    Records the jobs execute_sync starts instead of running them.
+    """
+    init_db()
+    jobs = []
+    monkeypatch.setattr(job_service, "_start_job", lambda job: jobs.append(job.id))
+    yield jobs
+    db = SessionLocal()
+    try:
+        # Free the lease for the next test
+        lease = lease_service.get(db, SYNC_LEASE)
+        if lease and lease.holder:
+            lease_service.release(db, SYNC_LEASE, holder=lease.holder)
+        db.commit()
+    finally:
+        db.close()
+
+def hold_lease(status: str) -> str:
+    db = SessionLocal()
+    try:
+        job_id = str(uuid.uuid4())
+        db.add(Job(id=job_id, status=status, started_at=datetime.utcnow(), triggered_by="test"))
+        assert lease_service.acquire(db, SYNC_LEASE, holder=job_id, ttl=60, job_id=job_id)
+        db.commit()
+        return job_id
+    finally:
+        db.close()
+
+def release_lease(job_id: str):
+    db = SessionLocal()
+    try:
+        lease_service.release(db, SYNC_LEASE, holder=job_id)
+        db.commit()
+    finally:
+        db.close()
+
+async def trigger() -> Job:
+    db = SessionLocal()
+    try:
+        return await job_service.execute_sync(db, triggered_by="test")
+    finally:
+        db.close()
+
+def test_trigger_attaches_to_running_job(started):
+    job_id = hold_lease("running")
+    job = asyncio.run(trigger())
+    assert job.id == job_id
+    assert started == []
+
+@pytest.mark.parametrize("status", ["completed", "failed"])
+def test_trigger_after_final_status_waits_for_lease_and_starts_new_job(started, status):
+    job_id = hold_lease(status)
+
+    async def scenario():
+        pending = asyncio.create_task(trigger())
+        # The finished job is still publishing its changes
+        await asyncio.sleep(0.3)
+        assert not pending.done()
+        release_lease(job_id)
+        return await asyncio.wait_for(pending, timeout=5)
+
+    job = asyncio.run(scenario())
+    assert job.id != job_id
+    assert job.status == "running"
+    assert started == [job.id]
@@ -80,7 +80,7 @@ async function fetchJobs() {
 function renderJobs(jobs) {
     const list = document.getElementById('jobList');
     list.innerHTML = jobs.map(job => `
-        <div class="card job-card">
+        <div class="card job-card" data-job-id="${job.job_id}">
             <div class="job-header">
                 <span style="font-weight: 600;">Job #${job.job_id.slice(0, 8)}</span>
                 <span class="status-badge status-${job.status.toLowerCase()}">${job.status}</span>
@@ -89,7 +89,7 @@ function renderJobs(jobs) {
                 <span>${formatDate(job.started_at)}</span>
                 <span style="font-style: italic; opacity: 0.8;">via ${job.triggered_by}</span>
             </div>
-            <div style="font-size: 0.85rem; margin-bottom: 0.5rem;">${job.message || 'Processing...'}</div>
+            <div class="job-message" style="font-size: 0.85rem; margin-bottom: 0.5rem;">${job.message || 'Processing...'}</div>
             ${job.sheet_url ? `
                 <a href="${job.sheet_url}" target="_blank" class="download-link">
                     <svg width="14" height="14" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2"><path d="M21 15v4a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2v4"></path><polyline points="7 10 12 15 17 10"></polyline><line x1="12" y1="15" x2="12" y2="3"></line></svg>
@@ -120,7 +120,7 @@ async function triggerSync() {
 
         const response = await fetch(`${API_BASE}/jobs/`, { method: 'POST' });
         if (response.ok) {
-            alert('Synchronization job triggered! Please wait for it to complete.');
+            alert('Synchronization job triggered! Progress will show up in the sync history.');
             fetchJobs(); // Refresh job list
         } else {
             alert('Failed to trigger synchronization.');
@@ -144,10 +144,34 @@ document.getElementById('nextPage').addEventListener('click', () => {
     fetchLectures(currentPage + 1);
 });
 
+// Live job updates pushed by the server instead of polling
+function subscribeToJobEvents() {
+    const source = new EventSource(`${API_BASE}/jobs/events`);
+
+    // Catch up on anything missed while disconnected
+    source.onopen = () => {
+        fetchJobs();
+        fetchLectures(currentPage);
+    };
+
+    source.addEventListener('status', (e) => {
+        const event = JSON.parse(e.data);
+        fetchJobs();
+        if (event.status === 'completed') {
+            fetchLectures(currentPage);
+        }
+    });
+
+    source.addEventListener('progress', (e) => {
+        const event = JSON.parse(e.data);
+        const message = document.querySelector(`[data-job-id="${event.job_id}"] .job-message`);
+        if (message && event.message) {
+            message.innerText = event.message;
+        }
+    });
+}
+
 // Initial Load
 fetchLectures();
 fetchJobs();
-
-// Auto-refresh jobs every 30s
-setInterval(fetchLectures, 30000);
-setInterval(fetchJobs, 30000);
+subscribeToJobEvents();
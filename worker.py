@@ -0,0 +1,75 @@
+"""
+Standalone sync worker, the job-running tier next to the gunicorn web tier.
+
+Claims queued sync jobs from the database and runs them, together with the integration fan-out,
+and runs the sync schedule. Start the API with SYNC_EXECUTION_MODE=worker so it only enqueues jobs,
+then run any number of these against the same database:
+
+    python worker.py
+"""
+import asyncio
+import logging
+import os
+import signal
+import time
+from app.config import config
+from app.database import init_db, async_engine, SessionLocal
+from app.jobs.executor import job_executor
+from app.jobs.sheet_parser import sheet_parser_pool
+from app.services.job_service import job_service
+from app.scheduler import start_scheduler, stop_scheduler
+
+# Ensure the system timezone (set in Dockerfile) is applied to the Python process
+if os.name != 'nt':  # tzset is not available on Windows
+    time.tzset()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="[%(asctime)s] [%(process)d] [%(levelname)s] %(name)s: %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S %z",
+)
+logger = logging.getLogger("worker")
+
+def _claim_next_job():
+    db = SessionLocal()
+    try:
+        return job_service.claim_next_job(db)
+    except Exception as e:
+        logger.error(f"Failed to claim a queued job: {e}")
+        return None
+    finally:
+        db.close()
+
+async def run_worker():
+    init_db()
+    db = SessionLocal()
+    try:
+        job_service.recover_orphaned_jobs(db)
+    finally:
+        db.close()
+    start_scheduler()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    logger.info(f"Sync worker started, polling for queued jobs every {config.WORKER_POLL_INTERVAL}s.")
+    try:
+        while not stop.is_set():
+            # Claim right away again after a hit, there may be more queued
+            if job_executor.has_capacity() and _claim_next_job():
+                continue
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=config.WORKER_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        logger.info("Sync worker stopping...")
+        stop_scheduler()
+        await job_executor.drain(config.JOB_DRAIN_TIMEOUT_SECONDS)
+        sheet_parser_pool.shutdown()
+        await async_engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(run_worker())